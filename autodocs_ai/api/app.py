@@ -2,18 +2,31 @@
 
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import Depends, FastAPI, HTTPException, Security
 from fastapi.security import APIKeyHeader
 
 from autodocs_ai import __version__
 from autodocs_ai.api.routes import documents, health
 from autodocs_ai.config import get_settings
+from autodocs_ai.utils.version_queue import close_version_queues
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    yield
+    # Commit documents still waiting in the version queues
+    close_version_queues()
+
 
 app = FastAPI(
     title="autodocs-ai",
     description="AI-powered document generator API. "
     "Generate professional PDF/DOCX/HTML documents from prompts.",
     version=__version__,
+    lifespan=lifespan,
 )
 
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
@@ -10,11 +10,22 @@ class GenerateDocumentRequest(BaseModel):
 
     prompt: str = Field(..., description="The prompt describing the document to generate.")
     template: str | None = Field(None, description="Document template name.")
-    output_format: str = Field("pdf", description="Output format: pdf, docx, html, markdown.")
+    output_format: str = Field(
+        "pdf", description="Output format: pdf, docx, html, markdown, preview (PNG of page 1)."
+    )
     input_content: str | None = Field(None, description="Additional input content to incorporate.")
     language: str | None = Field(None, description="Document language (default: english).")
     renderer: str | None = Field(None, description="Rendering engine: typst or latex.")
     provider: str | None = Field(None, description="AI provider override.")
+    citations: list[str] = Field(
+        default_factory=list, description="Source URLs to list in a bibliography."
+    )
+    detect_citations: bool = Field(
+        False, description="Also cite URLs found in the prompt and input content."
+    )
+    citation_style: str | None = Field(
+        None, description="Citation style: apa, mla, chicago, ieee (default: apa)."
+    )
 
 
 class GenerateDocumentResponse(BaseModel):
@@ -42,6 +53,29 @@ class ProviderInfo(BaseModel):
     active: bool
 
 
+class CacheStatsResponse(BaseModel):
+    """Rendered artifact cache statistics."""
+
+    enabled: bool
+    hits: int
+    misses: int
+    hit_rate: float
+    saved_seconds: float
+    size_bytes: int
+
+
+class VersioningStatsResponse(BaseModel):
+    """Background version commit queue statistics."""
+
+    enabled: bool
+    backend: str
+    queue_depth: int
+    commits: int
+    errors: int
+    last_version: str | None = None
+    last_error: str | None = None
+
+
 class HealthResponse(BaseModel):
     """Health check response."""
 
@@ -2,17 +2,42 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
 
 from autodocs_ai.api.models import GenerateDocumentRequest, GenerateDocumentResponse
-from autodocs_ai.core.generator import GenerateRequest, generate_document
+from autodocs_ai.core.generator import GenerateRequest, GenerateResponse, generate_document
 
 router = APIRouter()
 
 
+async def _generate_until_disconnect(
+    http_request: Request, gen_request: GenerateRequest
+) -> list[GenerateResponse]:
+    """Run generation, cancelling it if the client goes away.
+
+    Cancellation propagates into the renderer, which kills any running compile.
+    """
+    task = asyncio.create_task(generate_document(gen_request))
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=0.5)
+        if done:
+            return task.result()
+        if await http_request.is_disconnected():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            raise HTTPException(status_code=499, detail="Client disconnected")
+
+
 @router.post("/generate", response_model=list[GenerateDocumentResponse])
-async def generate(request: GenerateDocumentRequest) -> list[GenerateDocumentResponse]:
+async def generate(
+    request: GenerateDocumentRequest, http_request: Request
+) -> list[GenerateDocumentResponse]:
     """Generate a document from a prompt."""
     gen_request = GenerateRequest(
         prompt=request.prompt,
@@ -21,10 +46,15 @@ async def generate(request: GenerateDocumentRequest) -> list[GenerateDocumentRes
         language=request.language,
         renderer=request.renderer,
         provider=request.provider,
+        citations=request.citations,
+        detect_citations=request.detect_citations,
+        citation_style=request.citation_style,
     )
 
     try:
-        responses = await generate_document(gen_request)
+        responses = await _generate_until_disconnect(http_request, gen_request)
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -45,8 +75,13 @@ async def generate(request: GenerateDocumentRequest) -> list[GenerateDocumentRes
 
 
 @router.post("/generate/download")
-async def generate_and_download(request: GenerateDocumentRequest) -> FileResponse:
-    """Generate a document and return it as a file download."""
+async def generate_and_download(
+    request: GenerateDocumentRequest, http_request: Request
+) -> Response:
+    """Generate a document and return it as a file download.
+
+    The document is rendered in memory and sent directly, without an output file.
+    """
     gen_request = GenerateRequest(
         prompt=request.prompt,
         template=request.template,
@@ -54,10 +89,16 @@ async def generate_and_download(request: GenerateDocumentRequest) -> FileRespons
         language=request.language,
         renderer=request.renderer,
         provider=request.provider,
+        citations=request.citations,
+        detect_citations=request.detect_citations,
+        citation_style=request.citation_style,
+        write_to_disk=False,
     )
 
     try:
-        responses = await generate_document(gen_request)
+        responses = await _generate_until_disconnect(http_request, gen_request)
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -72,10 +113,11 @@ async def generate_and_download(request: GenerateDocumentRequest) -> FileRespons
         "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
         "html": "text/html",
         "markdown": "text/markdown",
+        "preview": "image/png",
     }
 
-    return FileResponse(
-        path=str(response.output_path),
+    return Response(
+        content=response.content,
         media_type=media_types.get(response.output_format, "application/octet-stream"),
-        filename=response.output_path.name,
+        headers={"Content-Disposition": f'attachment; filename="{response.output_path.name}"'},
     )
@@ -5,9 +5,17 @@ from __future__ import annotations
 from fastapi import APIRouter
 
 from autodocs_ai import __version__
-from autodocs_ai.api.models import HealthResponse, ProviderInfo, TemplateInfo
+from autodocs_ai.api.models import (
+    CacheStatsResponse,
+    HealthResponse,
+    ProviderInfo,
+    TemplateInfo,
+    VersioningStatsResponse,
+)
 from autodocs_ai.config import ProviderName, get_settings
+from autodocs_ai.core.artifact_cache import get_artifact_cache
 from autodocs_ai.core.prompts import TEMPLATE_INSTRUCTIONS
+from autodocs_ai.utils.version_queue import get_version_queue
 
 router = APIRouter()
 
@@ -46,3 +54,41 @@ async def list_providers() -> list[ProviderInfo]:
         )
         for name, configured in providers
     ]
+
+
+@router.get("/cache/stats", response_model=CacheStatsResponse)
+async def cache_stats() -> CacheStatsResponse:
+    """Report hit rate and compile time saved by the rendered artifact cache."""
+    settings = get_settings()
+    cache = get_artifact_cache(settings.cache_dir, settings.artifact_cache_max_bytes)
+    return CacheStatsResponse(
+        enabled=settings.artifact_cache,
+        hits=cache.stats.hits,
+        misses=cache.stats.misses,
+        hit_rate=cache.stats.hit_rate,
+        saved_seconds=cache.stats.saved_seconds,
+        size_bytes=cache.size_bytes() if cache.cache_dir.exists() else 0,
+    )
+
+
+@router.get("/versioning/stats", response_model=VersioningStatsResponse)
+async def versioning_stats() -> VersioningStatsResponse:
+    """Report the background version commit queue."""
+    settings = get_settings()
+    max_age_days = settings.versioning_max_age_days
+    queue = get_version_queue(
+        settings.output_dir,
+        settings.versioning_backend.value,
+        settings.versioning_debounce,
+        max_age=max_age_days * 86400 if max_age_days is not None else None,
+        max_bytes=settings.versioning_max_bytes,
+    )
+    return VersioningStatsResponse(
+        enabled=settings.versioning,
+        backend=settings.versioning_backend.value,
+        queue_depth=queue.depth,
+        commits=queue.commits,
+        errors=queue.errors,
+        last_version=queue.last_version,
+        last_error=queue.last_error,
+    )
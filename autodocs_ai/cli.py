@@ -73,13 +73,15 @@ def generate(
         "pdf",
         "--format",
         "-f",
-        help="Output format(s): pdf, docx, html, markdown. Comma-separate for multiple.",
+        help="Output format(s): pdf, docx, html, markdown, preview (PNG of page 1). "
+        "Comma-separate for multiple.",
     ),
     input_files: Optional[list[str]] = typer.Option(
         None,
         "--input",
         "-i",
-        help="Input files to incorporate (PDF, Excel, Word, text, code).",
+        help="Input files to incorporate (PDF, Excel, Word, text, code). Append "
+        "#pages=1-20 to select PDF pages, #chars=N or #tokens=N to cap the extracted text.",
     ),
     language: Optional[str] = typer.Option(
         None,
@@ -99,6 +101,22 @@ def generate(
         "-p",
         help="AI provider: openai, anthropic, gemini, azure, ollama.",
     ),
+    cite: Optional[list[str]] = typer.Option(
+        None,
+        "--cite",
+        "-c",
+        help="Source URL to list in a bibliography. Repeat for multiple.",
+    ),
+    cite_urls: bool = typer.Option(
+        False,
+        "--cite-urls",
+        help="Also cite URLs found in the prompt and input files.",
+    ),
+    citation_style: Optional[str] = typer.Option(
+        None,
+        "--citation-style",
+        help="Citation style: apa, mla, chicago, ieee (default: apa).",
+    ),
     output_json: bool = typer.Option(
         False,
         "--json",
@@ -117,6 +135,9 @@ def generate(
         language=language,
         renderer=renderer,
         provider=provider,
+        citations=cite or [],
+        detect_citations=cite_urls,
+        citation_style=citation_style,
     )
 
     with console.status("[bold green]Generating document...", spinner="dots"):
@@ -138,9 +159,13 @@ def generate(
                 "model": r.ai_result.model,
                 "provider": r.ai_result.provider,
                 "usage": r.ai_result.usage,
+                "input_errors": r.input_errors,
             })
         console.print_json(json.dumps(results, indent=2))
     else:
+        if responses:
+            for file_path, error in responses[0].input_errors.items():
+                err_console.print(f"[bold yellow]Warning:[/] Skipped input {file_path}: {error}")
         for r in responses:
             console.print(
                 Panel(
@@ -308,6 +333,47 @@ def check() -> None:
     console.print(table)
 
 
+@app.command()
+def gc(
+    max_age_days: Optional[float] = typer.Option(
+        None,
+        "--max-age-days",
+        help="Drop versions older than this many days (default: AUTODOCS_VERSIONING_MAX_AGE_DAYS).",
+    ),
+    max_bytes: Optional[int] = typer.Option(
+        None,
+        "--max-bytes",
+        help="Drop the oldest versions until the stored files fit in this many bytes "
+        "(default: AUTODOCS_VERSIONING_MAX_BYTES).",
+    ),
+    output_dir: Optional[Path] = typer.Option(
+        None, "--output-dir", help="Versioned output directory (default: AUTODOCS_OUTPUT_DIR)."
+    ),
+) -> None:
+    """Garbage collect old document versions (artifact store backend)."""
+    from autodocs_ai.utils.versioning import VersioningError, collect_garbage
+
+    settings = get_settings()
+    if max_age_days is None:
+        max_age_days = settings.versioning_max_age_days
+    if max_bytes is None:
+        max_bytes = settings.versioning_max_bytes
+    if max_age_days is None and max_bytes is None:
+        err_console.print("[bold red]Error:[/] Set --max-age-days or --max-bytes.")
+        raise typer.Exit(code=1)
+
+    max_age = max_age_days * 86400 if max_age_days is not None else None
+    try:
+        result = collect_garbage(output_dir or settings.output_dir, max_age, max_bytes)
+    except VersioningError as e:
+        err_console.print(f"[bold red]Error:[/] {e}")
+        raise typer.Exit(code=1)
+    console.print(
+        f"[green]✓[/] Removed {result.versions} versions and {result.objects} stored files "
+        f"({result.bytes_freed:,} bytes)"
+    )
+
+
 @app.command()
 def templates() -> None:
     """List available document templates."""
@@ -23,11 +23,17 @@ class RendererName(str, Enum):
     LATEX = "latex"
 
 
+class VersioningBackendName(str, Enum):
+    GIT = "git"
+    STORE = "store"
+
+
 class OutputFormat(str, Enum):
     PDF = "pdf"
     DOCX = "docx"
     HTML = "html"
     MARKDOWN = "markdown"
+    PREVIEW = "preview"
 
 
 class TemplateName(str, Enum):
@@ -83,10 +89,55 @@ class Settings(BaseSettings):
 
     # Rendering
     renderer: RendererName = RendererName.TYPST
+    docx_template: Optional[Path] = None
+    render_timeout: float = 120.0
+    render_cpu_seconds: Optional[int] = 60
+    render_memory_mb: Optional[int] = 2048
+    # Compile with the Typst bindings in a killable, rlimited child process; costs
+    # an interpreter startup per render, so off unless renders need hard limits
+    render_isolation: bool = False
+    preview_dpi: int = 72
+
+    # Caching
+    cache_dir: Path = Path.home() / ".cache" / "autodocs-ai"
+    latex_format_cache: bool = True
+    latex_format_cache_size: int = 16
+    artifact_cache: bool = True
+    artifact_cache_max_bytes: int = 512 * 1024 * 1024
+    citation_cache: bool = True
+    citation_cache_ttl: float = 7 * 24 * 3600
+    extraction_cache: bool = True
+    extraction_cache_max_bytes: int = 256 * 1024 * 1024
+
+    # Mermaid diagrams
+    mermaid_diagrams: bool = True
+    mermaid_theme: str = "default"
+    mermaid_cache_size: int = 256
+    mermaid_workers: int = 2
+
+    # Citations
+    citation_style: str = "apa"
+    citation_deadline: float = 15.0
+    citation_head_bytes: int = 64 * 1024
+
+    # Input extraction
+    extraction_workers: int = 4
+    extraction_max_chars: Optional[int] = None
+    extraction_max_rows: Optional[int] = 1000
+    extraction_max_columns: Optional[int] = 50
+    extraction_headers_footers: bool = False
 
     # Output
     output_dir: Path = Path("./output")
 
+    # Versioning
+    versioning: bool = False
+    versioning_backend: VersioningBackendName = VersioningBackendName.GIT
+    versioning_debounce: float = 2.0
+    # Retention of the store backend, applied after each background commit
+    versioning_max_age_days: Optional[float] = None
+    versioning_max_bytes: Optional[int] = None
+
     # API server
     api_host: str = "0.0.0.0"
     api_port: int = 8000
@@ -95,6 +146,8 @@ class Settings(BaseSettings):
     # Document generation
     language: str = "english"
     max_tokens: int = 4096
+    stream_validation: bool = True
+    generation_retries: int = 2
 
 
 def get_settings(**overrides: object) -> Settings:
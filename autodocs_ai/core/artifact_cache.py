@@ -0,0 +1,193 @@
+"""Content-addressed cache of rendered artifacts.
+
+Re-rendering identical source (cached LLM output, re-downloads, duplicate batch jobs)
+is served from disk by hard-linking the stored artifact to the output path.
+"""
+
+from __future__ import annotations
+
+import shutil
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+from autodocs_ai import __version__
+from autodocs_ai.utils.cache import digest, evict_lru, touch
+
+# Formats that are compiled; html/markdown are written verbatim and gain nothing
+CACHEABLE_FORMATS = frozenset({"pdf", "docx", "preview"})
+
+# Bundled templates, including the Typst style package generated documents import
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for an artifact cache."""
+
+    hits: int = 0
+    misses: int = 0
+    saved_seconds: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ArtifactCache:
+    """Size-bounded on-disk store of rendered documents keyed by content hash."""
+
+    def __init__(self, cache_dir: Path, max_bytes: int = 512 * 1024 * 1024) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def key(self, source: str, renderer: str, output_format: str, version: str) -> str:
+        """Compute the cache key for a render.
+
+        Args:
+            source: Document source.
+            renderer: Engine that produces the artifact.
+            output_format: Output format (pdf, docx, preview, ...).
+            version: Engine version string, so upgrades invalidate old artifacts.
+        """
+        return digest(source, renderer, output_format, version, __version__, templates_digest())
+
+    def _artifact_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.bin"
+
+    def fetch(self, key: str, output_path: Path) -> bool:
+        """Materialize a cached artifact at ``output_path``.
+
+        Returns:
+            True on a cache hit, False if the artifact must be rendered.
+        """
+        artifact = self._artifact_path(key)
+        if not artifact.exists():
+            with self._lock:
+                self.stats.misses += 1
+            return False
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.unlink(missing_ok=True)
+        try:
+            output_path.hardlink_to(artifact)
+        except OSError:
+            shutil.copy2(artifact, output_path)
+        touch(artifact)
+
+        with self._lock:
+            self.stats.hits += 1
+            self.stats.saved_seconds += _read_seconds(artifact.with_suffix(".meta"))
+        return True
+
+    def get_bytes(self, key: str) -> bytes | None:
+        """Read a cached artifact into memory.
+
+        Returns:
+            The artifact, or None on a cache miss.
+        """
+        artifact = self._artifact_path(key)
+        try:
+            data = artifact.read_bytes()
+        except FileNotFoundError:
+            with self._lock:
+                self.stats.misses += 1
+            return None
+        touch(artifact)
+
+        with self._lock:
+            self.stats.hits += 1
+            self.stats.saved_seconds += _read_seconds(artifact.with_suffix(".meta"))
+        return data
+
+    def store(self, key: str, rendered_path: Path, compile_seconds: float) -> None:
+        """Add a freshly rendered artifact file to the cache.
+
+        Args:
+            key: Cache key from ``key()``.
+            rendered_path: The rendered output file.
+            compile_seconds: How long the render took, credited to later hits.
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self._tmp_path(key)
+        try:
+            tmp.hardlink_to(rendered_path)
+        except OSError:
+            shutil.copy2(rendered_path, tmp)
+        self._commit(key, tmp, compile_seconds)
+
+    def put_bytes(self, key: str, data: bytes, compile_seconds: float) -> None:
+        """Add an artifact rendered in memory to the cache.
+
+        Args:
+            key: Cache key from ``key()``.
+            data: The rendered document.
+            compile_seconds: How long the render took, credited to later hits.
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self._tmp_path(key)
+        tmp.write_bytes(data)
+        self._commit(key, tmp, compile_seconds)
+
+    def _tmp_path(self, key: str) -> Path:
+        return self._artifact_path(key).with_suffix(f".tmp{threading.get_ident()}")
+
+    def _commit(self, key: str, tmp: Path, compile_seconds: float) -> None:
+        artifact = self._artifact_path(key)
+        tmp.replace(artifact)
+        artifact.with_suffix(".meta").write_text(f"{compile_seconds:.6f}")
+
+        for evicted in evict_lru(self.cache_dir, "*.bin", max_bytes=self.max_bytes):
+            evicted.with_suffix(".meta").unlink(missing_ok=True)
+
+    def size_bytes(self) -> int:
+        """Total size of the cached artifacts."""
+        return sum(p.stat().st_size for p in self.cache_dir.glob("*.bin"))
+
+
+def templates_digest() -> str:
+    """Digest of the bundled templates, so editing them invalidates old artifacts.
+
+    Files are only reread when their size or modification time changes.
+    """
+    try:
+        signature = []
+        for path in sorted(TEMPLATES_DIR.rglob("*")):
+            if path.is_file():
+                st = path.stat()
+                name = path.relative_to(TEMPLATES_DIR).as_posix()
+                signature.append((name, st.st_mtime_ns, st.st_size))
+        return _hash_templates(TEMPLATES_DIR, tuple(signature))
+    except OSError:
+        return "unknown"
+
+
+@lru_cache(maxsize=1)
+def _hash_templates(directory: Path, signature: tuple[tuple[str, int, int], ...]) -> str:
+    return digest(
+        *(part for name, _, _ in signature for part in (name, (directory / name).read_bytes()))
+    )
+
+
+def _read_seconds(meta_path: Path) -> float:
+    try:
+        return float(meta_path.read_text())
+    except (OSError, ValueError):
+        return 0.0
+
+
+_artifact_caches: dict[Path, ArtifactCache] = {}
+
+
+def get_artifact_cache(cache_dir: Path, max_bytes: int = 512 * 1024 * 1024) -> ArtifactCache:
+    """Get the shared artifact cache for a cache directory."""
+    directory = cache_dir / "artifacts"
+    cache = _artifact_caches.get(directory)
+    if cache is None:
+        cache = ArtifactCache(directory, max_bytes=max_bytes)
+        _artifact_caches[directory] = cache
+    return cache
@@ -0,0 +1,177 @@
+"""Bibliographies for generated documents.
+
+Cited URLs are fetched while the provider generates the document (see
+``generate_document``), and the formatted reference list is spliced into the
+generated source in the document's own markup.
+"""
+
+from __future__ import annotations
+
+import re
+
+from autodocs_ai.config import Settings
+from autodocs_ai.utils.citation_cache import get_citation_cache
+from autodocs_ai.utils.citations import (
+    Citation,
+    fetch_citations,
+    generate_bibliography,
+    normalize_url,
+)
+
+# URLs in prose; trailing punctuation is trimmed separately
+_URL = re.compile(r"https?://[^\s<>\"'`\]\[{}|\\^]+", re.IGNORECASE)
+_TRAILING = ".,;:!?'\")"
+_EMPHASIS = re.compile(r"\*([^*]+)\*")
+_END_DOCUMENT = re.compile(r"\\end\s*\{document\}")
+_END_BODY = re.compile(r"</body\s*>", re.IGNORECASE)
+
+_TYPST_SPECIAL = re.compile(r"([\\#$@<>*_\[\]`~/=+-])")
+_LATEX_SPECIAL = {
+    "\\": r"\textbackslash{}",
+    "&": r"\&",
+    "%": r"\%",
+    "$": r"\$",
+    "#": r"\#",
+    "_": r"\_",
+    "{": r"\{",
+    "}": r"\}",
+    "~": r"\textasciitilde{}",
+    "^": r"\textasciicircum{}",
+}
+_LATEX_SPECIAL_CHARS = re.compile("|".join(re.escape(c) for c in _LATEX_SPECIAL))
+
+HEADING = "References"
+
+
+def bibliography_target(settings: Settings, output_format: str) -> str:
+    """Get the markup language the bibliography is written in for an output format.
+
+    Returns:
+        typst, latex, html or markdown (DOCX is rendered from Markdown).
+    """
+    if output_format in ("pdf", "preview"):
+        return settings.renderer.value
+    if output_format == "html":
+        return "html"
+    return "markdown"
+
+
+def find_urls(*texts: str | None) -> list[str]:
+    """Find the URLs cited in the prompt or input content.
+
+    Args:
+        texts: Texts to scan; None entries are skipped.
+
+    Returns:
+        Unique URLs (by normalized form) in order of first appearance.
+    """
+    urls: dict[str, str] = {}
+    for text in texts:
+        for match in _URL.finditer(text or ""):
+            url = match.group(0)
+            while url and url[-1] in _TRAILING:
+                # Keep a closing parenthesis that belongs to the URL (Wikipedia-style)
+                if url[-1] == ")" and url.count("(") >= url.count(")"):
+                    break
+                url = url[:-1]
+            urls.setdefault(normalize_url(url), url)
+    return list(urls.values())
+
+
+async def fetch_bibliography(urls: list[str], settings: Settings) -> list[Citation]:
+    """Fetch the citation metadata for a document's sources.
+
+    Args:
+        urls: URLs to cite.
+        settings: Settings providing the deadline, byte cap and citation cache.
+
+    Returns:
+        One citation per unique URL; sources not fetched in time are cited by URL.
+    """
+    cache = (
+        get_citation_cache(settings.cache_dir, settings.citation_cache_ttl)
+        if settings.citation_cache
+        else None
+    )
+    return await fetch_citations(
+        urls,
+        deadline=settings.citation_deadline,
+        cache=cache,
+        max_bytes=settings.citation_head_bytes,
+    )
+
+
+def format_bibliography(citations: list[Citation], style: str, target: str) -> str:
+    """Format a reference list as a section in the document's markup.
+
+    Args:
+        citations: Citations to list.
+        style: Citation style (apa, mla, chicago, ieee).
+        target: Markup language: typst, latex, html or markdown.
+
+    Returns:
+        The reference section source.
+    """
+    entries = generate_bibliography(citations, style).split("\n\n")
+    entries = [_to_markup(entry, target) for entry in entries]
+
+    if target == "typst":
+        return f"= {HEADING}\n\n" + "\n\n".join(entries) + "\n"
+    if target == "latex":
+        items = "\n".join(f"\\item[] {entry}" for entry in entries)
+        return f"\\section*{{{HEADING}}}\n\\begin{{description}}\n{items}\n\\end{{description}}\n"
+    if target == "html":
+        items = "\n".join(f"  <li>{entry}</li>" for entry in entries)
+        return (
+            f'<section class="references">\n<h2>{HEADING}</h2>\n'
+            f'<ul style="list-style: none; padding-left: 0">\n{items}\n</ul>\n</section>\n'
+        )
+    return f"## {HEADING}\n\n" + "\n\n".join(entries) + "\n"
+
+
+def splice_bibliography(source: str, section: str, target: str) -> str:
+    """Insert a reference section at the end of a document's content.
+
+    Args:
+        source: Generated document source.
+        section: Reference section from ``format_bibliography``.
+        target: Markup language of the source.
+
+    Returns:
+        The source with the section before ``\\end{document}`` (LaTeX), ``</body>``
+        (HTML), or at the end.
+    """
+    end = {"latex": _END_DOCUMENT, "html": _END_BODY}.get(target)
+    matches = list(end.finditer(source)) if end is not None else []
+    if matches:
+        position = matches[-1].start()
+        return f"{source[:position].rstrip()}\n\n{section}\n{source[position:]}"
+    return f"{source.rstrip()}\n\n{section}"
+
+
+def _to_markup(entry: str, target: str) -> str:
+    """Convert a formatted entry (plain text with *emphasis*) to the target markup."""
+    if target == "markdown":
+        return entry
+    parts = []
+    pos = 0
+    for match in _EMPHASIS.finditer(entry):
+        parts.append(_escape(entry[pos : match.start()], target))
+        text = _escape(match.group(1), target)
+        if target == "typst":
+            parts.append(f"_{text}_")
+        elif target == "latex":
+            parts.append(f"\\textit{{{text}}}")
+        else:
+            parts.append(f"<em>{text}</em>")
+        pos = match.end()
+    parts.append(_escape(entry[pos:], target))
+    return "".join(parts)
+
+
+def _escape(text: str, target: str) -> str:
+    if target == "typst":
+        return _TYPST_SPECIAL.sub(r"\\\1", text)
+    if target == "latex":
+        return _LATEX_SPECIAL_CHARS.sub(lambda m: _LATEX_SPECIAL[m.group(0)], text)
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
@@ -0,0 +1,129 @@
+"""Mermaid diagrams as a pipeline stage between the AI provider and the renderer.
+
+Diagrams start rendering while the response is still streaming: each completed
+```mermaid block is queued, and queued blocks are rendered in batches in the
+background, so by the time the document is complete most diagrams are ready and
+substitution is a single pass over the source.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+from autodocs_ai.config import Settings
+from autodocs_ai.utils.mermaid import (
+    MERMAID_BLOCK,
+    MermaidError,
+    extract_mermaid_blocks,
+    image_format_for,
+    render_mermaid_batch,
+    substitute_mermaid,
+)
+
+_FENCE = "```mermaid"
+
+
+def diagram_target(settings: Settings, output_format: str) -> str | None:
+    """Get the language diagrams are embedded in for an output format.
+
+    Returns:
+        typst, latex, markdown or html, or None if diagrams aren't rendered (DOCX).
+    """
+    if output_format in ("pdf", "preview"):
+        return settings.renderer.value
+    if output_format in ("markdown", "html"):
+        return output_format
+    return None
+
+
+class DiagramStage:
+    """Renders the Mermaid diagrams of a document as its source streams in.
+
+    Args:
+        target: Language of the document (see ``diagram_target``).
+        settings: Settings providing the Mermaid theme, cache and concurrency.
+        image_dir: Directory for image files (see ``substitute_mermaid``).
+    """
+
+    def __init__(self, target: str, settings: Settings, image_dir: Path | None = None) -> None:
+        self.target = target
+        self.settings = settings
+        self.image_dir = image_dir
+        self.images: dict[str, bytes] = {}
+        self._text = ""
+        self._scan_pos = 0
+        self._seen: set[str] = set()
+        self._pending: list[str] = []
+        self._runner: asyncio.Task | None = None
+        self._unavailable = False
+
+    def feed(self, chunk: str) -> None:
+        """Add a chunk of the response, queueing any diagram it completes."""
+        self._text += chunk
+        while True:
+            start = self._text.find(_FENCE, self._scan_pos)
+            if start == -1:
+                # Keep enough overlap to find a fence split across chunks
+                self._scan_pos = max(self._scan_pos, len(self._text) - len(_FENCE))
+                break
+            match = MERMAID_BLOCK.match(self._text, start)
+            if match is None:
+                self._scan_pos = start  # Block not closed yet
+                break
+            self._queue(match.group(1))
+            self._scan_pos = match.end()
+        self._ensure_running()
+
+    def restart(self) -> None:
+        """Forget the streamed text when the provider request is retried.
+
+        Diagrams already rendered are kept; they're valid if the retry reuses them.
+        """
+        self._text = ""
+        self._scan_pos = 0
+
+    async def apply(self, content: str) -> str:
+        """Embed the rendered diagrams in the final document source.
+
+        Diagrams not seen while streaming are rendered now; diagrams that fail to
+        render (or all of them, without mmdc) are left as code blocks.
+        """
+        for block in extract_mermaid_blocks(content):
+            self._queue(block)
+        self._ensure_running()
+        if self._runner is not None:
+            await self._runner
+        if not self.images:
+            return content
+        return substitute_mermaid(content, self.images, self.target, self.image_dir)
+
+    def _queue(self, source: str) -> None:
+        if source not in self._seen and not self._unavailable:
+            self._seen.add(source)
+            self._pending.append(source)
+
+    def _ensure_running(self) -> None:
+        if self._pending and (self._runner is None or self._runner.done()):
+            self._runner = asyncio.ensure_future(self._render_pending())
+
+    async def _render_pending(self) -> None:
+        # Diagrams completed while a batch renders are grouped into the next one
+        while self._pending:
+            batch, self._pending = self._pending, []
+            try:
+                images = await asyncio.to_thread(
+                    render_mermaid_batch,
+                    batch,
+                    fmt=image_format_for(self.target),
+                    theme=self.settings.mermaid_theme,
+                    cache_dir=self.settings.cache_dir / "mermaid",
+                    cache_size=self.settings.mermaid_cache_size,
+                    workers=self.settings.mermaid_workers,
+                )
+            except MermaidError:
+                # mmdc is not installed: leave the blocks as-is
+                self._unavailable = True
+                self._pending.clear()
+                return
+            self.images.update(images)
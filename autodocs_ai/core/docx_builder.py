@@ -0,0 +1,383 @@
+"""Single-pass Markdown to DOCX conversion.
+
+The Markdown source is tokenized into blocks in one pass and each block is appended
+straight to the body of a template document that is parsed once and reused, so the
+cost of a render is linear in the size of the document.
+"""
+
+from __future__ import annotations
+
+import io
+import re
+import threading
+import zipfile
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+_FENCE = re.compile(r"^\s*(```|~~~)\s*([\w+-]*)\s*$")
+_HEADING = re.compile(r"^\s{0,3}(#{1,6})\s+(.*?)\s*#*\s*$")
+_RULE = re.compile(r"^\s{0,3}([-*_])(?:\s*\1){2,}\s*$")
+_LIST_ITEM = re.compile(r"^(\s*)([-*+]|\d+[.)])\s+(.*)$")
+_QUOTE = re.compile(r"^\s{0,3}>\s?(.*)$")
+_TABLE_SEPARATOR = re.compile(r"^\s*\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?\s*$")
+_INLINE = re.compile(
+    r"(?P<code>`+)(?P<code_text>.+?)(?P=code)"
+    r"|\[(?P<link_text>[^\]]+)\]\([^)\s]+[^)]*\)"
+    r"|\*\*\*(?P<strong_em>.+?)\*\*\*"
+    r"|\*\*(?P<strong>.+?)\*\*"
+    r"|(?<!\w)__(?P<strong_u>.+?)__(?!\w)"
+    r"|\*(?P<em>[^\s*](?:.*?[^\s*])?)\*"
+    r"|(?<!\w)_(?P<em_u>[^\s_](?:.*?[^\s_])?)_(?!\w)"
+)
+
+
+@dataclass
+class Block:
+    """A block-level Markdown element."""
+
+    kind: str  # heading, paragraph, list_item, table, code, quote, rule
+    text: str = ""
+    level: int = 0  # heading level or list nesting depth
+    ordered: bool = False
+    rows: list[list[str]] = field(default_factory=list)
+
+
+@dataclass
+class Run:
+    """A span of inline text with uniform formatting."""
+
+    text: str
+    bold: bool = False
+    italic: bool = False
+    code: bool = False
+
+
+def _split_row(line: str) -> list[str]:
+    stripped = line.strip()
+    if stripped.startswith("|"):
+        stripped = stripped[1:]
+    if stripped.endswith("|") and not stripped.endswith("\\|"):
+        stripped = stripped[:-1]
+    return [cell.strip().replace("\\|", "|") for cell in re.split(r"(?<!\\)\|", stripped)]
+
+
+def tokenize_markdown(source: str) -> Iterator[Block]:
+    """Tokenize Markdown into blocks in a single pass over its lines.
+
+    Supports ATX headings, paragraphs, nested bullet and numbered lists, pipe tables,
+    fenced code, block quotes and horizontal rules (emitted as ``rule`` blocks).
+
+    Args:
+        source: Markdown source.
+
+    Yields:
+        Blocks in document order.
+    """
+    lines = source.splitlines()
+    paragraph: list[str] = []
+    list_indents: list[int] = []
+    item: Block | None = None
+    i = 0
+
+    def flush() -> Iterator[Block]:
+        nonlocal item
+        if paragraph:
+            yield Block("paragraph", " ".join(paragraph))
+            paragraph.clear()
+        if item is not None:
+            yield item
+            item = None
+
+    while i < len(lines):
+        line = lines[i].expandtabs(4)
+        i += 1
+
+        if not line.strip():
+            yield from flush()
+            continue
+
+        fence = _FENCE.match(line)
+        if fence:
+            yield from flush()
+            list_indents.clear()
+            code_lines = []
+            while i < len(lines) and not lines[i].strip().startswith(fence.group(1)):
+                code_lines.append(lines[i])
+                i += 1
+            i += 1  # Skip the closing fence
+            yield Block("code", "\n".join(code_lines))
+            continue
+
+        heading = _HEADING.match(line)
+        if heading:
+            yield from flush()
+            list_indents.clear()
+            yield Block("heading", heading.group(2), level=len(heading.group(1)))
+            continue
+
+        if _RULE.match(line):
+            yield from flush()
+            list_indents.clear()
+            yield Block("rule")
+            continue
+
+        if "|" in line and i < len(lines) and "|" in lines[i] and _TABLE_SEPARATOR.match(lines[i]):
+            yield from flush()
+            list_indents.clear()
+            rows = [_split_row(line)]
+            i += 1  # Skip the separator
+            while i < len(lines) and lines[i].strip() and "|" in lines[i]:
+                rows.append(_split_row(lines[i]))
+                i += 1
+            yield Block("table", rows=rows)
+            continue
+
+        list_item = _LIST_ITEM.match(line)
+        if list_item:
+            yield from flush()
+            indent = len(list_item.group(1))
+            while list_indents and indent < list_indents[-1]:
+                list_indents.pop()
+            if not list_indents or indent > list_indents[-1]:
+                list_indents.append(indent)
+            item = Block(
+                "list_item",
+                list_item.group(3),
+                level=len(list_indents) - 1,
+                ordered=list_item.group(2)[0].isdigit(),
+            )
+            continue
+
+        quote = _QUOTE.match(line)
+        if quote:
+            yield from flush()
+            yield Block("quote", quote.group(1))
+            continue
+
+        if item is not None:
+            # Lazy continuation of the current list item
+            item.text += " " + line.strip()
+        else:
+            list_indents.clear()
+            paragraph.append(line.strip())
+
+    yield from flush()
+
+
+def parse_inline(text: str, bold: bool = False, italic: bool = False) -> list[Run]:
+    """Split inline Markdown into formatted runs.
+
+    Handles ``**bold**``, ``*italic*``, ```code``` and ``[links](url)``, including
+    emphasis nested inside emphasis.
+
+    Args:
+        text: Inline Markdown.
+        bold: Whether the surrounding text is bold.
+        italic: Whether the surrounding text is italic.
+
+    Returns:
+        Runs in order.
+    """
+    runs: list[Run] = []
+    pos = 0
+    for match in _INLINE.finditer(text):
+        if match.start() > pos:
+            runs.append(Run(text[pos : match.start()], bold, italic))
+        groups = match.groupdict()
+        if groups["code"]:
+            runs.append(Run(groups["code_text"].strip(), bold, italic, code=True))
+        elif groups["link_text"]:
+            runs.extend(parse_inline(groups["link_text"], bold, italic))
+        elif groups["strong_em"]:
+            runs.extend(parse_inline(groups["strong_em"], True, True))
+        elif groups["strong"] or groups["strong_u"]:
+            runs.extend(parse_inline(groups["strong"] or groups["strong_u"], True, italic))
+        else:
+            runs.extend(parse_inline(groups["em"] or groups["em_u"], bold, True))
+        pos = match.end()
+    if pos < len(text):
+        runs.append(Run(text[pos:], bold, italic))
+    return runs
+
+
+def _load_template_bytes(template: Path) -> bytes:
+    """Read a .docx or .dotx file, retyping a .dotx package as a document."""
+    data = template.read_bytes()
+    if template.suffix.lower() != ".dotx":
+        return data
+
+    source = zipfile.ZipFile(io.BytesIO(data))
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as target:
+        for info in source.infolist():
+            content = source.read(info)
+            if info.filename == "[Content_Types].xml":
+                content = content.replace(
+                    b"wordprocessingml.template.main+xml",
+                    b"wordprocessingml.document.main+xml",
+                )
+            target.writestr(info, content)
+    return buffer.getvalue()
+
+
+class DocxBuilder:
+    """Builds DOCX files from Markdown on top of a parsed template.
+
+    The template is parsed once; each build empties the body, appends the new
+    content and serializes the package. Builds are serialized with a lock because
+    the underlying document object is shared.
+    """
+
+    def __init__(self, template: Path | None = None) -> None:
+        from docx import Document
+        from docx.shared import Inches
+
+        self._document = Document(io.BytesIO(_load_template_bytes(template)) if template else None)
+        self._lock = threading.Lock()
+
+        body = self._document.element.body
+        self._sect_pr = body.sectPr
+        self._text_width = Inches(6)
+        if self._sect_pr is not None:
+            section = self._document.sections[0]
+            if section.page_width is not None:
+                self._text_width = (
+                    section.page_width - (section.left_margin or 0) - (section.right_margin or 0)
+                )
+            body.remove(self._sect_pr)
+
+        self._style_ids: dict[str, str | None] = {}
+
+    def _style_id(self, *names: str) -> str | None:
+        """Resolve the first style name present in the template to its style id."""
+        for name in names:
+            if name not in self._style_ids:
+                try:
+                    self._style_ids[name] = self._document.styles[name].style_id
+                except KeyError:
+                    self._style_ids[name] = None
+            if self._style_ids[name] is not None:
+                return self._style_ids[name]
+        return None
+
+    def build(self, source: str) -> bytes:
+        """Convert Markdown source to DOCX bytes."""
+        with self._lock:
+            body = self._document.element.body
+            for child in list(body):
+                body.remove(child)
+
+            for block in tokenize_markdown(source):
+                body.append(self._render_block(block))
+
+            if self._sect_pr is not None:
+                body.append(self._sect_pr)
+            try:
+                buffer = io.BytesIO()
+                self._document.save(buffer)
+            finally:
+                if self._sect_pr is not None:
+                    body.remove(self._sect_pr)
+            return buffer.getvalue()
+
+    def _render_block(self, block: Block):
+        from docx.enum.text import WD_BREAK
+        from docx.oxml import OxmlElement
+        from docx.text.paragraph import Paragraph
+
+        if block.kind == "table":
+            return self._render_table(block.rows)
+
+        p = OxmlElement("w:p")
+        paragraph = Paragraph(p, self._document)
+
+        if block.kind == "heading":
+            p.style = self._style_id(f"Heading {block.level}")
+            self._add_runs(p, parse_inline(block.text))
+        elif block.kind == "list_item":
+            base = "List Number" if block.ordered else "List Bullet"
+            depth = min(block.level + 1, 3)
+            p.style = self._style_id(f"{base} {depth}" if depth > 1 else base, base)
+            self._add_runs(p, parse_inline(block.text))
+        elif block.kind == "code":
+            for index, line in enumerate(block.text.split("\n")):
+                run = paragraph.add_run()
+                if index:
+                    run.add_break()
+                run.add_text(line)
+                run.font.name = "Consolas"
+        elif block.kind == "quote":
+            p.style = self._style_id("Quote")
+            self._add_runs(p, parse_inline(block.text))
+        elif block.kind == "rule":
+            paragraph.add_run().add_break(WD_BREAK.PAGE)
+        else:
+            self._add_runs(p, parse_inline(block.text))
+        return p
+
+    def _render_table(self, rows: list[list[str]]):
+        from docx.oxml.table import CT_Tbl
+
+        cols = max(len(row) for row in rows)
+        tbl = CT_Tbl.new_tbl(len(rows), cols, self._text_width)
+        style_id = self._style_id("Table Grid")
+        if style_id:
+            tbl.tblStyle_val = style_id
+
+        for row_index, (tr, cells) in enumerate(zip(tbl.tr_lst, rows)):
+            for tc, text in zip(tr.tc_lst, cells):
+                self._add_runs(tc.p_lst[0], parse_inline(text, bold=row_index == 0))
+        return tbl
+
+    @staticmethod
+    def _add_runs(p, runs: list[Run]) -> None:
+        """Append runs to a ``w:p`` element, building the run XML directly."""
+        from docx.oxml import OxmlElement
+        from docx.oxml.ns import qn
+
+        for span in runs:
+            r = OxmlElement("w:r")
+            if span.bold or span.italic or span.code:
+                r_pr = OxmlElement("w:rPr")
+                if span.code:
+                    fonts = OxmlElement("w:rFonts")
+                    fonts.set(qn("w:ascii"), "Consolas")
+                    fonts.set(qn("w:hAnsi"), "Consolas")
+                    r_pr.append(fonts)
+                if span.bold:
+                    r_pr.append(OxmlElement("w:b"))
+                if span.italic:
+                    r_pr.append(OxmlElement("w:i"))
+                r.append(r_pr)
+            t = OxmlElement("w:t")
+            t.text = span.text
+            t.set(qn("xml:space"), "preserve")
+            r.append(t)
+            p.append(r)
+
+
+# Template -> (its modification time and size when loaded, builder)
+_builders: dict[Path | None, tuple[tuple[int, int] | None, DocxBuilder]] = {}
+_builders_lock = threading.Lock()
+
+
+def get_docx_builder(template: Path | None = None) -> DocxBuilder:
+    """Get the shared builder for a template (None for the python-docx default).
+
+    A template edited since its builder was made is loaded again.
+
+    Raises:
+        OSError: If the template can't be read.
+    """
+    key = template.resolve() if template else None
+    signature = None
+    if key is not None:
+        st = key.stat()
+        signature = (st.st_mtime_ns, st.st_size)
+    with _builders_lock:
+        cached = _builders.get(key)
+        if cached is None or cached[0] != signature:
+            cached = (signature, DocxBuilder(key))
+            _builders[key] = cached
+        return cached[1]
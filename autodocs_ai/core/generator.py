@@ -2,14 +2,27 @@
 
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass, field
 from pathlib import Path
 
 from autodocs_ai.config import OutputFormat, RendererName, Settings, TemplateName, get_settings
+from autodocs_ai.core.bibliography import (
+    bibliography_target,
+    fetch_bibliography,
+    find_urls,
+    format_bibliography,
+    splice_bibliography,
+)
+from autodocs_ai.core.diagrams import DiagramStage, diagram_target
 from autodocs_ai.core.prompts import build_user_prompt, get_system_prompt
-from autodocs_ai.core.renderer import render
-from autodocs_ai.extractors import extract_file
+from autodocs_ai.core.renderer import render_async, render_to_bytes_async
+from autodocs_ai.core.validation import generate_validated, source_language
+from autodocs_ai.extractors import extract_files
+from autodocs_ai.extractors.cache import get_extraction_cache
 from autodocs_ai.providers import GenerationResult, get_provider
+from autodocs_ai.utils.version_index import merge_metadata
+from autodocs_ai.utils.version_queue import get_version_queue
 
 
 @dataclass
@@ -24,6 +37,10 @@ class GenerateRequest:
     language: str | None = None
     renderer: str | None = None
     provider: str | None = None
+    write_to_disk: bool = True
+    citations: list[str] = field(default_factory=list)  # Source URLs for a bibliography
+    detect_citations: bool = False  # Also cite URLs found in the prompt and input files
+    citation_style: str | None = None
 
 
 @dataclass
@@ -34,6 +51,8 @@ class GenerateResponse:
     output_format: str
     ai_result: GenerationResult
     source_content: str
+    content: bytes | None = None
+    input_errors: dict[str, str] = field(default_factory=dict)  # Input file -> error
 
 
 def _get_output_extension(output_format: str) -> str:
@@ -43,6 +62,7 @@ def _get_output_extension(output_format: str) -> str:
         "docx": ".docx",
         "html": ".html",
         "markdown": ".md",
+        "preview": ".png",
     }
     return extensions.get(output_format, ".pdf")
 
@@ -60,6 +80,21 @@ def _resolve_output_path(
     return settings.output_dir / f"document{_get_output_extension(fmt)}"
 
 
+def _diagram_stage(request: GenerateRequest, settings: Settings, fmt: str) -> DiagramStage | None:
+    """Create the Mermaid stage for a format, or None if diagrams aren't rendered."""
+    target = diagram_target(settings, fmt)
+    if not settings.mermaid_diagrams or target is None:
+        return None
+    if request.write_to_disk:
+        image_dir = _resolve_output_path(request, settings, fmt).parent / "diagrams"
+    elif target == "latex":
+        # LaTeX can only include files; Markdown falls back to inline data URIs
+        image_dir = settings.cache_dir / "diagrams"
+    else:
+        image_dir = None
+    return DiagramStage(target, settings, image_dir)
+
+
 async def generate_document(
     request: GenerateRequest,
     settings: Settings | None = None,
@@ -67,10 +102,15 @@ async def generate_document(
     """Generate a document from a prompt.
 
     This is the main orchestration function that:
-    1. Extracts content from input files (if any)
+    1. Extracts content from input files (if any), in parallel; files that fail
+       are left out and reported in each response's ``input_errors``
     2. Builds the prompt with template instructions
-    3. Calls the AI provider
-    4. Renders the output in the requested format(s)
+    3. Streams from the AI provider, retrying generations that turn out unusable and
+       rendering Mermaid diagrams as their blocks arrive, while cited sources are
+       fetched for the bibliography
+    4. Renders the output in the requested format(s), to disk or in memory
+    5. Queues documents written to the output directory for a background version
+       commit, if versioning is enabled
 
     Args:
         request: Generation parameters.
@@ -89,63 +129,165 @@ async def generate_document(
             overrides["renderer"] = request.renderer
         settings = get_settings(**overrides)
 
-    # Extract content from input files
+    # Extract content from input files, concurrently and off the event loop
     input_content = None
+    input_errors: dict[str, str] = {}
     if request.input_files:
         extracted_parts = []
-        for file_path in request.input_files:
-            path = Path(file_path)
-            if path.exists():
-                content = extract_file(path)
-                extracted_parts.append(f"--- {path.name} ---\n{content}")
+        cache = (
+            get_extraction_cache(settings.cache_dir, settings.extraction_cache_max_bytes)
+            if settings.extraction_cache
+            else None
+        )
+        extracted = await extract_files(
+            list(request.input_files),
+            settings.extraction_workers,
+            cache,
+            settings.extraction_max_chars,
+            settings.extraction_max_rows,
+            settings.extraction_max_columns,
+            settings.extraction_headers_footers,
+        )
+        for file_path, item in zip(request.input_files, extracted):
+            if item.error is not None:
+                input_errors[file_path] = item.error
+            else:
+                extracted_parts.append(f"--- {item.path.name} ---\n{item.content}")
         if extracted_parts:
             input_content = "\n\n".join(extracted_parts)
 
+    # Cited pages are fetched concurrently with the provider call
+    citation_urls = find_urls(*request.citations)
+    if request.detect_citations:
+        citation_urls = find_urls(*citation_urls, request.prompt, input_content)
+    bibliography = (
+        asyncio.ensure_future(fetch_bibliography(citation_urls, settings))
+        if citation_urls
+        else None
+    )
+    citation_style = request.citation_style or settings.citation_style
+
     # Parse output formats (supports comma-separated: "pdf,docx,html")
     formats = [f.strip() for f in request.output_format.split(",")]
 
     responses: list[GenerateResponse] = []
-    # Cache AI results per format type to avoid duplicate calls
+    # Cache AI results (and the source to render) per format type to avoid duplicate calls
     ai_cache: dict[str, tuple[GenerationResult, str]] = {}
 
-    for fmt in formats:
-        # Determine the format-specific prompt type
-        # pdf/typst and pdf/latex need different prompts, others are distinct
-        if fmt == "pdf":
-            prompt_key = settings.renderer.value
-        else:
-            prompt_key = fmt
-
-        if prompt_key not in ai_cache:
-            system_prompt = get_system_prompt(settings.renderer, fmt)
-            user_prompt = build_user_prompt(
-                prompt=request.prompt,
-                template=request.template,
-                language=settings.language,
-                input_content=input_content,
-            )
+    try:
+        for fmt in formats:
+            # Determine the format-specific prompt type
+            # pdf/typst and pdf/latex need different prompts, others are distinct;
+            # a preview is the first page of the pdf, so it shares the pdf source
+            if fmt in ("pdf", "preview"):
+                prompt_key = settings.renderer.value
+            else:
+                prompt_key = fmt
 
-            provider = get_provider(settings)
-            ai_result = await provider.generate(system_prompt, user_prompt)
-            ai_cache[prompt_key] = (ai_result, ai_result.content)
+            if prompt_key not in ai_cache:
+                system_prompt = get_system_prompt(settings.renderer, fmt, request.template)
+                user_prompt = build_user_prompt(
+                    prompt=request.prompt,
+                    template=request.template,
+                    language=settings.language,
+                    input_content=input_content,
+                    citations=citation_urls,
+                )
 
-        ai_result, source_content = ai_cache[prompt_key]
-        output_path = _resolve_output_path(request, settings, fmt)
+                # Diagrams render in the background while the response streams
+                diagrams = _diagram_stage(request, settings, fmt)
+                provider = get_provider(settings)
+                ai_result = await generate_validated(
+                    provider,
+                    system_prompt,
+                    user_prompt,
+                    source_language(settings, fmt),
+                    settings,
+                    on_text=diagrams.feed if diagrams else None,
+                    on_restart=diagrams.restart if diagrams else None,
+                )
+                render_source = ai_result.content
+                if diagrams is not None:
+                    render_source = await diagrams.apply(render_source)
+                if bibliography is not None:
+                    target = bibliography_target(settings, fmt)
+                    section = format_bibliography(await bibliography, citation_style, target)
+                    render_source = splice_bibliography(render_source, section, target)
+                ai_cache[prompt_key] = (ai_result, render_source)
 
-        rendered_path = render(
-            source=source_content,
-            output_path=output_path,
-            renderer=settings.renderer,
-            output_format=fmt,
-        )
+            ai_result, render_source = ai_cache[prompt_key]
+            output_path = _resolve_output_path(request, settings, fmt)
+
+            content = None
+            if request.write_to_disk:
+                output_path = await render_async(
+                    source=render_source,
+                    output_path=output_path,
+                    renderer=settings.renderer,
+                    output_format=fmt,
+                    settings=settings,
+                )
+            else:
+                content = await render_to_bytes_async(
+                    source=render_source,
+                    renderer=settings.renderer,
+                    output_format=fmt,
+                    settings=settings,
+                )
 
-        responses.append(
-            GenerateResponse(
-                output_path=rendered_path,
-                output_format=fmt,
-                ai_result=ai_result,
-                source_content=source_content,
+            responses.append(
+                GenerateResponse(
+                    output_path=output_path,
+                    output_format=fmt,
+                    ai_result=ai_result,
+                    source_content=ai_result.content,
+                    content=content,
+                    input_errors=input_errors,
+                )
             )
-        )
+    finally:
+        if bibliography is not None:
+            bibliography.cancel()
+
+    if settings.versioning and request.write_to_disk:
+        _queue_version(responses, request, settings)
 
     return responses
+
+
+def _queue_version(
+    responses: list[GenerateResponse], request: GenerateRequest, settings: Settings
+) -> None:
+    """Queue the documents written inside the output directory for a version commit."""
+    output_dir = settings.output_dir.resolve()
+    paths = [
+        r.output_path.resolve()
+        for r in responses
+        if r.output_path.resolve().is_relative_to(output_dir)
+    ]
+    if not paths:
+        return
+    names = ", ".join(path.name for path in paths)
+    template = f" ({request.template})" if request.template else ""
+    # Formats sharing a generation (pdf and preview) count its usage once
+    results = {id(r.ai_result): r.ai_result for r in responses}.values()
+    metadata = merge_metadata(
+        [
+            {
+                "template": request.template,
+                "provider": result.provider,
+                "model": result.model,
+                "usage": result.usage,
+            }
+            for result in results
+        ]
+    )
+    max_age_days = settings.versioning_max_age_days
+    queue = get_version_queue(
+        settings.output_dir,
+        settings.versioning_backend.value,
+        settings.versioning_debounce,
+        max_age=max_age_days * 86400 if max_age_days is not None else None,
+        max_bytes=settings.versioning_max_bytes,
+    )
+    queue.submit(paths, f"Generate {names}{template}", metadata)
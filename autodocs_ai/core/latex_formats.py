@@ -0,0 +1,152 @@
+"""Precompiled LaTeX preamble formats.
+
+LLM-generated LaTeX tends to reuse a handful of ``\\documentclass``/``\\usepackage``
+preambles. Loading those packages is often more than half the compile time, so each
+distinct preamble is dumped once into a format file and later documents are compiled
+against it, skipping the package loading entirely.
+"""
+
+from __future__ import annotations
+
+import re
+import shutil
+import tempfile
+from pathlib import Path
+
+from autodocs_ai.core.sandbox import ResourceLimits, run_process
+from autodocs_ai.utils.cache import digest, evict_lru, touch
+
+_BEGIN_DOCUMENT = re.compile(r"\\begin\s*\{document\}")
+
+
+def split_preamble(source: str) -> tuple[str, str] | None:
+    """Split LaTeX source into its preamble and document body.
+
+    Args:
+        source: Complete LaTeX source.
+
+    Returns:
+        ``(preamble, body)`` where the body starts at ``\\begin{document}``, or None
+        if the source has no recognizable preamble.
+    """
+    match = _BEGIN_DOCUMENT.search(source)
+    if not match:
+        return None
+    preamble = source[: match.start()]
+    if "\\documentclass" not in preamble:
+        return None
+    return preamble, source[match.start() :]
+
+
+class LatexFormatCache:
+    """Directory of precompiled preamble formats with LRU eviction."""
+
+    def __init__(self, cache_dir: Path, max_entries: int = 16) -> None:
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        # Preambles that could not be dumped (e.g. fontspec fonts) — don't retry them
+        self._failed: set[str] = set()
+
+    async def format_for(
+        self,
+        engine: str,
+        preamble: str,
+        limits: ResourceLimits | None = None,
+    ) -> Path | None:
+        """Get the format file for a preamble, building it on first use.
+
+        Args:
+            engine: Path to the LaTeX engine (pdflatex or xelatex).
+            preamble: Preamble source, everything before ``\\begin{document}``.
+            limits: Resource limits for the format build.
+
+        Returns:
+            Path to the ``.fmt`` file, or None if the preamble can't be precompiled.
+        """
+        engine_name = Path(engine).stem
+        key = digest(engine_name, preamble)
+        fmt_path = self.cache_dir / f"{key}.fmt"
+
+        if fmt_path.exists():
+            touch(fmt_path)
+            return fmt_path
+        if key in self._failed:
+            return None
+
+        if not await self._build(engine, engine_name, key, preamble, limits):
+            self._failed.add(key)
+            return None
+
+        evict_lru(self.cache_dir, "*.fmt", max_entries=self.max_entries)
+        return fmt_path if fmt_path.exists() else None
+
+    async def _build(
+        self,
+        engine: str,
+        engine_name: str,
+        key: str,
+        preamble: str,
+        limits: ResourceLimits | None,
+    ) -> bool:
+        """Dump a preamble into ``<key>.fmt`` inside the cache directory."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # Build next to the cache so the final move is an atomic rename
+        with tempfile.TemporaryDirectory(dir=self.cache_dir) as tmpdir:
+            workdir = Path(tmpdir)
+            (workdir / "preamble.tex").write_text(preamble + "\n\\dump\n")
+            try:
+                await run_process(
+                    [
+                        engine,
+                        "-ini",
+                        "-interaction=nonstopmode",
+                        f"-jobname={key}",
+                        f"&{engine_name}",
+                        "preamble.tex",
+                    ],
+                    cwd=workdir,
+                    limits=limits,
+                )
+            except OSError:
+                return False
+
+            built = workdir / f"{key}.fmt"
+            if not built.exists():
+                return False
+            built.replace(self.cache_dir / f"{key}.fmt")
+            return True
+
+
+def link_format(fmt_path: Path, workdir: Path) -> str:
+    """Make a cached format visible to an engine running in ``workdir``.
+
+    Engines look up formats by name through kpathsea, which always searches the
+    current directory, so the format is linked in rather than passed by path.
+
+    Args:
+        fmt_path: Cached ``.fmt`` file.
+        workdir: Directory the engine will run in.
+
+    Returns:
+        The format name to pass as ``-fmt``.
+    """
+    target = workdir / fmt_path.name
+    try:
+        target.hardlink_to(fmt_path)
+    except OSError:
+        shutil.copy2(fmt_path, target)
+    return fmt_path.stem
+
+
+_format_caches: dict[Path, LatexFormatCache] = {}
+
+
+def get_format_cache(cache_dir: Path, max_entries: int = 16) -> LatexFormatCache:
+    """Get the shared format cache for a cache directory."""
+    directory = cache_dir / "latex-formats"
+    cache = _format_caches.get(directory)
+    if cache is None:
+        cache = LatexFormatCache(directory, max_entries=max_entries)
+        _format_caches[directory] = cache
+    return cache
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from autodocs_ai.config import RendererName
+from autodocs_ai.core.typst_styles import style_preamble
 
 TYPST_SYSTEM_PROMPT = """\
 You are an expert document generator. You produce professional, well-structured \
@@ -10,15 +11,20 @@ documents using Typst markup language.
 
 Rules:
 1. Output ONLY valid Typst markup. Do not include any explanation or markdown.
-2. Use proper Typst syntax: #heading, #text, #table, #list, etc.
-3. Structure the document logically with headings, paragraphs, and appropriate formatting.
+2. Start with the document style lines given below. The style already sets up the page, \
+fonts, title block, headings and tables: do not write #set page, #set text, #set par, \
+heading show rules or table styling yourself.
+3. After the style lines, output only content: headings (=, ==), paragraphs, lists, \
+#table(...) and emphasis.
 4. Use professional language appropriate to the document type.
 5. If data or content is provided, incorporate it accurately.
 6. For diagrams, output Mermaid code blocks wrapped in ```mermaid``` fences — \
 these will be rendered separately.
+"""
 
-Template variables available (use #let if needed):
-- title, author, date, and any template-specific variables.
+TYPST_STYLE_INSTRUCTIONS = """
+Document style (fill in the arguments from the request and omit unknown ones):
+{preamble}
 """
 
 LATEX_SYSTEM_PROMPT = """\
@@ -122,8 +128,10 @@ TEMPLATE_INSTRUCTIONS: dict[str, str] = {
 }
 
 
-def get_system_prompt(renderer: RendererName, output_format: str) -> str:
-    """Get the appropriate system prompt based on renderer and output format."""
+def get_system_prompt(
+    renderer: RendererName, output_format: str, template: str | None = None
+) -> str:
+    """Get the appropriate system prompt based on renderer, output format and template."""
     if output_format == "html":
         return HTML_SYSTEM_PROMPT
     elif output_format == "markdown":
@@ -133,7 +141,9 @@ def get_system_prompt(renderer: RendererName, output_format: str) -> str:
     elif renderer == RendererName.LATEX:
         return LATEX_SYSTEM_PROMPT
     else:
-        return TYPST_SYSTEM_PROMPT
+        return TYPST_SYSTEM_PROMPT + TYPST_STYLE_INSTRUCTIONS.format(
+            preamble=style_preamble(template)
+        )
 
 
 def build_user_prompt(
@@ -141,8 +151,13 @@ def build_user_prompt(
     template: str | None = None,
     language: str = "english",
     input_content: str | None = None,
+    citations: list[str] | None = None,
 ) -> str:
-    """Build the full user prompt with template instructions and input content."""
+    """Build the full user prompt with template instructions and input content.
+
+    ``citations`` lists the URLs of the document's sources; their reference list is
+    appended to the document afterwards, so the model only cites them in the text.
+    """
     parts: list[str] = []
 
     if language.lower() != "english":
@@ -157,4 +172,13 @@ def build_user_prompt(
     if input_content:
         parts.append(f"\nInput content/data to incorporate:\n{input_content}")
 
+    if citations:
+        sources = "\n".join(f"- {url}" for url in citations)
+        parts.append(
+            f"Sources to cite:\n{sources}\n"
+            "Refer to these sources in the text where relevant. A formatted reference "
+            "list is appended automatically: do not write a references or bibliography "
+            "section yourself."
+        )
+
     return "\n\n".join(parts)
@@ -1,88 +1,226 @@
-"""Document rendering engines — Typst and LaTeX to PDF."""
+"""Document rendering engines — Typst and LaTeX to PDF, plus Typst page previews."""
 
 from __future__ import annotations
 
+import asyncio
 import shutil
 import subprocess
+import sys
 import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from importlib import metadata
 from pathlib import Path
 
-from autodocs_ai.config import RendererName
+from autodocs_ai.config import RendererName, Settings
+from autodocs_ai.core.artifact_cache import CACHEABLE_FORMATS, get_artifact_cache
+from autodocs_ai.core.docx_builder import get_docx_builder
+from autodocs_ai.core.latex_formats import (
+    LatexFormatCache,
+    get_format_cache,
+    link_format,
+    split_preamble,
+)
+from autodocs_ai.core.sandbox import ResourceLimits, describe_failure, run_process
+from autodocs_ai.core.typst_styles import TYPST_PACKAGE_PATH
+from autodocs_ai.core.typst_worker import compile_preview
 
 
 class RenderError(Exception):
     """Raised when document rendering fails."""
 
 
-def render_typst(source: str, output_path: Path) -> Path:
-    """Render Typst source to PDF.
+def _run_sync(coro):
+    """Run a coroutine to completion from synchronous code."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # Called from inside an event loop: drive a private loop on a helper thread
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+def _typst_bindings():
+    try:
+        import typst as typst_lib
+    except ImportError:
+        return None
+    return typst_lib
+
+
+def _compile_typst_in_process(typst_lib, source: str) -> bytes:
+    try:
+        return typst_lib.compile(source.encode("utf-8"), package_path=str(TYPST_PACKAGE_PATH))
+    except Exception as e:
+        raise RenderError(f"Typst compilation failed:\n{e}") from e
+
+
+def typst_to_pdf(source: str) -> bytes:
+    """Compile Typst source to PDF bytes without touching the filesystem.
 
     Args:
         source: Typst markup source code.
-        output_path: Path for the output PDF file.
 
     Returns:
-        Path to the generated PDF.
+        The PDF document.
 
     Raises:
         RenderError: If Typst compilation fails.
     """
     # Try Python typst bindings first
-    try:
-        import typst as typst_lib
+    typst_lib = _typst_bindings()
+    if typst_lib is not None:
+        return _compile_typst_in_process(typst_lib, source)
+    return _run_sync(typst_to_pdf_async(source))
+
+
+async def typst_to_pdf_async(
+    source: str,
+    limits: ResourceLimits | None = None,
+    isolate: bool = False,
+) -> bytes:
+    """Compile Typst source to PDF bytes without blocking the event loop.
+
+    Args:
+        source: Typst markup source code.
+        limits: Resource limits for the compiler process.
+        isolate: Run the Python bindings in a resource-limited child process instead
+            of a worker thread, so a runaway compile can be killed.
+
+    Returns:
+        The PDF document.
+
+    Raises:
+        RenderError: If Typst compilation fails.
+    """
+    limits = limits or ResourceLimits()
+
+    typst_lib = _typst_bindings()
+    if typst_lib is not None and not isolate:
+        return await asyncio.to_thread(_compile_typst_in_process, typst_lib, source)
+
+    if typst_lib is not None:
+        args = [sys.executable, "-m", "autodocs_ai.core.typst_worker"]
+    else:
+        # Fall back to typst CLI, streaming the source and PDF through stdin/stdout
+        typst_bin = shutil.which("typst")
+        if not typst_bin:
+            raise RenderError(
+                "Typst is not installed. Install with: autodocs setup\n"
+                "Or install the Python bindings: pip install typst"
+            )
+        args = [typst_bin, "compile", "--package-path", str(TYPST_PACKAGE_PATH)]
+        args += ["--format", "pdf", "-", "-"]
+
+    result = await run_process(args, input=source.encode("utf-8"), limits=limits)
+    if result.returncode != 0:
+        raise RenderError(f"Typst compilation failed:\n{describe_failure(result, limits)}")
+    return result.stdout
+
+
+def typst_to_png(source: str, dpi: int = 72) -> bytes:
+    """Render the first page of a Typst document to PNG.
+
+    Args:
+        source: Typst markup source code.
+        dpi: Resolution of the image.
+
+    Returns:
+        PNG bytes of page 1.
+
+    Raises:
+        RenderError: If Typst compilation fails.
+    """
+    return _run_sync(typst_to_png_async(source, dpi))
+
+
+async def typst_to_png_async(
+    source: str,
+    dpi: int = 72,
+    limits: ResourceLimits | None = None,
+    isolate: bool = False,
+) -> bytes:
+    """Render the first page of a Typst document to PNG without blocking the event loop.
+
+    Only page 1 is rasterized, which is much cheaper than a full PDF for long
+    documents and still surfaces compile errors in the opening content.
+
+    Args:
+        source: Typst markup source code.
+        dpi: Resolution of the image.
+        limits: Resource limits for the compiler process.
+        isolate: Run the Python bindings in a resource-limited child process.
+
+    Returns:
+        PNG bytes of page 1.
 
-        with tempfile.NamedTemporaryFile(suffix=".typ", mode="w", delete=False) as f:
-            f.write(source)
-            f.flush()
-            typ_path = Path(f.name)
+    Raises:
+        RenderError: If Typst compilation fails.
+    """
+    limits = limits or ResourceLimits()
 
+    typst_lib = _typst_bindings()
+    if typst_lib is not None and not isolate:
         try:
-            pdf_bytes = typst_lib.compile(typ_path)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            output_path.write_bytes(pdf_bytes)
-            return output_path
-        finally:
-            typ_path.unlink(missing_ok=True)
-    except ImportError:
-        pass
+            return await asyncio.to_thread(compile_preview, typst_lib, source, dpi)
+        except Exception as e:
+            raise RenderError(f"Typst compilation failed:\n{e}") from e
 
-    # Fall back to typst CLI
-    typst_bin = shutil.which("typst")
-    if not typst_bin:
-        raise RenderError(
-            "Typst is not installed. Install with: autodocs setup\n"
-            "Or install the Python bindings: pip install typst"
-        )
+    if typst_lib is not None:
+        args = [sys.executable, "-m", "autodocs_ai.core.typst_worker", "--preview", str(dpi)]
+    else:
+        typst_bin = shutil.which("typst")
+        if not typst_bin:
+            raise RenderError(
+                "Typst is not installed. Install with: autodocs setup\n"
+                "Or install the Python bindings: pip install typst"
+            )
+        args = [typst_bin, "compile", "--package-path", str(TYPST_PACKAGE_PATH)]
+        args += ["--format", "png", "--ppi", str(dpi), "--pages", "1", "-", "-"]
 
-    with tempfile.NamedTemporaryFile(suffix=".typ", mode="w", delete=False) as f:
-        f.write(source)
-        f.flush()
-        typ_path = Path(f.name)
+    result = await run_process(args, input=source.encode("utf-8"), limits=limits)
+    if result.returncode != 0:
+        raise RenderError(f"Typst compilation failed:\n{describe_failure(result, limits)}")
+    return result.stdout
 
-    try:
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        result = subprocess.run(
-            [typst_bin, "compile", str(typ_path), str(output_path)],
-            capture_output=True,
-            text=True,
-            timeout=60,
-        )
-        if result.returncode != 0:
-            raise RenderError(f"Typst compilation failed:\n{result.stderr}")
-        return output_path
-    finally:
-        typ_path.unlink(missing_ok=True)
 
+def latex_to_pdf(source: str, format_cache: LatexFormatCache | None = None) -> bytes:
+    """Compile LaTeX source to PDF bytes.
 
-def render_latex(source: str, output_path: Path) -> Path:
-    """Render LaTeX source to PDF.
+    Args:
+        source: LaTeX source code.
+        format_cache: Optional cache of precompiled preambles (see ``latex_to_pdf_async``).
+
+    Returns:
+        The PDF document.
+
+    Raises:
+        RenderError: If LaTeX compilation fails.
+    """
+    return _run_sync(latex_to_pdf_async(source, format_cache))
+
+
+async def latex_to_pdf_async(
+    source: str,
+    format_cache: LatexFormatCache | None = None,
+    limits: ResourceLimits | None = None,
+) -> bytes:
+    """Compile LaTeX source to PDF bytes in resource-limited engine processes.
+
+    LaTeX engines only work on files, so compilation happens in a scratch directory
+    that is removed before returning.
 
     Args:
         source: LaTeX source code.
-        output_path: Path for the output PDF file.
+        format_cache: Optional cache of precompiled preambles. When given, the body is
+            compiled against the cached format and falls back to a full compile if the
+            format can't be built or used.
+        limits: Resource limits for each engine process.
 
     Returns:
-        Path to the generated PDF.
+        The PDF document.
 
     Raises:
         RenderError: If LaTeX compilation fails.
@@ -93,27 +231,131 @@ def render_latex(source: str, output_path: Path) -> Path:
             "LaTeX is not installed. Install with: autodocs setup --latex\n"
             "Or install TinyTeX manually: https://yihui.org/tinytex/"
         )
+    limits = limits or ResourceLimits()
 
     with tempfile.TemporaryDirectory() as tmpdir:
-        tex_path = Path(tmpdir) / "document.tex"
-        tex_path.write_text(source)
-
-        # Run twice for cross-references
-        for _ in range(2):
-            result = subprocess.run(
-                [pdflatex, "-interaction=nonstopmode", "-output-directory", tmpdir, str(tex_path)],
-                capture_output=True,
-                text=True,
-                timeout=120,
-            )
+        workdir = Path(tmpdir)
+        pdf_path = None
 
-        pdf_path = Path(tmpdir) / "document.pdf"
-        if not pdf_path.exists():
-            raise RenderError(f"LaTeX compilation failed:\n{result.stderr}")
+        parts = split_preamble(source) if format_cache is not None else None
+        if parts is not None:
+            preamble, body = parts
+            fmt_path = await format_cache.format_for(pdflatex, preamble, limits)
+            if fmt_path is not None:
+                fmt_name = link_format(fmt_path, workdir)
+                pdf_path, _ = await _run_latex(pdflatex, workdir, body, limits, fmt_name)
 
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(pdf_path, output_path)
-        return output_path
+        if pdf_path is None:
+            pdf_path, stderr = await _run_latex(pdflatex, workdir, source, limits)
+            if pdf_path is None:
+                raise RenderError(f"LaTeX compilation failed:\n{stderr}")
+
+        return pdf_path.read_bytes()
+
+
+async def _run_latex(
+    engine: str,
+    workdir: Path,
+    source: str,
+    limits: ResourceLimits,
+    fmt_name: str | None = None,
+) -> tuple[Path | None, str]:
+    """Compile ``source`` in ``workdir``, optionally against a precompiled format.
+
+    Returns:
+        The PDF path (None if compilation produced no output) and the engine's stderr.
+    """
+    tex_path = workdir / "document.tex"
+    pdf_path = workdir / "document.pdf"
+    tex_path.write_text(source)
+    pdf_path.unlink(missing_ok=True)
+
+    args = [engine, "-interaction=nonstopmode", "-output-directory", str(workdir)]
+    if fmt_name:
+        args.append(f"-fmt={fmt_name}")
+    args.append(str(tex_path))
+
+    # Run twice for cross-references
+    for _ in range(2):
+        result = await run_process(args, cwd=workdir, limits=limits)
+
+    return (pdf_path if pdf_path.exists() else None), describe_failure(result, limits)
+
+
+def markdown_to_docx(source: str, template: Path | None = None) -> bytes:
+    """Convert Markdown source to DOCX bytes.
+
+    Args:
+        source: Markdown source.
+        template: Optional .docx/.dotx file providing styles and page setup.
+
+    Returns:
+        The DOCX document.
+
+    Raises:
+        RenderError: If DOCX generation fails.
+    """
+    try:
+        import docx  # noqa: F401
+    except ImportError:
+        raise RenderError(
+            "python-docx is required for DOCX output. "
+            "Install with: pip install autodocs-ai[extractors]"
+        )
+
+    try:
+        builder = get_docx_builder(template)
+    except Exception as e:
+        raise RenderError(f"Failed to load DOCX template {template}: {e}") from e
+
+    return builder.build(source)
+
+
+def _write(output_path: Path, data: bytes) -> Path:
+    # Replace rather than rewrite in place: the existing file may be a hard link
+    # into the artifact cache or a versioning store.
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(f".{output_path.name}.tmp")
+    tmp_path.write_bytes(data)
+    tmp_path.replace(output_path)
+    return output_path
+
+
+def render_typst(source: str, output_path: Path) -> Path:
+    """Render Typst source to PDF.
+
+    Args:
+        source: Typst markup source code.
+        output_path: Path for the output PDF file.
+
+    Returns:
+        Path to the generated PDF.
+
+    Raises:
+        RenderError: If Typst compilation fails.
+    """
+    return _write(output_path, typst_to_pdf(source))
+
+
+def render_latex(
+    source: str,
+    output_path: Path,
+    format_cache: LatexFormatCache | None = None,
+) -> Path:
+    """Render LaTeX source to PDF.
+
+    Args:
+        source: LaTeX source code.
+        output_path: Path for the output PDF file.
+        format_cache: Optional cache of precompiled preambles (see ``latex_to_pdf``).
+
+    Returns:
+        Path to the generated PDF.
+
+    Raises:
+        RenderError: If LaTeX compilation fails.
+    """
+    return _write(output_path, latex_to_pdf(source, format_cache))
 
 
 def render_html(source: str, output_path: Path) -> Path:
@@ -126,9 +368,7 @@ def render_html(source: str, output_path: Path) -> Path:
     Returns:
         Path to the generated HTML file.
     """
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(source)
-    return output_path
+    return _write(output_path, source.encode("utf-8"))
 
 
 def render_markdown(source: str, output_path: Path) -> Path:
@@ -141,17 +381,16 @@ def render_markdown(source: str, output_path: Path) -> Path:
     Returns:
         Path to the generated Markdown file.
     """
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(source)
-    return output_path
+    return _write(output_path, source.encode("utf-8"))
 
 
-def render_docx(source: str, output_path: Path) -> Path:
+def render_docx(source: str, output_path: Path, template: Path | None = None) -> Path:
     """Convert Markdown source to DOCX.
 
     Args:
         source: Markdown source (will be converted to DOCX).
         output_path: Path for the output DOCX file.
+        template: Optional .docx/.dotx file providing styles and page setup.
 
     Returns:
         Path to the generated DOCX file.
@@ -159,41 +398,71 @@ def render_docx(source: str, output_path: Path) -> Path:
     Raises:
         RenderError: If DOCX generation fails.
     """
+    return _write(output_path, markdown_to_docx(source, template))
+
+
+@cache
+def engine_version(engine: str) -> str:
+    """Get a version string for a rendering engine, used to key cached artifacts.
+
+    Args:
+        engine: Engine name (typst, latex, docx).
+
+    Returns:
+        Version string, or "unknown" if it can't be determined.
+    """
+    if engine == "docx":
+        return _package_version("python-docx")
+    if engine == "typst":
+        version = _package_version("typst")
+        if version != "unknown":
+            return f"py-{version}"
+        return _binary_version(shutil.which("typst"))
+    if engine == "latex":
+        return _binary_version(shutil.which("pdflatex") or shutil.which("xelatex"))
+    return "unknown"
+
+
+def _package_version(name: str) -> str:
     try:
-        from docx import Document
-    except ImportError:
-        raise RenderError(
-            "python-docx is required for DOCX output. "
-            "Install with: pip install autodocs-ai[extractors]"
-        )
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return "unknown"
 
-    doc = Document()
-    lines = source.split("\n")
-
-    for line in lines:
-        stripped = line.strip()
-        if not stripped:
-            continue
-
-        if stripped.startswith("# "):
-            doc.add_heading(stripped[2:], level=1)
-        elif stripped.startswith("## "):
-            doc.add_heading(stripped[3:], level=2)
-        elif stripped.startswith("### "):
-            doc.add_heading(stripped[4:], level=3)
-        elif stripped.startswith("- ") or stripped.startswith("* "):
-            doc.add_paragraph(stripped[2:], style="List Bullet")
-        elif stripped[0:3].rstrip(".").isdigit() and ". " in stripped:
-            text = stripped.split(". ", 1)[1]
-            doc.add_paragraph(text, style="List Number")
-        elif stripped.startswith("---"):
-            doc.add_page_break()
-        else:
-            doc.add_paragraph(stripped)
 
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    doc.save(str(output_path))
-    return output_path
+def _binary_version(binary: str | None) -> str:
+    if not binary:
+        return "unknown"
+    try:
+        result = subprocess.run([binary, "--version"], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return "unknown"
+    lines = result.stdout.strip().splitlines()
+    return lines[0] if lines else "unknown"
+
+
+def _cache_key(
+    source: str,
+    renderer: RendererName,
+    output_format: str,
+    settings: Settings,
+) -> str | None:
+    """Compute the artifact cache key for a render, or None if it isn't cached."""
+    if not settings.artifact_cache or output_format not in CACHEABLE_FORMATS:
+        return None
+
+    engine = renderer.value if output_format in ("pdf", "preview") else output_format
+    version = engine_version(engine)
+    if output_format == "preview":
+        version += f"+{settings.preview_dpi}dpi"
+    if output_format == "docx" and settings.docx_template:
+        try:
+            stat = settings.docx_template.stat()
+        except OSError:
+            return None  # Not cached; the builder reports the missing template
+        version += f"+{settings.docx_template.resolve()}:{stat.st_mtime_ns}:{stat.st_size}"
+    cache = get_artifact_cache(settings.cache_dir, settings.artifact_cache_max_bytes)
+    return cache.key(source, engine, output_format, version)
 
 
 def render(
@@ -201,6 +470,7 @@ def render(
     output_path: Path,
     renderer: RendererName = RendererName.TYPST,
     output_format: str = "pdf",
+    settings: Settings | None = None,
 ) -> Path:
     """Render source content to the specified output format.
 
@@ -208,21 +478,119 @@ def render(
         source: The source content to render.
         output_path: Path for the output file.
         renderer: Which rendering engine to use (typst or latex).
-        output_format: Output format (pdf, docx, html, markdown).
+        output_format: Output format (pdf, docx, html, markdown, or preview for a
+            PNG of the first page).
+        settings: Optional settings enabling the render caches and resource limits.
 
     Returns:
         Path to the generated file.
     """
-    if output_format == "html":
-        return render_html(source, output_path)
-    elif output_format == "markdown":
-        return render_markdown(source, output_path)
+    return _run_sync(render_async(source, output_path, renderer, output_format, settings))
+
+
+async def render_async(
+    source: str,
+    output_path: Path,
+    renderer: RendererName = RendererName.TYPST,
+    output_format: str = "pdf",
+    settings: Settings | None = None,
+) -> Path:
+    """Render source content without blocking the event loop.
+
+    Engine processes are killed if the awaiting task is cancelled. See ``render``.
+    """
+    key = _cache_key(source, renderer, output_format, settings) if settings else None
+    if key is None:
+        data = await _render_bytes(source, renderer, output_format, settings)
+        return _write(output_path, data)
+
+    cache = get_artifact_cache(settings.cache_dir, settings.artifact_cache_max_bytes)
+    if cache.fetch(key, output_path):
+        return output_path
+
+    start = time.perf_counter()
+    _write(output_path, await _render_bytes(source, renderer, output_format, settings))
+    cache.store(key, output_path, time.perf_counter() - start)
+    return output_path
+
+
+def render_to_bytes(
+    source: str,
+    renderer: RendererName = RendererName.TYPST,
+    output_format: str = "pdf",
+    settings: Settings | None = None,
+) -> bytes:
+    """Render source content in memory, without writing an output file.
+
+    Args:
+        source: The source content to render.
+        renderer: Which rendering engine to use (typst or latex).
+        output_format: Output format (pdf, docx, html, markdown, or preview for a
+            PNG of the first page).
+        settings: Optional settings enabling the render caches and resource limits.
+
+    Returns:
+        The rendered document.
+    """
+    return _run_sync(render_to_bytes_async(source, renderer, output_format, settings))
+
+
+async def render_to_bytes_async(
+    source: str,
+    renderer: RendererName = RendererName.TYPST,
+    output_format: str = "pdf",
+    settings: Settings | None = None,
+) -> bytes:
+    """Render source content in memory without blocking the event loop.
+
+    Engine processes are killed if the awaiting task is cancelled. See
+    ``render_to_bytes``.
+    """
+    key = _cache_key(source, renderer, output_format, settings) if settings else None
+    if key is None:
+        return await _render_bytes(source, renderer, output_format, settings)
+
+    cache = get_artifact_cache(settings.cache_dir, settings.artifact_cache_max_bytes)
+    data = cache.get_bytes(key)
+    if data is not None:
+        return data
+
+    start = time.perf_counter()
+    data = await _render_bytes(source, renderer, output_format, settings)
+    cache.put_bytes(key, data, time.perf_counter() - start)
+    return data
+
+
+async def _render_bytes(
+    source: str,
+    renderer: RendererName,
+    output_format: str,
+    settings: Settings | None,
+) -> bytes:
+    if output_format in ("html", "markdown"):
+        return source.encode("utf-8")
     elif output_format == "docx":
-        return render_docx(source, output_path)
-    elif output_format == "pdf":
-        if renderer == RendererName.LATEX:
-            return render_latex(source, output_path)
-        else:
-            return render_typst(source, output_path)
-    else:
+        template = settings.docx_template if settings is not None else None
+        return await asyncio.to_thread(markdown_to_docx, source, template)
+    elif output_format not in ("pdf", "preview"):
         raise RenderError(f"Unsupported output format: {output_format}")
+
+    limits = ResourceLimits.from_settings(settings) if settings else ResourceLimits()
+    isolate = settings.render_isolation if settings is not None else False
+    if output_format == "preview":
+        if renderer != RendererName.TYPST:
+            raise RenderError("Preview output is only supported by the Typst renderer")
+        dpi = settings.preview_dpi if settings is not None else 72
+        compile_document = typst_to_png_async(source, dpi, limits, isolate)
+    elif renderer == RendererName.LATEX:
+        format_cache = None
+        if settings is not None and settings.latex_format_cache:
+            format_cache = get_format_cache(settings.cache_dir, settings.latex_format_cache_size)
+        compile_document = latex_to_pdf_async(source, format_cache, limits)
+    else:
+        compile_document = typst_to_pdf_async(source, limits, isolate)
+
+    try:
+        return await asyncio.wait_for(compile_document, limits.timeout)
+    except asyncio.TimeoutError:
+        raise RenderError(f"Rendering exceeded its {limits.timeout:g}s time budget") from None
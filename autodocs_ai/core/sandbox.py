@@ -0,0 +1,157 @@
+"""Resource-limited, cancellable subprocesses for the rendering engines.
+
+LLM-generated documents can be pathological (runaway loops, enormous tables), so every
+engine process gets CPU-time and memory rlimits, runs in its own process group, and is
+killed as soon as the awaiting task is cancelled or runs out of wall-clock budget.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import os
+import signal
+import sys
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from autodocs_ai.config import Settings
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Linux can set a running child's rlimits from the parent
+_HAS_PRLIMIT = hasattr(resource, "prlimit")
+
+
+@dataclass
+class ResourceLimits:
+    """Limits applied to a single render."""
+
+    timeout: float = 120.0  # Wall-clock budget for the whole render, in seconds
+    cpu_seconds: int | None = 60  # CPU time per engine process
+    memory_mb: int | None = 2048  # Address space per engine process
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> ResourceLimits:
+        return cls(
+            timeout=settings.render_timeout,
+            cpu_seconds=settings.render_cpu_seconds,
+            memory_mb=settings.render_memory_mb,
+        )
+
+
+@dataclass
+class ProcessResult:
+    """Outcome of a finished subprocess."""
+
+    returncode: int
+    stdout: bytes
+    stderr: bytes
+
+
+def _rlimits(limits: ResourceLimits) -> list[tuple[int, tuple[int, int]]]:
+    """The rlimits to apply to an engine process (none on Windows)."""
+    if resource is None:
+        return []
+    rlimits = []
+    if limits.cpu_seconds is not None:
+        # Soft limit sends SIGXCPU; the hard limit one second later is a SIGKILL
+        rlimits.append((resource.RLIMIT_CPU, (limits.cpu_seconds, limits.cpu_seconds + 1)))
+    if limits.memory_mb is not None:
+        size = limits.memory_mb * 1024 * 1024
+        rlimits.append((resource.RLIMIT_AS, (size, size)))
+    return rlimits
+
+
+def _limit_resources(limits: ResourceLimits) -> Callable[[], None] | None:
+    """Build a ``preexec_fn`` applying rlimits in the child, where ``prlimit`` is missing.
+
+    ``preexec_fn`` runs Python between fork and exec, which can deadlock in a
+    multi-threaded parent such as the API server, so it is only a fallback for
+    platforms without ``prlimit`` (macOS).
+    """
+    rlimits = _rlimits(limits)
+    if not rlimits or _HAS_PRLIMIT:
+        return None
+
+    def apply() -> None:
+        for resource_id, values in rlimits:
+            resource.setrlimit(resource_id, values)
+
+    return apply
+
+
+def _kill(process: asyncio.subprocess.Process) -> None:
+    """Kill a process and everything it spawned."""
+    with contextlib.suppress(ProcessLookupError):
+        if sys.platform == "win32":
+            process.kill()
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+
+
+async def run_process(
+    args: list[str],
+    *,
+    input: bytes | None = None,
+    cwd: Path | None = None,
+    limits: ResourceLimits | None = None,
+) -> ProcessResult:
+    """Run a command under resource limits, killing it if the caller is cancelled.
+
+    Wall-clock budgets are enforced by the caller (``asyncio.wait_for`` around the
+    whole render) — cancellation propagates here and kills the process group.
+
+    Args:
+        args: Command and arguments.
+        input: Bytes to send on stdin.
+        cwd: Working directory.
+        limits: CPU and memory limits for the process.
+
+    Returns:
+        The exit code and captured output.
+
+    Raises:
+        OSError: If the command can't be started.
+    """
+    limits = limits or ResourceLimits()
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        stdin=asyncio.subprocess.PIPE if input is not None else asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=str(cwd) if cwd else None,
+        preexec_fn=_limit_resources(limits),
+        start_new_session=sys.platform != "win32",
+    )
+    if _HAS_PRLIMIT:
+        # Limit the child from the parent; it has only just exec'd the engine
+        try:
+            for resource_id, values in _rlimits(limits):
+                resource.prlimit(process.pid, resource_id, values)
+        except ProcessLookupError:
+            pass  # Already exited
+        except (OSError, ValueError):
+            _kill(process)
+            await process.wait()
+            raise
+    try:
+        stdout, stderr = await process.communicate(input)
+    except BaseException:
+        _kill(process)
+        await process.wait()
+        raise
+    return ProcessResult(process.returncode, stdout, stderr)
+
+
+def describe_failure(result: ProcessResult, limits: ResourceLimits) -> str:
+    """Explain a failed process, calling out rlimit kills."""
+    stderr = result.stderr.decode(errors="replace")
+    killed = {-getattr(signal, name) for name in ("SIGXCPU", "SIGKILL") if hasattr(signal, name)}
+    if result.returncode in killed and limits.cpu_seconds:
+        return f"{stderr}\n(killed after exceeding {limits.cpu_seconds}s of CPU time)".strip()
+    return stderr
@@ -0,0 +1,113 @@
+"""Lightweight structural scanning of Typst source.
+
+This is not a parser: it tracks just enough of Typst's syntax (code/content nesting,
+strings, raw blocks, math and comments) to find the blank lines that separate
+top-level blocks, where the source can be cut and still compile.
+"""
+
+from __future__ import annotations
+
+_IDENT_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-.")
+_CLOSERS = {"(": ")", "[": "]", "{": "}"}
+
+
+def top_level_boundaries(source: str) -> list[int]:
+    """Find the offsets of blank lines that separate top-level blocks.
+
+    Args:
+        source: Typst source.
+
+    Returns:
+        Offsets (just past the blank line) at which everything before is a sequence
+        of complete top-level blocks.
+    """
+    boundaries: list[int] = []
+    stack: list[str] = []
+    n = len(source)
+    i = 0
+
+    while i < n:
+        char = source[i]
+        in_code = bool(stack) and stack[-1] in "({"
+
+        if source.startswith("//", i) and not source.startswith("://", i - 1):
+            end = source.find("\n", i)
+            i = n if end == -1 else end
+            continue
+        if source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            continue
+        if char == "\\" and not in_code:
+            i += 2
+            continue
+        if char == "`":
+            fence = 3 if source.startswith("```", i) else 1
+            end = source.find("`" * fence, i + fence)
+            i = n if end == -1 else end + fence
+            continue
+        if char == "$" and not in_code:
+            end = i + 1
+            while end < n and (source[end] != "$" or source[end - 1] == "\\"):
+                end += 1
+            i = end + 1
+            continue
+        if char == '"' and in_code:
+            end = i + 1
+            while end < n and source[end] != '"':
+                end += 2 if source[end] == "\\" else 1
+            i = end + 1
+            continue
+
+        if char == "#" and not in_code:
+            # Embedded expression: `#name`, `#name.field(...)`, `#{...}`, `#(...)`, `#[...]`
+            i += 1
+            while i < n and source[i] in _IDENT_CHARS:
+                i += 1
+            if i < n and source[i] in "([{":
+                stack.append(source[i])
+                i += 1
+            continue
+        if in_code and char in "([{":
+            stack.append(char)
+            i += 1
+            continue
+        if stack and char == _CLOSERS[stack[-1]]:
+            stack.pop()
+            i += 1
+            # Trailing content or argument blocks continue the same call
+            if i < n and source[i] in "([":
+                stack.append(source[i])
+                i += 1
+            continue
+
+        if char == "\n" and not stack:
+            end = i + 1
+            while end < n and source[end] in " \t\r":
+                end += 1
+            if end < n and source[end] == "\n":
+                boundaries.append(end + 1)
+                i = end + 1
+                continue
+        i += 1
+
+    return boundaries
+
+
+def top_level_prefix(source: str, min_chars: int) -> str:
+    """Cut source at the first top-level block boundary past ``min_chars``.
+
+    Args:
+        source: Typst source.
+        min_chars: Minimum length of the prefix.
+
+    Returns:
+        A prefix made of complete top-level blocks, or the whole source if it is
+        shorter than ``min_chars`` or has no suitable boundary.
+    """
+    if len(source) <= min_chars:
+        return source
+    for boundary in top_level_boundaries(source):
+        if boundary >= min_chars:
+            return source[:boundary]
+    return source
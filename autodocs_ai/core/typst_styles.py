@@ -0,0 +1,64 @@
+"""Bundled Typst document styles.
+
+Page setup, typography, heading and table styling live in a local Typst package
+shipped with autodocs-ai (``templates/packages/local/autodocs``). Generated documents
+import it and apply one style with a show rule, so the model only writes content.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+
+# Passed to Typst as the package path, so "@local/autodocs" resolves to the bundle
+TYPST_PACKAGE_PATH = Path(__file__).resolve().parent.parent / "templates" / "packages"
+STYLE_PACKAGE = "@local/autodocs:0.1.0"
+
+
+@dataclass
+class TypstStyle:
+    """A style function exported by the bundled package."""
+
+    name: str
+    arguments: str  # Example arguments shown to the model
+
+
+DEFAULT_STYLE = TypstStyle("autodocs-base", 'title: "...", author: "...", date: "..."')
+
+TEMPLATE_STYLES: dict[str, TypstStyle] = {
+    "resume": TypstStyle(
+        "resume",
+        'name: "...", title: "...", email: "...", phone: "...", location: "...", website: "..."',
+    ),
+    "invoice": TypstStyle(
+        "invoice",
+        'invoice-number: "...", date: "...", due-date: "...", from-name: "...", '
+        'from-address: [...], to-name: "...", to-address: [...]',
+    ),
+    "proposal": TypstStyle(
+        "proposal",
+        'title: "...", author: "...", company: "...", date: "...", client: "..."',
+    ),
+    "report": TypstStyle(
+        "report",
+        'title: "...", author: "...", organization: "...", date: "...", abstract: [...]',
+    ),
+}
+
+
+def style_for(template: str | None) -> TypstStyle:
+    """Get the style for a template, falling back to the base style."""
+    return TEMPLATE_STYLES.get(template or "", DEFAULT_STYLE)
+
+
+def style_preamble(template: str | None) -> str:
+    """Build the lines that import and apply the style for a template.
+
+    Args:
+        template: Template name, or None for the base style.
+
+    Returns:
+        Typst source for the top of a generated document.
+    """
+    style = style_for(template)
+    return f'#import "{STYLE_PACKAGE}": {style.name}\n#show: {style.name}.with({style.arguments})'
@@ -0,0 +1,69 @@
+"""Run the Typst Python bindings in a child process.
+
+The bindings compile in-process and can't be interrupted, so sandboxed renders run
+them here instead: source on stdin, document on stdout, errors on stderr.
+
+Usage: python -m autodocs_ai.core.typst_worker [--preview PPI]
+"""
+
+from __future__ import annotations
+
+import sys
+
+from autodocs_ai.core.typst_source import top_level_prefix
+from autodocs_ai.core.typst_styles import TYPST_PACKAGE_PATH
+
+# Enough source for a full first page; the rest of the document is not laid out
+PREVIEW_PREFIX_CHARS = 6000
+
+
+def compile_preview(typst_lib, source: str, ppi: int) -> bytes:
+    """Compile the first page of a Typst document to PNG.
+
+    The bindings can't select pages, so only a prefix of the source cut at a
+    top-level block boundary is compiled. Documents whose first page depends on
+    later content (an outline) or whose prefix doesn't compile on its own are
+    compiled in full instead.
+
+    Args:
+        typst_lib: The imported ``typst`` module.
+        source: Typst markup source code.
+        ppi: Resolution of the image, in pixels per inch.
+
+    Returns:
+        PNG bytes of the first page.
+    """
+    prefix = source if "#outline" in source else top_level_prefix(source, PREVIEW_PREFIX_CHARS)
+    try:
+        pages = _compile_png(typst_lib, prefix, ppi)
+    except Exception:
+        if prefix is source:
+            raise
+        pages = _compile_png(typst_lib, source, ppi)
+    return pages[0] if isinstance(pages, list) else pages
+
+
+def _compile_png(typst_lib, source: str, ppi: int):
+    return typst_lib.compile(
+        source.encode("utf-8"), format="png", ppi=ppi, package_path=str(TYPST_PACKAGE_PATH)
+    )
+
+
+def main() -> int:
+    import typst
+
+    source = sys.stdin.buffer.read()
+    try:
+        if sys.argv[1:2] == ["--preview"]:
+            document = compile_preview(typst, source.decode("utf-8"), int(sys.argv[2]))
+        else:
+            document = typst.compile(source, package_path=str(TYPST_PACKAGE_PATH))
+    except Exception as e:
+        sys.stderr.write(str(e))
+        return 1
+    sys.stdout.buffer.write(document)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""Incremental validation of generated document source.
+
+Models occasionally wrap documents in Markdown fences, open with conversational prose,
+or emit source that won't compile. The validator watches the response while it
+streams, so such generations are cancelled (and retried) as soon as they're clearly
+unusable instead of after the full completion and a failed render.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from collections.abc import Callable
+
+from autodocs_ai.config import Settings
+from autodocs_ai.core.renderer import RenderError, typst_to_pdf_async
+from autodocs_ai.core.sandbox import ResourceLimits
+from autodocs_ai.core.typst_source import top_level_boundaries
+from autodocs_ai.providers import AIProvider, GenerationResult
+
+# Openers of chatty replies ("Sure! Here is your document:")
+_PROSE_OPENER = re.compile(
+    r"^(?:sure|certainly|of course|okay|absolutely|here(?:'s| is| are)|below is"
+    r"|i(?:'ve| have) (?:created|generated|written|prepared))\b",
+    re.IGNORECASE,
+)
+# Compile errors that are the model's fault wherever the prefix was cut; missing
+# labels, files and fonts are not fatal since the full document may still resolve them
+# The typst CLI prefixes its diagnostics with "error: "; typst-py doesn't
+_FATAL_TYPST_ERROR = re.compile(
+    r"^(?:error:\s*)?(?:expected |unexpected |unclosed |unknown variable)",
+    re.IGNORECASE | re.MULTILINE,
+)
+# How much LaTeX to accept before insisting on a \documentclass
+_LATEX_CLASS_WINDOW = 2000
+
+
+class InvalidGenerationError(Exception):
+    """Raised when generated source is clearly unusable."""
+
+
+class StreamValidator:
+    """Checks a streaming response for unusable output.
+
+    ``feed`` is called with each chunk. It raises ``InvalidGenerationError`` as soon
+    as the text seen so far can't become a valid document. For Typst, the complete
+    top-level blocks received so far are compiled in the background, at most once
+    per ``check_interval`` seconds, and syntax errors fail the next ``feed``.
+
+    Args:
+        language: Source language: ``typst``, ``latex`` or ``html``. Anything else
+            (Markdown) is accepted as-is.
+        check_interval: Minimum seconds between speculative compiles.
+        limits: Resource limits for the speculative compiles.
+        isolate: Compile in a child process rather than a worker thread.
+    """
+
+    def __init__(
+        self,
+        language: str | None,
+        check_interval: float = 1.0,
+        limits: ResourceLimits | None = None,
+        isolate: bool = False,
+    ) -> None:
+        self.language = language
+        self.check_interval = check_interval
+        self.limits = limits or ResourceLimits()
+        self.isolate = isolate
+        self.text = ""
+        self.error: InvalidGenerationError | None = None
+        self._head_checked = False
+        self._checked_upto = 0
+        self._last_check = 0.0
+        self._check: asyncio.Task | None = None
+
+    def feed(self, chunk: str) -> None:
+        """Add a chunk of the response.
+
+        Raises:
+            InvalidGenerationError: If the response is unusable.
+        """
+        if self.error:
+            raise self.error
+        self.text += chunk
+        if self.language not in ("typst", "latex", "html"):
+            return
+
+        if not self._head_checked:
+            self._check_head(final=False)
+        if self.language == "latex" and "\\documentclass" not in self.text[:_LATEX_CLASS_WINDOW]:
+            if len(self.text) >= _LATEX_CLASS_WINDOW:
+                self._fail("LaTeX output has no \\documentclass")
+        if self.language == "typst":
+            self._maybe_compile()
+
+    async def finish(self) -> None:
+        """Run the remaining checks once the response is complete.
+
+        Raises:
+            InvalidGenerationError: If the response is unusable.
+        """
+        if self._check is not None:
+            await asyncio.gather(self._check, return_exceptions=True)
+        if self.error:
+            raise self.error
+        if self.language not in ("typst", "latex", "html"):
+            return
+        if not self._head_checked:
+            self._check_head(final=True)
+        if self.language == "latex" and "\\documentclass" not in self.text:
+            self._fail("LaTeX output has no \\documentclass")
+
+    def close(self) -> None:
+        """Cancel any speculative compile still running."""
+        if self._check is not None:
+            self._check.cancel()
+
+    def _fail(self, reason: str) -> None:
+        self.error = InvalidGenerationError(reason)
+        raise self.error
+
+    def _check_head(self, final: bool) -> None:
+        """Check how the response opens, once there's a full first line."""
+        head = self.text.lstrip()
+        if "\n" not in head and not final:
+            return
+        self._head_checked = True
+
+        if head.startswith(("```", "~~~")) and not head[3:].lstrip().startswith("mermaid"):
+            self._fail("Output is wrapped in a Markdown code fence")
+        first_line = head.split("\n", 1)[0].strip()
+        if _PROSE_OPENER.match(first_line):
+            self._fail(f"Output starts with conversational prose: {first_line[:80]!r}")
+        if self.language == "latex" and not first_line.startswith(("\\", "%")):
+            self._fail(f"LaTeX output starts with prose: {first_line[:80]!r}")
+        if self.language == "html" and not first_line.startswith("<"):
+            self._fail(f"HTML output starts with prose: {first_line[:80]!r}")
+
+    def _maybe_compile(self) -> None:
+        """Start a speculative compile of the complete top-level blocks, if due."""
+        if self._check is not None and not self._check.done():
+            return
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        boundaries = top_level_boundaries(self.text)
+        if not boundaries or boundaries[-1] <= self._checked_upto:
+            return
+
+        self._checked_upto = boundaries[-1]
+        self._last_check = now
+        self._check = asyncio.ensure_future(self._compile(self.text[: self._checked_upto]))
+
+    async def _compile(self, prefix: str) -> None:
+        try:
+            await typst_to_pdf_async(prefix, self.limits, self.isolate)
+        except RenderError as e:
+            if _FATAL_TYPST_ERROR.search(str(e).split("\n", 1)[-1]):
+                self.error = InvalidGenerationError(f"Typst source does not compile: {e}")
+
+
+def source_language(settings: Settings, output_format: str) -> str | None:
+    """Get the language the model is asked to write for an output format."""
+    if output_format in ("pdf", "preview"):
+        return settings.renderer.value
+    if output_format == "html":
+        return "html"
+    return None
+
+
+async def generate_validated(
+    provider: AIProvider,
+    system_prompt: str,
+    user_prompt: str,
+    language: str | None,
+    settings: Settings,
+    on_text: Callable[[str], None] | None = None,
+    on_restart: Callable[[], None] | None = None,
+) -> GenerationResult:
+    """Stream a generation, cancelling and retrying it if it turns out unusable.
+
+    The last attempt is not validated, so a persistently misbehaving model still
+    produces output for the renderer to report on.
+
+    Args:
+        provider: The AI provider.
+        system_prompt: The system-level instruction for the AI.
+        user_prompt: The user's request/content.
+        language: Source language being generated (see ``StreamValidator``).
+        settings: Settings providing the retry count and render limits.
+        on_text: Also called with each chunk, for stages that work on the stream.
+        on_restart: Called before each retry, after ``on_text`` saw an aborted attempt.
+
+    Returns:
+        The first generation that passed validation.
+    """
+    forward = on_text or (lambda chunk: None)
+    if not settings.stream_validation:
+        return await provider.stream(system_prompt, user_prompt, forward)
+
+    for attempt in range(settings.generation_retries):
+        validator = StreamValidator(
+            language,
+            limits=ResourceLimits.from_settings(settings),
+            isolate=settings.render_isolation,
+        )
+
+        def feed(chunk: str, validator: StreamValidator = validator) -> None:
+            validator.feed(chunk)
+            forward(chunk)
+
+        try:
+            result = await provider.stream(system_prompt, user_prompt, feed)
+            await validator.finish()
+        except InvalidGenerationError:
+            if on_restart is not None:
+                on_restart()
+            continue
+        finally:
+            validator.close()
+        result.aborted_attempts = attempt
+        return result
+
+    result = await provider.stream(system_prompt, user_prompt, forward)
+    result.aborted_attempts = settings.generation_retries
+    return result
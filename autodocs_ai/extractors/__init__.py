@@ -3,9 +3,18 @@
 from __future__ import annotations
 
 from pathlib import Path
+from urllib.parse import parse_qsl
 
-from autodocs_ai.extractors.base import ExtractionError, FileExtractor
+from autodocs_ai.extractors.base import (
+    CHARS_PER_TOKEN,
+    ExtractionError,
+    ExtractOptions,
+    FileExtractor,
+    parse_pages,
+    truncate_text,
+)
 from autodocs_ai.extractors.excel import ExcelExtractor
+from autodocs_ai.extractors.parallel import ExtractedFile, extract_files
 from autodocs_ai.extractors.pdf import PDFExtractor
 from autodocs_ai.extractors.text import TextExtractor
 from autodocs_ai.extractors.word import WordExtractor
@@ -19,11 +28,21 @@ _EXTRACTORS: list[FileExtractor] = [
 ]
 
 
-def extract_file(file_path: Path) -> str:
+def get_extractor(file_path: Path) -> FileExtractor:
+    """Get the extractor for a file, by extension (text for unknown ones)."""
+    ext = file_path.suffix.lower()
+    for extractor in _EXTRACTORS:
+        if ext in extractor.supported_extensions():
+            return extractor
+    return _EXTRACTORS[-1]
+
+
+def extract_file(file_path: Path, options: ExtractOptions | None = None) -> str:
     """Extract text content from a file using the appropriate extractor.
 
     Args:
         file_path: Path to the file to extract.
+        options: Page ranges and character budget.
 
     Returns:
         Extracted text content.
@@ -32,14 +51,15 @@ def extract_file(file_path: Path) -> str:
         ExtractionError: If no extractor supports the file type or extraction fails.
     """
     ext = file_path.suffix.lower()
+    max_chars = options.max_chars if options else None
 
     for extractor in _EXTRACTORS:
         if ext in extractor.supported_extensions():
-            return extractor.extract(file_path)
+            return truncate_text(extractor.extract(file_path, options), max_chars)
 
     # Fall back to text extractor for unknown extensions
     try:
-        return TextExtractor().extract(file_path)
+        return truncate_text(TextExtractor().extract(file_path, options), max_chars)
     except Exception:
         raise ExtractionError(
             f"No extractor found for file type '{ext}'. "
@@ -47,6 +67,49 @@ def extract_file(file_path: Path) -> str:
         )
 
 
+def parse_input(
+    spec: str,
+    max_chars: int | None = None,
+    max_rows: int | None = None,
+    max_columns: int | None = None,
+    headers_footers: bool = False,
+) -> tuple[Path, ExtractOptions]:
+    """Split an input file spec into its path and extraction options.
+
+    Options follow the path as a fragment, e.g. ``report.pdf#pages=1-20`` or
+    ``notes.md#tokens=2000``: ``pages`` takes 1-based ranges (see ``parse_pages``),
+    ``chars`` and ``tokens`` set the budget. A path that exists as given is never
+    split.
+
+    Args:
+        spec: The input file spec.
+        max_chars: Budget for inputs that don't set their own.
+        max_rows: Rows extracted per spreadsheet sheet.
+        max_columns: Columns extracted per spreadsheet sheet.
+        headers_footers: Include document headers and footers.
+
+    Raises:
+        ValueError: If the options are malformed.
+    """
+    path, sep, fragment = spec.rpartition("#")
+    limits = {"max_rows": max_rows, "max_columns": max_columns, "headers_footers": headers_footers}
+    if not sep or Path(spec).exists():
+        return Path(spec), ExtractOptions(max_chars=max_chars, **limits)
+
+    pages = None
+    for name, value in parse_qsl(fragment, keep_blank_values=True, strict_parsing=True):
+        if name == "pages":
+            pages = parse_pages(value)
+        elif name in ("chars", "tokens"):
+            budget = int(value)
+            if budget < 1:
+                raise ValueError(f"Input option '{name}' must be at least 1 in {spec!r}")
+            max_chars = budget * CHARS_PER_TOKEN if name == "tokens" else budget
+        else:
+            raise ValueError(f"Unknown input option '{name}' in {spec!r}")
+    return Path(path), ExtractOptions(pages=pages, max_chars=max_chars, **limits)
+
+
 def get_supported_extensions() -> list[str]:
     """Get all supported file extensions."""
     extensions = []
@@ -56,8 +119,13 @@ def get_supported_extensions() -> list[str]:
 
 
 __all__ = [
+    "ExtractedFile",
+    "ExtractOptions",
     "ExtractionError",
     "FileExtractor",
     "extract_file",
+    "extract_files",
+    "get_extractor",
     "get_supported_extensions",
+    "parse_input",
 ]
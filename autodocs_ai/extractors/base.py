@@ -3,22 +3,106 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from pathlib import Path
 
+# Rough size of a token in English text, for token budgets
+CHARS_PER_TOKEN = 4
+
+
+@dataclass(frozen=True)
+class ExtractOptions:
+    """What and how much of a file is extracted.
+
+    Attributes:
+        pages: Page ranges to extract, as 0-based ``(start, stop)`` pairs with an
+            exclusive stop (None: to the last page). Only paged formats use them.
+        max_chars: Stop extracting once this many characters have been produced.
+        max_rows: Rows extracted per sheet of a spreadsheet, header included; CSV
+            files with more rows are summarized.
+        max_columns: Columns extracted per sheet of a spreadsheet.
+        headers_footers: Include the page headers and footers of documents.
+    """
+
+    pages: tuple[tuple[int, int | None], ...] | None = None
+    max_chars: int | None = None
+    max_rows: int | None = None
+    max_columns: int | None = None
+    headers_footers: bool = False
+
+    def cache_key(self) -> str:
+        """Identify the options in extraction cache keys."""
+        return repr(
+            (self.pages, self.max_chars, self.max_rows, self.max_columns, self.headers_footers)
+        )
+
+
+def parse_pages(spec: str) -> tuple[tuple[int, int | None], ...]:
+    """Parse 1-based, inclusive page ranges such as "1-20", "3,7-9" or "5-".
+
+    Raises:
+        ValueError: If the ranges are malformed.
+    """
+    ranges = []
+    for part in spec.split(","):
+        first, dash, last = part.strip().partition("-")
+        start = int(first)
+        stop = (int(last) if last else None) if dash else start
+        if start < 1 or (stop is not None and stop < start):
+            raise ValueError(f"Invalid page range: {part!r}")
+        ranges.append((start - 1, stop))
+    return tuple(ranges)
+
+
+def truncate_text(text: str, max_chars: int | None) -> str:
+    """Cut text down to a character budget, marking the cut."""
+    if max_chars is None or len(text) <= max_chars:
+        return text
+    return text[:max_chars] + "\n[... truncated]"
+
+
+def markdown_table(rows: list[list[str]]) -> str:
+    """Render rows as a compact markdown table, the first row as its header."""
+    if not rows:
+        return ""
+    width = max(len(row) for row in rows)
+    lines = []
+    for i, row in enumerate(rows):
+        cells = [_markdown_cell(cell) for cell in row] + [""] * (width - len(row))
+        lines.append("| " + " | ".join(cells) + " |")
+        if i == 0:
+            lines.append("|" + "---|" * width)
+    return "\n".join(lines)
+
+
+def _markdown_cell(text: str) -> str:
+    return " ".join(text.split()).replace("|", "\\|")
+
 
 class FileExtractor(ABC):
-    """Abstract base class for file content extractors."""
+    """Abstract base class for file content extractors.
+
+    Extractors that spend their time parsing in Python set ``cpu_bound``, so that
+    ``extract_files`` runs them in worker processes rather than threads. Bump
+    ``version`` whenever an extractor's output changes, to invalidate cached
+    extractions.
+    """
+
+    cpu_bound: bool = False
+    version: str = "1"
 
     @abstractmethod
     def supported_extensions(self) -> list[str]:
         """Return list of supported file extensions (e.g., ['.pdf', '.PDF'])."""
 
     @abstractmethod
-    def extract(self, file_path: Path) -> str:
+    def extract(self, file_path: Path, options: ExtractOptions | None = None) -> str:
         """Extract text content from a file.
 
         Args:
             file_path: Path to the file to extract.
+            options: Limits on what to extract. Extractors may stop early once the
+                character budget is reached; ``extract_file`` enforces it exactly.
 
         Returns:
             Extracted text content.
@@ -27,6 +111,25 @@ class FileExtractor(ABC):
             ExtractionError: If extraction fails.
         """
 
+    def split(self, file_path: Path, options: ExtractOptions, parts: int) -> list[ExtractOptions]:
+        """Divide the extraction of a large file into independent pieces.
+
+        ``extract_files`` extracts the pieces in parallel and joins their text with
+        blank lines, in order. By default files aren't split.
+
+        Args:
+            file_path: Path to the file to extract.
+            options: Limits on what to extract.
+            parts: Number of workers available.
+
+        Returns:
+            Options for each piece; ``[options]`` to extract the file whole.
+
+        Raises:
+            ExtractionError: If the file can't be inspected.
+        """
+        return [options]
+
 
 class ExtractionError(Exception):
     """Raised when file extraction fails."""
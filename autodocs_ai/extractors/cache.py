@@ -0,0 +1,137 @@
+"""Persistent cache of extracted input file content.
+
+Generations are often repeated with the same input documents, and parsing a large
+PDF or spreadsheet can take seconds. Extracted text is stored zlib-compressed under
+a key made of the file's content hash and the extractor's name and version, so
+changed files and upgraded extractors miss the cache. Hashing is skipped while a
+file's path, size, modification time and inode match what was seen when it was
+last hashed. Entries are evicted least recently used first beyond a size cap.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import zlib
+from pathlib import Path
+
+from autodocs_ai import __version__
+from autodocs_ai.extractors.base import FileExtractor
+from autodocs_ai.utils.cache import digest, evict_lru, touch
+
+_CHUNK_SIZE = 1024 * 1024
+# Remembered file identities (path -> content hash); each is a few hundred bytes
+_MAX_IDENTITIES = 10_000
+
+
+class ExtractionCache:
+    """Size-bounded on-disk store of extracted text keyed by file content.
+
+    Args:
+        cache_dir: Directory holding the cache.
+        max_bytes: Maximum total size of the compressed entries.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int = 256 * 1024 * 1024) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def key(self, file_path: Path, extractor: FileExtractor, options: str = "") -> str:
+        """Compute the cache key for extracting a file.
+
+        Hashes the file unless its identity (path, size, mtime, inode) is unchanged
+        since it was last hashed.
+
+        Args:
+            file_path: The input file.
+            extractor: Extractor that will process it.
+            options: Extraction options that change the output.
+        """
+        return digest(
+            self._content_hash(file_path),
+            type(extractor).__name__,
+            extractor.version,
+            options,
+            __version__,
+        )
+
+    def _content_hash(self, file_path: Path) -> str:
+        path = file_path.resolve()
+        st = path.stat()
+        identity = [str(path), st.st_size, st.st_mtime_ns, st.st_ino]
+        identity_path = self.cache_dir / "files" / f"{digest(str(path))}.json"
+        try:
+            cached = json.loads(identity_path.read_text())
+            if cached["identity"] == identity:
+                return cached["sha256"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+        content_hash = _hash_file(path)
+        identity_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = identity_path.with_suffix(f".tmp{threading.get_ident()}")
+        tmp.write_text(json.dumps({"identity": identity, "sha256": content_hash}))
+        tmp.replace(identity_path)
+        with self._lock:
+            evict_lru(identity_path.parent, "*.json", max_entries=_MAX_IDENTITIES)
+        return content_hash
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.z"
+
+    def get(self, key: str) -> str | None:
+        """Look up extracted text.
+
+        Returns:
+            The text, or None on a cache miss.
+        """
+        entry = self._entry_path(key)
+        try:
+            data = entry.read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            text = zlib.decompress(data).decode("utf-8")
+        except (zlib.error, UnicodeDecodeError):
+            entry.unlink(missing_ok=True)  # Corrupt entry; extract again
+            return None
+        touch(entry)
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        """Store extracted text, evicting old entries beyond the size cap."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entry = self._entry_path(key)
+        tmp = entry.with_suffix(f".tmp{threading.get_ident()}")
+        tmp.write_bytes(zlib.compress(text.encode("utf-8"), 6))
+        tmp.replace(entry)
+        with self._lock:
+            evict_lru(self.cache_dir, "*.z", max_bytes=self.max_bytes)
+
+    def size_bytes(self) -> int:
+        """Total size of the cached entries."""
+        return sum(p.stat().st_size for p in self.cache_dir.glob("*.z"))
+
+
+def _hash_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(_CHUNK_SIZE):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+_extraction_caches: dict[Path, ExtractionCache] = {}
+
+
+def get_extraction_cache(cache_dir: Path, max_bytes: int = 256 * 1024 * 1024) -> ExtractionCache:
+    """Get the shared extraction cache for a cache directory."""
+    directory = cache_dir / "extractions"
+    cache = _extraction_caches.get(directory)
+    if cache is None:
+        cache = ExtractionCache(directory, max_bytes=max_bytes)
+        _extraction_caches[directory] = cache
+    cache.max_bytes = max_bytes
+    return cache
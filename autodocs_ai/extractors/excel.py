@@ -1,19 +1,43 @@
-"""Excel and CSV content extractor."""
+"""Excel and CSV content extractor.
+
+XLSX workbooks are streamed with openpyxl's read-only mode: rows are read one at
+a time from the sheet XML instead of building the workbook's object model, every
+sheet is extracted under its own heading, and reading stops at the row, column
+and character limits of the ``ExtractOptions``.
+
+CSV files with more rows than the row limit are summarized instead (see
+``summary``): schema, column statistics and a stratified sample of rows.
+"""
 
 from __future__ import annotations
 
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime, time
 from pathlib import Path
 
-from autodocs_ai.extractors.base import ExtractionError, FileExtractor
+from autodocs_ai.extractors.base import (
+    ExtractionError,
+    ExtractOptions,
+    FileExtractor,
+    markdown_table,
+)
 
 
 class ExcelExtractor(FileExtractor):
     """Extract text content from Excel and CSV files."""
 
+    cpu_bound = True
+    version = "3"
+
     def supported_extensions(self) -> list[str]:
         return [".csv", ".xlsx", ".xls"]
 
-    def extract(self, file_path: Path) -> str:
+    def extract(self, file_path: Path, options: ExtractOptions | None = None) -> str:
+        options = options or ExtractOptions()
+        ext = file_path.suffix.lower()
+        if ext == ".xlsx":
+            return self._extract_xlsx(file_path, options)
+
         try:
             import pandas as pd
         except ImportError:
@@ -23,13 +47,118 @@ class ExcelExtractor(FileExtractor):
             )
 
         try:
-            ext = file_path.suffix.lower()
             if ext == ".csv":
-                df = pd.read_csv(file_path)
-            else:
-                df = pd.read_excel(file_path)
+                return self._extract_csv(file_path, options)
 
-            # Return as markdown table for AI consumption
-            return df.to_markdown(index=False)
+            sheets = pd.read_excel(
+                file_path,
+                sheet_name=None,
+                header=None,
+                nrows=options.max_rows + 1 if options.max_rows is not None else None,
+            )
+            return _join_sheets(
+                ((name, df.itertuples(index=False, name=None)) for name, df in sheets.items()),
+                options,
+            )
         except Exception as e:
             raise ExtractionError(f"Failed to extract {ext} file: {e}") from e
+
+    def _extract_csv(self, file_path: Path, options: ExtractOptions) -> str:
+        import pandas as pd
+
+        if options.max_rows is None:
+            df = pd.read_csv(file_path)
+        else:
+            # One row past the cap reveals whether the file is larger
+            df = pd.read_csv(file_path, nrows=options.max_rows + 1)
+            if len(df) > options.max_rows:
+                from autodocs_ai.extractors.summary import summarize_csv
+
+                return summarize_csv(file_path, options.max_columns)
+        # Return as markdown table for AI consumption
+        return df.to_markdown(index=False)
+
+    def _extract_xlsx(self, file_path: Path, options: ExtractOptions) -> str:
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ExtractionError(
+                "openpyxl is required for Excel extraction. "
+                "Install with: pip install autodocs-ai[extractors]"
+            )
+
+        try:
+            workbook = load_workbook(file_path, read_only=True, data_only=True)
+        except Exception as e:
+            raise ExtractionError(f"Failed to extract .xlsx file: {e}") from e
+        try:
+            # One column past the cap reveals whether any were cut off
+            max_col = options.max_columns + 1 if options.max_columns is not None else None
+            return _join_sheets(
+                (
+                    (sheet.title, sheet.iter_rows(values_only=True, max_col=max_col))
+                    for sheet in workbook.worksheets
+                ),
+                options,
+            )
+        except Exception as e:
+            raise ExtractionError(f"Failed to extract .xlsx file: {e}") from e
+        finally:
+            workbook.close()  # Read-only workbooks keep the file open
+
+
+def _join_sheets(sheets: Iterable[tuple[str, Iterator[tuple]]], options: ExtractOptions) -> str:
+    """Render each sheet's rows as a labelled markdown table, within the limits."""
+    parts = []
+    size = 0
+    for name, rows in sheets:
+        table = _sheet_table(rows, options)
+        parts.append(f"## Sheet: {name}\n\n{table}" if table else f"## Sheet: {name}\n\n(empty)")
+        size += len(parts[-1]) + 2
+        if options.max_chars is not None and size >= options.max_chars:
+            break  # Budget reached; leave the remaining sheets unread
+    return "\n\n".join(parts)
+
+
+def _sheet_table(rows: Iterator[tuple], options: ExtractOptions) -> str:
+    kept: list[list[str]] = []
+    more_rows = more_columns = False
+    size = 0
+    for values in rows:
+        cells = [_cell_text(value) for value in values]
+        while cells and not cells[-1]:
+            cells.pop()
+        if not cells:
+            continue  # Blank row
+        if options.max_rows is not None and len(kept) == options.max_rows:
+            more_rows = True
+            break
+        if options.max_columns is not None and len(cells) > options.max_columns:
+            cells = cells[: options.max_columns]
+            more_columns = True
+        kept.append(cells)
+        size += sum(len(cell) + 3 for cell in cells)
+        if options.max_chars is not None and size >= options.max_chars:
+            more_rows = True
+            break
+
+    notes = []
+    if more_rows:
+        notes.append(f"[... rows after the first {len(kept)} omitted]")
+    if more_columns:
+        notes.append(f"[... columns after the first {options.max_columns} omitted]")
+    return "\n".join([markdown_table(kept), *notes]).strip()
+
+
+def _cell_text(value: object) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        if value != value:  # NaN, from pandas
+            return ""
+        return str(int(value)) if value.is_integer() else str(value)
+    if isinstance(value, datetime) and value.time() == time():
+        return value.date().isoformat()
+    if isinstance(value, datetime | date | time):
+        return value.isoformat()
+    return str(value)
@@ -0,0 +1,145 @@
+"""Concurrent extraction of several input files.
+
+Each file is extracted off the event loop: extractors marked ``cpu_bound`` (PDF
+and spreadsheet parsing, which hold the GIL) run in a shared process pool, the
+others in a thread pool. At most ``max_workers`` files are extracted at once, and
+a failing file is reported in its result instead of failing the others. Large
+files whose extractor can ``split`` them (long PDFs) are extracted in pieces
+across the pool, so a single big document uses every worker. With an
+``ExtractionCache``, files extracted before are served from it without parsing.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+
+from autodocs_ai import extractors
+from autodocs_ai.extractors.base import ExtractOptions
+from autodocs_ai.extractors.cache import ExtractionCache
+
+
+@dataclass
+class ExtractedFile:
+    """The extracted content of one input file, or why it couldn't be extracted."""
+
+    path: Path
+    content: str | None = None
+    error: str | None = None
+
+
+_pools: dict[tuple[bool, int], Executor] = {}
+_pools_lock = threading.Lock()
+
+
+def _get_pool(cpu_bound: bool, max_workers: int) -> Executor:
+    """Get the shared process (CPU-bound) or thread pool of a size."""
+    with _pools_lock:
+        pool = _pools.get((cpu_bound, max_workers))
+        if pool is None:
+            if cpu_bound:
+                # Not forked: the parent may be running threads (server, queues)
+                context = multiprocessing.get_context("spawn")
+                pool = ProcessPoolExecutor(max_workers, mp_context=context)
+            else:
+                pool = ThreadPoolExecutor(max_workers, thread_name_prefix="autodocs-extract")
+            _pools[(cpu_bound, max_workers)] = pool
+        return pool
+
+
+def _discard_pool(cpu_bound: bool, max_workers: int, pool: Executor) -> None:
+    with _pools_lock:
+        if _pools.get((cpu_bound, max_workers)) is pool:
+            del _pools[(cpu_bound, max_workers)]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _extract(file_path: Path, options: ExtractOptions) -> str:
+    # Module-level so process pools can pickle it
+    return extractors.extract_file(file_path, options)
+
+
+async def extract_files(
+    inputs: list[Path | str],
+    max_workers: int = 4,
+    cache: ExtractionCache | None = None,
+    max_chars: int | None = None,
+    max_rows: int | None = None,
+    max_columns: int | None = None,
+    headers_footers: bool = False,
+) -> list[ExtractedFile]:
+    """Extract several files concurrently.
+
+    Args:
+        inputs: Files to extract, optionally with extraction options
+            (``report.pdf#pages=1-20``, see ``parse_input``).
+        max_workers: Maximum number of files extracted at once.
+        cache: Cache of earlier extractions to consult and fill.
+        max_chars: Character budget per file, unless its spec sets one.
+        max_rows: Rows extracted per spreadsheet sheet.
+        max_columns: Columns extracted per spreadsheet sheet.
+        headers_footers: Include document headers and footers.
+
+    Returns:
+        One result per file, in the order given; failed files carry an error
+        instead of content.
+    """
+    loop = asyncio.get_running_loop()
+    limit = asyncio.Semaphore(max_workers)
+
+    async def extract_one(spec: Path | str) -> ExtractedFile:
+        try:
+            file_path, options = extractors.parse_input(
+                str(spec), max_chars, max_rows, max_columns, headers_footers=headers_footers
+            )
+        except ValueError as e:
+            return ExtractedFile(Path(spec), error=str(e))
+        if not file_path.is_file():
+            return ExtractedFile(file_path, error="File not found")
+        extractor = extractors.get_extractor(file_path)
+        cpu_bound = extractor.cpu_bound
+        async with limit:
+            io_pool = _get_pool(False, max_workers)
+            key = None
+            if cache is not None:
+                try:
+                    key = await loop.run_in_executor(
+                        io_pool, cache.key, file_path, extractor, options.cache_key()
+                    )
+                    content = await loop.run_in_executor(io_pool, cache.get, key)
+                except OSError:
+                    key = content = None  # Cache unusable; extract without it
+                if content is not None:
+                    return ExtractedFile(file_path, content=content)
+
+            pool = _get_pool(cpu_bound, max_workers)
+            try:
+                # More pieces than CPUs would only add process overhead
+                parts = min(max_workers, os.cpu_count() or 1) if cpu_bound else 1
+                pieces = await loop.run_in_executor(
+                    io_pool, extractor.split, file_path, options, parts
+                )
+                texts = await asyncio.gather(
+                    *(loop.run_in_executor(pool, _extract, file_path, piece) for piece in pieces)
+                )
+                content = "\n\n".join(text for text in texts if text)
+            except BrokenProcessPool as e:
+                # A worker died (e.g. out of memory); later files get a fresh pool
+                _discard_pool(cpu_bound, max_workers, pool)
+                return ExtractedFile(file_path, error=f"Extraction worker crashed: {e}")
+            except Exception as e:
+                return ExtractedFile(file_path, error=str(e) or type(e).__name__)
+            if key is not None:
+                try:
+                    await loop.run_in_executor(io_pool, cache.put, key, content)
+                except OSError:
+                    pass
+        return ExtractedFile(file_path, content=content)
+
+    return list(await asyncio.gather(*(extract_one(spec) for spec in inputs)))
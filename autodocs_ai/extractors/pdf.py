@@ -1,34 +1,178 @@
-"""PDF content extractor."""
+"""PDF content extractor.
+
+Text is extracted with PyMuPDF when it is installed (``pip install
+autodocs-ai[pdf-fast]``), which is several times faster than the PyPDF2 fallback.
+Large documents are split into page ranges (see ``PDFExtractor.split``) that
+``extract_files`` extracts in parallel worker processes.
+"""
 
 from __future__ import annotations
 
+from collections.abc import Iterator
 from pathlib import Path
 
-from autodocs_ai.extractors.base import ExtractionError, FileExtractor
+from autodocs_ai.extractors.base import ExtractionError, ExtractOptions, FileExtractor
+
+# Backends by preference; the first one installed is used
+PDF_BACKENDS = ("pymupdf", "pypdf2")
+
+# Documents are split into ranges of at least this many pages, and only when that
+# gives two ranges or more, so the per-process cost of opening them pays off
+MIN_SPLIT_PAGES = 32
+
+
+def _import_pymupdf():
+    try:
+        import pymupdf
+    except ImportError:
+        import fitz as pymupdf  # Releases before 1.24.3
+    return pymupdf
+
+
+def available_backends() -> list[str]:
+    """Installed PDF backends, by preference."""
+    backends = []
+    for backend in PDF_BACKENDS:
+        try:
+            if backend == "pymupdf":
+                _import_pymupdf()
+            else:
+                import PyPDF2  # noqa: F401
+        except ImportError:
+            continue
+        backends.append(backend)
+    return backends
 
 
 class PDFExtractor(FileExtractor):
-    """Extract text content from PDF files."""
+    """Extract text content from PDF files.
+
+    Args:
+        backend: "pymupdf" or "pypdf2". If None, the first installed of
+            ``PDF_BACKENDS`` is used.
+    """
+
+    cpu_bound = True
+
+    def __init__(self, backend: str | None = None) -> None:
+        if backend is not None and backend not in PDF_BACKENDS:
+            raise ValueError(f"Unknown PDF backend: {backend}")
+        self._backend = backend
+
+    @property
+    def backend(self) -> str:
+        if self._backend is None:
+            available = available_backends()
+            if not available:
+                raise ExtractionError(
+                    "PyPDF2 is required for PDF extraction. "
+                    "Install with: pip install autodocs-ai[extractors]"
+                )
+            self._backend = available[0]
+        return self._backend
+
+    @property
+    def version(self) -> str:
+        # Backends lay out text differently, so their extractions are cached apart
+        try:
+            return f"1-{self.backend}"
+        except ExtractionError:
+            return "1"
 
     def supported_extensions(self) -> list[str]:
         return [".pdf"]
 
-    def extract(self, file_path: Path) -> str:
+    def page_count(self, file_path: Path) -> int:
+        """Number of pages in a PDF."""
+        if self.backend == "pymupdf":
+            with _import_pymupdf().open(file_path) as doc:
+                return doc.page_count
+        from PyPDF2 import PdfReader
+
+        with file_path.open("rb") as f:
+            return len(PdfReader(f).pages)
+
+    def iter_pages(
+        self, file_path: Path, pages: tuple[tuple[int, int | None], ...] | None = None
+    ) -> Iterator[str]:
+        """Yield the text of each page with any, one page at a time.
+
+        The file is read from disk as pages are parsed rather than loaded whole.
+
+        Args:
+            file_path: Path to the PDF.
+            pages: Page ranges to extract (see ``ExtractOptions``); all pages if None.
+
+        Raises:
+            ExtractionError: If no PDF backend is installed.
+        """
+        if self.backend == "pymupdf":
+            with _import_pymupdf().open(file_path) as doc:
+                for index in page_indexes(pages, doc.page_count):
+                    text = doc[index].get_text().strip()
+                    if text:
+                        yield text
+            return
+
+        from PyPDF2 import PdfReader
+
+        with file_path.open("rb") as f:
+            reader = PdfReader(f)
+            for index in page_indexes(pages, len(reader.pages)):
+                text = reader.pages[index].extract_text()
+                if text:
+                    yield text
+
+    def extract(self, file_path: Path, options: ExtractOptions | None = None) -> str:
+        options = options or ExtractOptions()
         try:
-            from PyPDF2 import PdfReader
-        except ImportError:
-            raise ExtractionError(
-                "PyPDF2 is required for PDF extraction. "
-                "Install with: pip install autodocs-ai[extractors]"
-            )
+            parts = []
+            size = 0
+            for text in self.iter_pages(file_path, options.pages):
+                parts.append(text)
+                size += len(text) + 2
+                if options.max_chars is not None and size >= options.max_chars:
+                    break  # Budget reached; leave the remaining pages unparsed
+            return "\n\n".join(parts)
+        except ExtractionError:
+            raise
+        except Exception as e:
+            raise ExtractionError(f"Failed to extract PDF: {e}") from e
 
+    def split(self, file_path: Path, options: ExtractOptions, parts: int) -> list[ExtractOptions]:
+        if options.max_chars is not None or parts < 2:
+            return [options]  # A budget is consumed in page order
         try:
-            reader = PdfReader(str(file_path))
-            pages = []
-            for page in reader.pages:
-                text = page.extract_text()
-                if text:
-                    pages.append(text)
-            return "\n\n".join(pages)
+            indexes = list(page_indexes(options.pages, self.page_count(file_path)))
+        except ExtractionError:
+            raise
         except Exception as e:
             raise ExtractionError(f"Failed to extract PDF: {e}") from e
+
+        size = max(MIN_SPLIT_PAGES, -(-len(indexes) // parts))
+        if len(indexes) < 2 * size:
+            return [options]
+        return [
+            ExtractOptions(pages=_runs(indexes[i : i + size])) for i in range(0, len(indexes), size)
+        ]
+
+
+def _runs(indexes: list[int]) -> tuple[tuple[int, int], ...]:
+    """Page ranges covering indexes, in order, merging consecutive ones."""
+    runs: list[tuple[int, int]] = []
+    for index in indexes:
+        if runs and runs[-1][1] == index:
+            runs[-1] = (runs[-1][0], index + 1)
+        else:
+            runs.append((index, index + 1))
+    return tuple(runs)
+
+
+def page_indexes(pages: tuple[tuple[int, int | None], ...] | None, count: int) -> Iterator[int]:
+    """0-based indexes of the selected pages that exist, each once, in range order."""
+    seen = set()
+    for start, stop in pages or ((0, None),):
+        for index in range(start, min(count, stop if stop is not None else count)):
+            if index not in seen:
+                seen.add(index)
+                yield index
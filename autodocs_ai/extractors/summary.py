@@ -0,0 +1,262 @@
+"""Summaries of tables too large to extract whole.
+
+A million-row CSV rendered as a markdown table is far beyond any prompt, so large
+tables are described instead: their schema, per-column statistics (nulls,
+min/max/mean of numeric columns, most frequent values of the others) and a
+sample of rows. The table is read in chunks and each chunk is summarized with
+vectorized pandas operations, so memory stays bounded by the chunk size.
+
+The sample is stratified: rows are sampled per value of a low-cardinality
+column (e.g. a region or category) when the table has one, or per stretch of the
+file otherwise, and each stratum is represented in proportion to its size.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from autodocs_ai.extractors.base import markdown_table
+
+SAMPLE_ROWS = 20
+TOP_VALUES = 5
+_CHUNK_ROWS = 100_000
+# Distinct values counted per column; beyond this the rarest are dropped, so top
+# values of high-cardinality columns are approximate
+_MAX_DISTINCT = 10_000
+_MAX_CELL_CHARS = 100
+
+
+@dataclass
+class _Column:
+    dtypes: set[str] = field(default_factory=set)
+    nulls: int = 0
+    count: int = 0  # Non-null numeric values
+    total: float = 0.0
+    minimum: float | None = None
+    maximum: float | None = None
+    counts: pd.Series | None = None  # Occurrences by value
+
+
+class TableSummary:
+    """Column statistics and a stratified row sample, accumulated chunk by chunk.
+
+    Args:
+        sample_rows: Rows in the sample.
+        top_values: Most frequent values listed per non-numeric column.
+        seed: Seed of the sampling, so the same table gives the same summary.
+    """
+
+    def __init__(
+        self, sample_rows: int = SAMPLE_ROWS, top_values: int = TOP_VALUES, seed: int = 0
+    ) -> None:
+        self.sample_rows = sample_rows
+        self.top_values = top_values
+        self.rows = 0
+        self.columns: dict[str, _Column] = {}
+        self.stratify_by: str | None = None
+        self._strata: dict = {}  # Stratum -> (rows seen, sample of them)
+        self._known: set = set()  # Values of the stratifying column in the first chunk
+        self._stratum_size = 0  # Rows per positional stratum
+        self._chunks = 0
+        self._random = np.random.RandomState(seed)
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        """Fold the next chunk of rows into the summary."""
+        if not self.columns:
+            self.columns = {name: _Column() for name in chunk.columns}
+            self.stratify_by = self._strata_column(chunk)
+        self.rows += len(chunk)
+
+        nulls = chunk.isna().sum()
+        numeric = chunk.select_dtypes("number")
+        if not numeric.empty:
+            non_null, sums = numeric.count(), numeric.sum()
+            minimums, maximums = numeric.min(), numeric.max()
+        for name, column in self.columns.items():
+            column.nulls += int(nulls[name])
+            if nulls[name] == len(chunk):
+                continue  # All null: says nothing about the type
+            column.dtypes.add(str(chunk[name].dtype))
+            if name in numeric:
+                column.count += int(non_null[name])
+                column.total += float(sums[name])
+                low, high = minimums[name], maximums[name]
+                column.minimum = low if column.minimum is None else min(column.minimum, low)
+                column.maximum = high if column.maximum is None else max(column.maximum, high)
+            else:
+                counts = chunk[name].value_counts()
+                if column.counts is not None:
+                    counts = column.counts.add(counts, fill_value=0)
+                if len(counts) > _MAX_DISTINCT:
+                    counts = counts.nlargest(_MAX_DISTINCT // 2)
+                column.counts = counts
+
+        if self.stratify_by is not None:
+            keys = chunk[self.stratify_by].fillna("(missing)")
+            if self._chunks == 0:
+                self._known = set(keys)
+            # Values first seen after the first chunk share one stratum
+            keys = keys.where(keys.isin(self._known), "(other)")
+            for key, group in chunk.groupby(keys, sort=False):
+                self._add_to_stratum(key, group)
+        else:
+            # Positional strata of equal size, doubled whenever there are too many
+            self._stratum_size = self._stratum_size or len(chunk)
+            last = len(self._strata) - 1
+            if last < 0 or self._strata[last][0] >= self._stratum_size:
+                last += 1
+            self._add_to_stratum(last, chunk)
+            if len(self._strata) > self.sample_rows:
+                self._merge_adjacent_strata()
+                self._stratum_size *= 2
+        self._chunks += 1
+
+    def _strata_column(self, chunk: pd.DataFrame) -> str | None:
+        """The first non-numeric column with a few distinct values, if any."""
+        numeric = chunk.select_dtypes("number")
+        for name in chunk.columns:
+            if name not in numeric and 2 <= chunk[name].nunique() <= self.sample_rows:
+                return name
+        return None
+
+    def _sample(
+        self, a: tuple[int, pd.DataFrame], b: tuple[int, pd.DataFrame]
+    ) -> tuple[int, pd.DataFrame]:
+        """Merge two samples into one of at most ``sample_rows`` rows.
+
+        Rows are weighted by how many rows each sample stands for, so the result
+        is a uniform sample of both populations.
+        """
+        (seen_a, rows_a), (seen_b, rows_b) = a, b
+        rows = pd.concat([rows_a, rows_b])
+        if len(rows) > self.sample_rows:
+            weights = np.concatenate(
+                [
+                    np.full(len(rows_a), seen_a / max(len(rows_a), 1)),
+                    np.full(len(rows_b), seen_b / max(len(rows_b), 1)),
+                ]
+            )
+            rows = rows.sample(self.sample_rows, weights=weights, random_state=self._random)
+        return seen_a + seen_b, rows
+
+    def _add_to_stratum(self, key, rows: pd.DataFrame) -> None:
+        new = (len(rows), rows.sample(min(len(rows), self.sample_rows), random_state=self._random))
+        self._strata[key] = self._sample(self._strata[key], new) if key in self._strata else new
+
+    def _merge_adjacent_strata(self) -> None:
+        """Halve the number of positional strata by merging neighbours."""
+        strata = list(self._strata.values())
+        merged = [
+            self._sample(strata[i], strata[i + 1]) if i + 1 < len(strata) else strata[i]
+            for i in range(0, len(strata), 2)
+        ]
+        self._strata = dict(enumerate(merged))
+
+    def sample(self) -> pd.DataFrame:
+        """The sampled rows in file order, strata represented in proportion to size."""
+        if not self._strata:
+            return pd.DataFrame(columns=list(self.columns))
+        strata = list(self._strata.values())
+        total = sum(seen for seen, _ in strata)
+        quotas = [max(1, round(self.sample_rows * seen / total)) for seen, _ in strata]
+        while sum(quotas) > self.sample_rows:
+            quotas[quotas.index(max(quotas))] -= 1
+        rows = pd.concat([rows.head(quota) for (_, rows), quota in zip(strata, quotas)])
+        return rows.sort_index()
+
+    def render(self, name: str) -> str:
+        """Describe the table as markdown."""
+        lines = [
+            f"Table summary of {name}: {self.rows:,} rows, {len(self.columns)} columns "
+            f"(too many rows to include; statistics and a sample of {self.sample_rows} "
+            "rows follow)",
+            "",
+            "### Columns",
+            "",
+        ]
+        schema = [["column", "dtype", "nulls", "min", "max", "mean", "top values"]]
+        for name, column in self.columns.items():
+            dtype = _dtype(column.dtypes)
+            row = [str(name), dtype, f"{column.nulls:,}", "", "", "", ""]
+            if column.count and column.counts is None:  # Numeric in every chunk
+                row[3:6] = [
+                    _number(column.minimum),
+                    _number(column.maximum),
+                    _number(column.total / column.count),
+                ]
+            elif column.counts is not None:
+                top = column.counts.nlargest(self.top_values)
+                row[6] = ", ".join(
+                    f"{_cell(value)} ({int(count):,})" for value, count in top.items()
+                )
+            schema.append(row)
+        lines.append(markdown_table(schema))
+
+        sample = self.sample()
+        how = f"stratified by {self.stratify_by}" if self.stratify_by else "across the file"
+        lines += ["", f"### Sample rows ({how})", ""]
+        lines.append(
+            markdown_table(
+                [[str(name) for name in sample.columns]]
+                + [[_cell(value) for value in row] for row in sample.itertuples(index=False)]
+            )
+        )
+        return "\n".join(lines)
+
+
+def summarize_csv(
+    file_path: Path, max_columns: int | None = None, sample_rows: int = SAMPLE_ROWS
+) -> str:
+    """Summarize a CSV file, reading it in chunks.
+
+    Args:
+        file_path: The CSV file.
+        max_columns: Summarize only this many leading columns.
+        sample_rows: Rows in the sample.
+    """
+    usecols = range(max_columns) if max_columns is not None else None
+    width = len(pd.read_csv(file_path, nrows=0).columns)
+    if usecols is not None and width <= max_columns:
+        usecols = None
+
+    summary = TableSummary(sample_rows=sample_rows)
+    # The C engine is the fastest one that reads in chunks
+    with pd.read_csv(
+        file_path, chunksize=_CHUNK_ROWS, usecols=usecols, engine="c", low_memory=False
+    ) as reader:
+        for chunk in reader:
+            summary.add(chunk)
+    text = summary.render(file_path.name)
+    if usecols is not None:
+        text += f"\n\n[... columns after the first {max_columns} of {width} omitted]"
+    return text
+
+
+def _dtype(dtypes: set[str]) -> str:
+    if not dtypes:
+        return "empty"
+    if len(dtypes) == 1:
+        return next(iter(dtypes))
+    try:
+        numeric = [np.dtype(dtype) for dtype in dtypes]
+    except TypeError:
+        return "mixed"
+    if all(dtype.kind in "iuf" for dtype in numeric):
+        return str(np.result_type(*numeric))  # e.g. int64 and float64 chunks
+    return "mixed"
+
+
+def _number(value: float) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() and abs(value) < 1e15 else f"{value:.6g}"
+
+
+def _cell(value: object) -> str:
+    if pd.isna(value):
+        return ""
+    text = str(value)
+    return text if len(text) <= _MAX_CELL_CHARS else text[: _MAX_CELL_CHARS - 3] + "..."
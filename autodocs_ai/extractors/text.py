@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from autodocs_ai.extractors.base import ExtractionError, FileExtractor
+from autodocs_ai.extractors.base import ExtractionError, ExtractOptions, FileExtractor
 
 
 class TextExtractor(FileExtractor):
@@ -41,7 +41,7 @@ class TextExtractor(FileExtractor):
             ".R",
         ]
 
-    def extract(self, file_path: Path) -> str:
+    def extract(self, file_path: Path, options: ExtractOptions | None = None) -> str:
         try:
             return file_path.read_text(encoding="utf-8")
         except UnicodeDecodeError:
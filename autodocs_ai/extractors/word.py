@@ -1,30 +1,168 @@
-"""Word document content extractor."""
+"""Word document content extractor.
+
+``word/document.xml`` is parsed incrementally straight from the .docx archive:
+each paragraph and table row is converted to text as soon as it has been read and
+then dropped from the tree, so memory stays flat however long the document is.
+Paragraphs (headings marked as in markdown) and tables (as compact markdown) are
+emitted in document order, and headers and footers can be included.
+"""
 
 from __future__ import annotations
 
+import re
+import zipfile
+from collections.abc import Iterator
 from pathlib import Path
+from typing import IO
+from xml.etree.ElementTree import Element, iterparse
+
+from autodocs_ai.extractors.base import (
+    ExtractionError,
+    ExtractOptions,
+    FileExtractor,
+    markdown_table,
+)
 
-from autodocs_ai.extractors.base import ExtractionError, FileExtractor
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_PARAGRAPH, _TABLE, _ROW, _CELL = f"{_W}p", f"{_W}tbl", f"{_W}tr", f"{_W}tc"
+# Run content that stands for text
+_TEXT = {
+    f"{_W}t": None,  # Its text
+    f"{_W}tab": "\t",
+    f"{_W}br": "\n",
+    f"{_W}cr": "\n",
+    f"{_W}noBreakHyphen": "-",
+}
+# Alternative renderings of content already read from the preferred one
+_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+_HEADING_STYLE = re.compile(r"(?i)heading\s*(\d)")
 
 
 class WordExtractor(FileExtractor):
     """Extract text content from Word (.docx) files."""
 
+    cpu_bound = True
+    version = "2"
+
     def supported_extensions(self) -> list[str]:
         return [".docx"]
 
-    def extract(self, file_path: Path) -> str:
+    def extract(self, file_path: Path, options: ExtractOptions | None = None) -> str:
+        options = options or ExtractOptions()
         try:
-            from docx import Document
-        except ImportError:
-            raise ExtractionError(
-                "python-docx is required for Word extraction. "
-                "Install with: pip install autodocs-ai[extractors]"
-            )
+            with zipfile.ZipFile(file_path) as archive:
+                names = sorted(archive.namelist())
+                headers = [n for n in names if re.fullmatch(r"word/header\d*\.xml", n)]
+                footers = [n for n in names if re.fullmatch(r"word/footer\d*\.xml", n)]
+                if not options.headers_footers:
+                    headers = footers = []
 
-        try:
-            doc = Document(str(file_path))
-            paragraphs = [p.text for p in doc.paragraphs if p.text.strip()]
-            return "\n\n".join(paragraphs)
-        except Exception as e:
+                blocks: list[str] = []
+                repeated: set[str] = set()  # Header and footer blocks emitted
+                size = 0
+                for part in [*headers, "word/document.xml", *footers]:
+                    with archive.open(part) as xml:
+                        for block in iter_blocks(xml, options.max_rows):
+                            if part != "word/document.xml":
+                                if block in repeated:
+                                    continue  # Same header on first, odd and even pages
+                                repeated.add(block)
+                            blocks.append(block)
+                            size += len(block) + 2
+                            if options.max_chars is not None and size >= options.max_chars:
+                                return "\n\n".join(blocks)  # Leave the rest unparsed
+                return "\n\n".join(blocks)
+        except (KeyError, OSError, SyntaxError, zipfile.BadZipFile) as e:
+            # KeyError: no document.xml; SyntaxError: malformed XML (ParseError)
             raise ExtractionError(f"Failed to extract Word document: {e}") from e
+
+
+def iter_blocks(xml: IO[bytes], max_rows: int | None = None) -> Iterator[str]:
+    """Yield the paragraphs and tables of a WordprocessingML part as text, in order.
+
+    Args:
+        xml: The part (e.g. ``word/document.xml``).
+        max_rows: Rows kept per table, header included.
+    """
+    stack: list[Element] = []
+    tables = 0  # Tables open around the current element
+    rows: list[list[str]] = []
+    more_rows = False
+
+    for event, elem in iterparse(xml, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            if elem.tag == _TABLE:
+                tables += 1
+            continue
+
+        stack.pop()
+        if elem.tag == _TABLE:
+            tables -= 1
+            if tables > 0:
+                continue  # Nested; read with the cell holding it
+            if rows:
+                table = markdown_table(rows)
+                if more_rows:
+                    table += f"\n[... rows after the first {len(rows)} omitted]"
+                yield table
+            rows, more_rows = [], False
+        elif elem.tag == _ROW and tables == 1:
+            cells = [_text(cell, " ") for cell in _cells(elem)]
+            if max_rows is not None and len(rows) >= max_rows:
+                more_rows = True
+            elif any(cells):
+                rows.append(cells)
+        elif elem.tag == _PARAGRAPH and tables == 0 and not _in_paragraph(stack):
+            text = _text(elem, "\n")
+            if text:
+                yield _heading(elem) + text
+        else:
+            continue
+
+        # Converted; drop it so the tree doesn't grow with the document
+        if stack:
+            stack[-1].remove(elem)
+
+
+def _in_paragraph(stack: list[Element]) -> bool:
+    # Paragraphs of text boxes are read as part of the paragraph anchoring them
+    return any(elem.tag == _PARAGRAPH for elem in stack)
+
+
+def _cells(node: Element) -> Iterator[Element]:
+    """The cells of a table row, looking through content controls but not into cells."""
+    for child in node:
+        if child.tag == _CELL:
+            yield child
+        else:
+            yield from _cells(child)
+
+
+def _text(elem: Element, paragraph_break: str) -> str:
+    """The text of an element, paragraphs separated by ``paragraph_break``."""
+    parts: list[str] = []
+
+    def walk(node: Element) -> None:
+        for child in node:
+            if child.tag == _FALLBACK or child.tag.endswith("Pr"):
+                continue  # Duplicate rendering, or properties (tab stops aren't tabs)
+            if child.tag in _TEXT:
+                parts.append(_TEXT[child.tag] or child.text or "")
+            else:
+                walk(child)
+                if child.tag == _PARAGRAPH:
+                    parts.append(paragraph_break)
+
+    walk(elem)
+    return "".join(parts).strip()
+
+
+def _heading(paragraph: Element) -> str:
+    """Markdown heading marker for paragraphs in a heading or title style."""
+    style = paragraph.find(f"{_W}pPr/{_W}pStyle")
+    name = style.get(f"{_W}val", "") if style is not None else ""
+    if name.lower() == "title":
+        return "# "
+    match = _HEADING_STYLE.fullmatch(name)
+    return "#" * min(int(match.group(1)), 6) + " " if match else ""
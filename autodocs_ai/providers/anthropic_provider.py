@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable
+
 from autodocs_ai.config import Settings
 from autodocs_ai.providers.base import AIProvider, GenerationResult
 
@@ -55,3 +57,36 @@ class AnthropicProvider(AIProvider):
             provider="anthropic",
             usage=usage,
         )
+
+    async def stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        on_text: Callable[[str], None],
+    ) -> GenerationResult:
+        client = self._get_client()
+        async with client.messages.stream(
+            model=self.settings.anthropic_model,
+            max_tokens=self.settings.max_tokens,
+            system=system_prompt,
+            messages=[
+                {"role": "user", "content": user_prompt},
+            ],
+        ) as response:
+            async for text in response.text_stream:
+                on_text(text)
+            message = await response.get_final_message()
+        content = ""
+        for block in message.content:
+            if block.type == "text":
+                content += block.text
+        usage = {
+            "input_tokens": message.usage.input_tokens,
+            "output_tokens": message.usage.output_tokens,
+        }
+        return GenerationResult(
+            content=content,
+            model=self.settings.anthropic_model,
+            provider="anthropic",
+            usage=usage,
+        )
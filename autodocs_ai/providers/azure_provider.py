@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable
+
 from autodocs_ai.config import Settings
 from autodocs_ai.providers.base import AIProvider, GenerationResult
 
@@ -68,3 +70,42 @@ class AzureProvider(AIProvider):
             provider="azure",
             usage=usage,
         )
+
+    async def stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        on_text: Callable[[str], None],
+    ) -> GenerationResult:
+        client = self._get_client()
+        response = await client.chat.completions.create(
+            model=self.settings.azure_openai_deployment,
+            messages=[
+                {"role": "developer", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            max_completion_tokens=self.settings.max_tokens,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        parts: list[str] = []
+        usage = None
+        try:
+            async for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    on_text(parts[-1])
+                if chunk.usage:
+                    usage = {
+                        "prompt_tokens": chunk.usage.prompt_tokens,
+                        "completion_tokens": chunk.usage.completion_tokens,
+                        "total_tokens": chunk.usage.total_tokens,
+                    }
+        finally:
+            await response.close()
+        return GenerationResult(
+            content="".join(parts),
+            model=self.settings.azure_openai_deployment or "azure",
+            provider="azure",
+            usage=usage,
+        )
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from collections.abc import Callable
 from dataclasses import dataclass
 
 
@@ -14,6 +15,7 @@ class GenerationResult:
     model: str
     provider: str
     usage: dict | None = None
+    aborted_attempts: int = 0  # Generations cancelled early as unusable before this one
 
 
 class AIProvider(ABC):
@@ -31,6 +33,30 @@ class AIProvider(ABC):
             GenerationResult with the generated content.
         """
 
+    async def stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        on_text: Callable[[str], None],
+    ) -> GenerationResult:
+        """Generate text, passing each chunk to ``on_text`` as it arrives.
+
+        If ``on_text`` raises, the request is closed and the exception propagates,
+        which lets callers stop paying for output they already know is unusable.
+        Providers without a streaming API deliver the whole response as one chunk.
+
+        Args:
+            system_prompt: The system-level instruction for the AI.
+            user_prompt: The user's request/content.
+            on_text: Called with each chunk of generated text.
+
+        Returns:
+            GenerationResult with the complete generated content.
+        """
+        result = await self.generate(system_prompt, user_prompt)
+        on_text(result.content)
+        return result
+
     @abstractmethod
     def validate_config(self) -> None:
         """Validate that the provider is properly configured.
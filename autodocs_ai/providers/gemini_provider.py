@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable
+
 from autodocs_ai.config import Settings
 from autodocs_ai.providers.base import AIProvider, GenerationResult
 
@@ -52,3 +54,37 @@ class GeminiProvider(AIProvider):
             provider="gemini",
             usage=usage,
         )
+
+    async def stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        on_text: Callable[[str], None],
+    ) -> GenerationResult:
+        client = self._get_client()
+        combined_prompt = f"{system_prompt}\n\n{user_prompt}"
+        response = await client.aio.models.generate_content_stream(
+            model=self.settings.gemini_model,
+            contents=combined_prompt,
+        )
+        parts: list[str] = []
+        usage = None
+        try:
+            async for chunk in response:
+                if chunk.text:
+                    parts.append(chunk.text)
+                    on_text(chunk.text)
+                if chunk.usage_metadata:
+                    usage = {
+                        "prompt_tokens": chunk.usage_metadata.prompt_token_count,
+                        "completion_tokens": chunk.usage_metadata.candidates_token_count,
+                        "total_tokens": chunk.usage_metadata.total_token_count,
+                    }
+        finally:
+            await response.aclose()
+        return GenerationResult(
+            content="".join(parts),
+            model=self.settings.gemini_model,
+            provider="gemini",
+            usage=usage,
+        )
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable
+
 from autodocs_ai.config import Settings
 from autodocs_ai.providers.base import AIProvider, GenerationResult
 
@@ -50,3 +52,40 @@ class OllamaProvider(AIProvider):
             provider="ollama",
             usage=usage,
         )
+
+    async def stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        on_text: Callable[[str], None],
+    ) -> GenerationResult:
+        client = self._get_client()
+        response = await client.chat(
+            model=self.settings.ollama_model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            stream=True,
+        )
+        parts: list[str] = []
+        usage = None
+        try:
+            async for part in response:
+                text = part.get("message", {}).get("content", "")
+                if text:
+                    parts.append(text)
+                    on_text(text)
+                if part.get("done"):
+                    usage = {
+                        "eval_count": part.get("eval_count"),
+                        "prompt_eval_count": part.get("prompt_eval_count"),
+                    }
+        finally:
+            await response.aclose()
+        return GenerationResult(
+            content="".join(parts),
+            model=self.settings.ollama_model,
+            provider="ollama",
+            usage=usage,
+        )
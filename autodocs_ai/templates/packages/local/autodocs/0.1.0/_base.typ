@@ -1,6 +1,19 @@
 // Base template for autodocs-ai documents
 // Provides common styling and page setup
 
+// Table styling shared by all templates
+#let autodocs-tables(body) = {
+  set table(
+    stroke: 0.5pt + gray,
+    inset: (x: 6pt, y: 4pt),
+    fill: (_, y) => if y == 0 { rgb("#ecf0f1") },
+  )
+  show table.cell.where(y: 0): strong
+  show table: set text(size: 0.9em)
+
+  body
+}
+
 #let autodocs-base(
   title: none,
   author: none,
@@ -39,6 +52,8 @@
     leading: 0.65em,
   )
 
+  show: autodocs-tables
+
   // Headings
   set heading(numbering: "1.1")
   show heading.where(level: 1): it => {
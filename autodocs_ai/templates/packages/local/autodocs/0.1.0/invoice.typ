@@ -1,5 +1,7 @@
 // Invoice template for autodocs-ai
 
+#import "_base.typ": autodocs-tables
+
 #let invoice(
   invoice-number: "INV-001",
   date: none,
@@ -24,6 +26,8 @@
     lang: "en",
   )
 
+  show: autodocs-tables
+
   // Header
   grid(
     columns: (1fr, 1fr),
@@ -0,0 +1,14 @@
+// autodocs-ai document styles
+//
+// Generated documents import this package and apply one style as a show rule:
+//
+//   #import "@local/autodocs:0.1.0": report
+//   #show: report.with(title: "Quarterly Review", author: "Jane Doe")
+//
+// so they only need to contain content.
+
+#import "_base.typ": autodocs-base, autodocs-tables
+#import "resume.typ": resume
+#import "invoice.typ": invoice
+#import "proposal.typ": proposal
+#import "report.typ": report
@@ -1,5 +1,7 @@
 // Business Proposal template for autodocs-ai
 
+#import "_base.typ": autodocs-tables
+
 #let proposal(
   title: "Business Proposal",
   author: none,
@@ -30,6 +32,8 @@
     leading: 0.65em,
   )
 
+  show: autodocs-tables
+
   // Cover page
   v(4cm)
   align(center)[
@@ -1,5 +1,7 @@
 // Technical Report template for autodocs-ai
 
+#import "_base.typ": autodocs-tables
+
 #let report(
   title: "Technical Report",
   author: none,
@@ -38,6 +40,8 @@
     leading: 0.65em,
   )
 
+  show: autodocs-tables
+
   // Title page
   v(3cm)
   align(center)[
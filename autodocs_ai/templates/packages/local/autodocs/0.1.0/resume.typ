@@ -1,5 +1,7 @@
 // Resume/CV template for autodocs-ai
 
+#import "_base.typ": autodocs-tables
+
 #let resume(
   name: "Your Name",
   title: none,
@@ -25,6 +27,8 @@
     leading: 0.6em,
   )
 
+  show: autodocs-tables
+
   // Name and title
   align(center)[
     #text(24pt, weight: "bold")[#name]
@@ -0,0 +1,368 @@
+"""Content-addressed artifact store for document versioning.
+
+An alternative to the git backend for output directories of binary documents.
+Files are stored once per distinct content under ``.versions/objects`` (sharded by
+the first two hex digits of their SHA-256), and each version is a small JSON
+manifest mapping paths to content hashes, so identical outputs across versions and
+documents cost no extra space. Restores hard-link stored objects into place, and
+``collect_garbage`` drops old versions and the objects only they referenced.
+
+Stored objects are read-only; a restored file shares its inode with the stored
+object, so it must be replaced rather than rewritten in place (the renderers do).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from autodocs_ai.utils.git_objects import GitError, LockFile
+from autodocs_ai.utils.version_index import Version
+from autodocs_ai.utils.versioning import (
+    LOCK_TIMEOUT,
+    GarbageCollection,
+    VersioningBackend,
+    VersioningError,
+    changed_paths,
+    file_diff,
+    worktree_files,
+)
+
+STORE_DIR = ".versions"
+_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class Manifest:
+    """The files of one version, by relative path."""
+
+    id: str
+    parent: str | None
+    timestamp: float
+    message: str
+    files: dict[str, str] = field(default_factory=dict)  # Path -> content hash
+
+
+class ArtifactStoreBackend(VersioningBackend):
+    """Versions as manifests over a deduplicated, content-addressed object store."""
+
+    name = "store"
+
+    def __init__(self, output_dir: Path) -> None:
+        super().__init__(output_dir)
+        self.root = output_dir / STORE_DIR
+        self.index_path = self.root / "index.sqlite3"
+
+    def exists(self) -> bool:
+        return (self.root / "manifests").is_dir()
+
+    def init(self) -> None:
+        (self.root / "objects").mkdir(parents=True, exist_ok=True)
+        (self.root / "manifests").mkdir(exist_ok=True)
+
+    # Objects
+
+    def _object_path(self, content_hash: str) -> Path:
+        return self.root / "objects" / content_hash[:2] / content_hash[2:]
+
+    def _store_file(self, path: Path) -> str:
+        """Copy a file into the store unless its content is already there."""
+        h = hashlib.sha256()
+        with path.open("rb") as f:
+            while chunk := f.read(_CHUNK_SIZE):
+                h.update(chunk)
+        content_hash = h.hexdigest()
+
+        target = self._object_path(content_hash)
+        if not target.exists():
+            target.parent.mkdir(exist_ok=True)
+            tmp = target.with_name(f"{target.name}.tmp{os.getpid()}")
+            shutil.copyfile(path, tmp)
+            tmp.chmod(0o444)
+            tmp.replace(target)
+        return content_hash
+
+    # Manifests
+
+    def _write_json(self, path: Path, data: object) -> None:
+        _replace_text(path, json.dumps(data, sort_keys=True, separators=(",", ":")))
+
+    def head(self) -> str | None:
+        try:
+            return (self.root / "HEAD").read_text().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _read_manifest(self, version: str) -> Manifest:
+        try:
+            data = json.loads((self.root / "manifests" / f"{version}.json").read_text())
+        except FileNotFoundError:
+            raise VersioningError(f"Unknown version: {version}") from None
+        return Manifest(
+            id=version,
+            parent=data["parent"],
+            timestamp=data["timestamp"],
+            message=data["message"],
+            files=data["files"],
+        )
+
+    def _lock(self) -> LockFile:
+        """The lock on HEAD, held by whatever writes manifests, the stat cache or objects."""
+        return LockFile(self.root / "HEAD", LOCK_TIMEOUT)
+
+    def _write_manifest(
+        self, parent: str | None, message: str, files: dict[str, str], head_lock: LockFile
+    ) -> Manifest:
+        """Write a version and move HEAD to it, committing the held HEAD lock."""
+        if self.head() != parent:
+            raise VersioningError("HEAD moved by another process; commit again")
+        data = {"parent": parent, "timestamp": time.time(), "message": message, "files": files}
+        encoded = json.dumps(data, sort_keys=True, separators=(",", ":")).encode()
+        version = hashlib.sha256(encoded).hexdigest()[:40]
+        self._write_json(self.root / "manifests" / f"{version}.json", data)
+        head_lock.commit(f"{version}\n".encode())
+        return Manifest(id=version, **data)
+
+    def resolve(self, version: str) -> str:
+        """Resolve HEAD, HEAD~N or a (possibly abbreviated) version id.
+
+        Raises:
+            VersioningError: If the version doesn't exist.
+        """
+        name, tilde, back = version.partition("~")
+        if name == "HEAD":
+            resolved = self.head()
+        else:
+            matches = [p.stem for p in (self.root / "manifests").glob(f"{name.lower()}*.json")]
+            if len(matches) > 1:
+                raise VersioningError(f"Ambiguous version: {version}")
+            resolved = matches[0] if matches and len(name) >= 4 else None
+        if resolved is None or (back and not back.isdigit()):
+            raise VersioningError(f"Unknown version: {version}")
+        for _ in range(int(back) if back else int(bool(tilde))):
+            resolved = self._read_manifest(resolved).parent
+            if resolved is None:
+                raise VersioningError(f"Unknown version: {version}")
+        return resolved
+
+    # Stat cache
+
+    def _read_stat_cache(self) -> dict[str, list]:
+        try:
+            return json.loads((self.root / "stat-cache.json").read_text())
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _hash(self, path: str, stat_cache: dict[str, list]) -> str:
+        """Store a working file, skipping files unchanged since they were last stored."""
+        st = (self.output_dir / path).stat()
+        signature = [st.st_size, st.st_mtime_ns, st.st_ino]
+        cached = stat_cache.get(path)
+        if cached is not None and cached[1:] == signature:
+            return cached[0]
+        content_hash = self._store_file(self.output_dir / path)
+        stat_cache[path] = [content_hash, *signature]
+        return content_hash
+
+    # Backend API
+
+    def commit(
+        self,
+        message: str | None = None,
+        files: list[str] | None = None,
+        metadata: dict | None = None,
+    ) -> str | None:
+        if not self.exists():
+            self.init()
+
+        try:
+            self._sync_index()
+            # Concurrent commits would leave one of their versions off the HEAD chain
+            with self._lock() as head_lock:
+                head = self.head()
+                previous = self._read_manifest(head).files if head else {}
+                current = dict(previous)
+                stat_cache = self._read_stat_cache()
+                paths = (
+                    self._selected_paths(files)
+                    if files
+                    else sorted(set(worktree_files(self.output_dir)) | set(current))
+                )
+                for path in paths:
+                    if (self.output_dir / path).is_file():
+                        current[path] = self._hash(path, stat_cache)
+                    else:
+                        current.pop(path, None)
+                        stat_cache.pop(path, None)
+                self._write_json(self.root / "stat-cache.json", stat_cache)
+
+                if current == previous:
+                    return None
+                manifest = self._write_manifest(
+                    head, message or "Update generated documents", current, head_lock
+                )
+            self._record(
+                manifest.id,
+                manifest.timestamp,
+                manifest.message,
+                changed_paths(previous, current),
+                metadata,
+            )
+            return manifest.id
+        except (GitError, OSError, ValueError, sqlite3.Error) as e:
+            raise VersioningError(f"Failed to commit: {e}") from e
+
+    def log(self, start: str) -> Iterator[Version]:
+        version: str | None = start
+        while version:
+            try:
+                manifest = self._read_manifest(version)
+                parent = self._read_manifest(manifest.parent).files if manifest.parent else {}
+            except VersioningError:
+                return  # Older history was garbage collected
+            yield Version(
+                hash=manifest.id,
+                timestamp=manifest.timestamp,
+                message=manifest.message,
+                files=changed_paths(parent, manifest.files),
+            )
+            version = manifest.parent
+
+    def diff(self, version_a: str, version_b: str | None = None) -> str:
+        try:
+            old = self._read_manifest(self.resolve(version_a)).files
+            if version_b:
+                new = self._read_manifest(self.resolve(version_b)).files
+            else:
+                stat_cache = self._read_stat_cache()
+                new = {
+                    path: self._hash(path, stat_cache)
+                    for path in old.keys() | set(worktree_files(self.output_dir))
+                    if (self.output_dir / path).is_file()
+                }
+        except (VersioningError, OSError):
+            return ""
+
+        chunks = []
+        for path in sorted(old.keys() | new.keys()):
+            if old.get(path) == new.get(path):
+                continue
+            before = self._object_path(old[path]).read_bytes() if path in old else b""
+            after = self._object_path(new[path]).read_bytes() if path in new else b""
+            chunks.append(file_diff(path, before, after, path in old, path in new))
+        return "".join(chunks)
+
+    def restore(self, version: str) -> None:
+        try:
+            with self._lock():
+                manifest = self._read_manifest(self.resolve(version))
+                stat_cache = self._read_stat_cache()
+                for path, content_hash in manifest.files.items():
+                    target = self.output_dir / path
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    tmp = target.with_name(f".{target.name}.restore")
+                    tmp.unlink(missing_ok=True)
+                    try:
+                        tmp.hardlink_to(self._object_path(content_hash))
+                    except OSError:
+                        shutil.copyfile(self._object_path(content_hash), tmp)
+                    tmp.replace(target)
+                    st = target.stat()
+                    stat_cache[path] = [content_hash, st.st_size, st.st_mtime_ns, st.st_ino]
+                self._write_json(self.root / "stat-cache.json", stat_cache)
+        except (GitError, OSError) as e:
+            raise VersioningError(f"Failed to restore version: {e}") from e
+
+    def collect_garbage(
+        self, max_age: float | None = None, max_bytes: int | None = None
+    ) -> GarbageCollection:
+        """Drop old versions, then delete objects no remaining version references.
+
+        The latest version is always kept.
+
+        Args:
+            max_age: Drop versions older than this many seconds.
+            max_bytes: Drop the oldest versions until the objects referenced by the
+                remaining ones fit in this many bytes.
+
+        Returns:
+            Counts of what was removed.
+
+        Raises:
+            VersioningError: If another process is still committing after
+                ``LOCK_TIMEOUT``.
+        """
+        try:
+            # A version being committed isn't on the HEAD chain yet
+            with self._lock():
+                return self._collect_garbage(max_age, max_bytes)
+        except GitError as e:
+            raise VersioningError(f"Failed to collect garbage: {e}") from e
+
+    def _collect_garbage(self, max_age: float | None, max_bytes: int | None) -> GarbageCollection:
+        result = GarbageCollection()
+        chain: list[Manifest] = []
+        version = self.head()
+        while version:
+            try:
+                manifest = self._read_manifest(version)
+            except VersioningError:
+                break
+            chain.append(manifest)
+            version = manifest.parent
+
+        keep = len(chain)
+        if max_age is not None:
+            cutoff = time.time() - max_age
+            keep = min(keep, max(1, sum(1 for m in chain if m.timestamp >= cutoff)))
+        if max_bytes is not None:
+            sizes: dict[str, int] = {}
+            for index, manifest in enumerate(chain[:keep]):
+                for content_hash in manifest.files.values():
+                    if content_hash not in sizes:
+                        sizes[content_hash] = _size(self._object_path(content_hash))
+                if index > 0 and sum(sizes.values()) > max_bytes:
+                    keep = index
+                    break
+
+        live = {h for manifest in chain[:keep] for h in manifest.files.values()}
+        kept = {manifest.id for manifest in chain[:keep]}
+        removed = []
+        for manifest_path in (self.root / "manifests").glob("*.json"):
+            if manifest_path.stem not in kept:
+                manifest_path.unlink()
+                removed.append(manifest_path.stem)
+        self.index.remove(removed)
+        result.versions = len(removed)
+
+        for shard in (self.root / "objects").iterdir():
+            for obj in shard.iterdir():
+                if shard.name + obj.name not in live:
+                    result.bytes_freed += _size(obj)
+                    obj.unlink()
+                    result.objects += 1
+        return result
+
+    def size_bytes(self) -> int:
+        """Total size of the stored objects."""
+        return sum(_size(p) for p in (self.root / "objects").glob("*/*"))
+
+
+def _replace_text(path: Path, text: str) -> None:
+    tmp = path.with_name(f"{path.name}.tmp{os.getpid()}")
+    tmp.write_text(text)
+    tmp.replace(path)
+
+
+def _size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
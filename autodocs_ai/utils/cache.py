@@ -0,0 +1,78 @@
+"""Helpers for on-disk, least-recently-used caches."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+
+
+def digest(*parts: str | bytes) -> str:
+    """Compute a stable cache key from one or more parts.
+
+    Each part is length-prefixed so that ("ab", "c") and ("a", "bc") hash differently.
+
+    Args:
+        parts: Strings or bytes making up the key.
+
+    Returns:
+        Hex-encoded SHA-256 digest.
+    """
+    h = hashlib.sha256()
+    for part in parts:
+        data = part.encode("utf-8") if isinstance(part, str) else part
+        h.update(len(data).to_bytes(8, "big"))
+        h.update(data)
+    return h.hexdigest()
+
+
+def touch(path: Path) -> None:
+    """Mark a cache entry as recently used by bumping its modification time."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def evict_lru(
+    directory: Path,
+    pattern: str = "*",
+    max_entries: int | None = None,
+    max_bytes: int | None = None,
+) -> list[Path]:
+    """Delete the least recently used entries until the cache fits its limits.
+
+    Recency is tracked through file modification times (see ``touch``).
+
+    Args:
+        directory: Cache directory to prune.
+        pattern: Glob pattern selecting the cache entries.
+        max_entries: Maximum number of entries to keep.
+        max_bytes: Maximum total size of the entries, in bytes.
+
+    Returns:
+        Paths of the evicted entries.
+    """
+    entries = []
+    for path in directory.glob(pattern):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    entries.sort(key=lambda entry: entry[0])
+    count = len(entries)
+    total = sum(size for _, size, _ in entries)
+
+    evicted = []
+    for _, size, path in entries:
+        over_entries = max_entries is not None and count > max_entries
+        over_bytes = max_bytes is not None and total > max_bytes
+        if not (over_entries or over_bytes):
+            break
+        path.unlink(missing_ok=True)
+        evicted.append(path)
+        count -= 1
+        total -= size
+    return evicted
@@ -0,0 +1,161 @@
+"""Persistent cache of citation metadata.
+
+The same sources are cited across many documents, so parsed metadata is kept in a
+SQLite database keyed by normalized URL. Fresh entries are served without touching
+the network; stale entries are revalidated with a conditional request (ETag /
+Last-Modified), which usually costs a 304 instead of a full page download.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from autodocs_ai.utils.citations import Citation, normalize_url
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS citations (
+    url TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    author TEXT NOT NULL,
+    date TEXT NOT NULL,
+    publisher TEXT NOT NULL,
+    accessed TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL
+)
+"""
+
+
+@dataclass
+class CachedCitation:
+    """A cached citation with the validators needed to revalidate it."""
+
+    citation: Citation
+    etag: str | None
+    last_modified: str | None
+    fetched_at: float
+
+    def is_fresh(self, ttl: float) -> bool:
+        """Whether the entry can be used without revalidating it."""
+        return time.time() - self.fetched_at < ttl
+
+    def conditional_headers(self) -> dict[str, str]:
+        """Request headers that turn a refetch into a conditional request."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class CitationCache:
+    """SQLite-backed store of citation metadata keyed by normalized URL.
+
+    Args:
+        path: Database file, created on first use.
+        ttl: Seconds an entry is served without revalidation.
+    """
+
+    def __init__(self, path: Path, ttl: float = 7 * 24 * 3600) -> None:
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(_SCHEMA)
+        return self._conn
+
+    def get(self, url: str) -> CachedCitation | None:
+        """Look up a citation, fresh or stale.
+
+        Args:
+            url: URL of the cited page; it is normalized (see ``normalize_url``).
+
+        Returns:
+            The cached entry, or None if the URL was never fetched.
+        """
+        with self._lock:
+            row = (
+                self._connection()
+                .execute(
+                    "SELECT title, author, date, publisher, accessed, etag, last_modified, "
+                    "fetched_at FROM citations WHERE url = ?",
+                    (normalize_url(url),),
+                )
+                .fetchone()
+            )
+        if row is None:
+            return None
+        title, author, date, publisher, accessed, etag, last_modified, fetched_at = row
+        citation = Citation(
+            url=url, title=title, author=author, date=date, publisher=publisher, accessed=accessed
+        )
+        return CachedCitation(citation, etag, last_modified, fetched_at)
+
+    def put(
+        self,
+        citation: Citation,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        """Store freshly fetched metadata.
+
+        Args:
+            citation: Parsed citation; its normalized URL is the key.
+            etag: ETag response header, if any.
+            last_modified: Last-Modified response header, if any.
+        """
+        with self._lock, self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO citations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    normalize_url(citation.url),
+                    citation.title,
+                    citation.author,
+                    citation.date,
+                    citation.publisher,
+                    citation.accessed,
+                    etag,
+                    last_modified,
+                    time.time(),
+                ),
+            )
+
+    def refresh(self, url: str, accessed: str) -> None:
+        """Mark an entry as revalidated (the server answered 304 Not Modified)."""
+        with self._lock, self._connection() as conn:
+            conn.execute(
+                "UPDATE citations SET fetched_at = ?, accessed = ? WHERE url = ?",
+                (time.time(), accessed, normalize_url(url)),
+            )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_citation_caches: dict[Path, CitationCache] = {}
+
+
+def get_citation_cache(cache_dir: Path, ttl: float = 7 * 24 * 3600) -> CitationCache:
+    """Get the shared citation cache for a cache directory."""
+    path = cache_dir / "citations.sqlite3"
+    cache = _citation_caches.get(path)
+    if cache is None:
+        cache = CitationCache(path, ttl=ttl)
+        _citation_caches[path] = cache
+    cache.ttl = ttl
+    return cache
@@ -0,0 +1,230 @@
+"""Extract citation metadata from the head of a web page or from a PDF.
+
+Only the ``<head>`` of an HTML page carries citation metadata, so callers stop
+reading at ``</head>`` and hand that prefix to ``parse_html_head``, which collects
+``<title>``, ``<meta>`` tags (plain, OpenGraph, Highwire ``citation_*``, Dublin
+Core) and JSON-LD blocks in a single pass of one precompiled pattern.
+"""
+
+from __future__ import annotations
+
+import html
+import json
+import re
+from typing import Any
+
+# Fields extracted for a citation
+FIELDS = ("title", "author", "date", "publisher")
+
+# Marks the end of the head; pages without </head> are cut at <body>
+HEAD_END = re.compile(rb"</head\s*>|<body[\s>]", re.IGNORECASE)
+
+_HEAD_TOKEN = re.compile(
+    r"<!--.*?-->"
+    r"|<title\b[^>]*>(?P<title>.*?)</title\s*>"
+    r"|<meta\b(?P<meta>[^>]*)>"
+    r"|<script\b(?P<script_attrs>[^>]*)>(?P<script>.*?)</script\s*>",
+    re.IGNORECASE | re.DOTALL,
+)
+_ATTRIBUTE = re.compile(
+    r"""([\w:.-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""",
+)
+_JSON_LD = re.compile(r"application/ld\+json", re.IGNORECASE)
+
+# Metadata names by field, most specific first; JSON-LD and <title> come after these
+_META_NAMES = {
+    "title": ("citation_title", "og:title", "dc.title", "twitter:title"),
+    "author": ("citation_author", "author", "dc.creator", "article:author"),
+    "date": (
+        "citation_publication_date",
+        "citation_date",
+        "article:published_time",
+        "date",
+        "dc.date",
+    ),
+    "publisher": ("og:site_name", "citation_publisher", "citation_journal_title", "dc.publisher"),
+}
+
+# PDF document information dictionary entries: /Title (literal) or /Title <hex>
+_PDF_INFO = re.compile(
+    rb"/(Title|Author|CreationDate)\s*(\((?:\\.|[^\\)])*\)|<[0-9A-Fa-f\s]*>)",
+    re.DOTALL,
+)
+_PDF_DATE = re.compile(r"D:(\d{4})(\d{2})?(\d{2})?")
+_PDF_ESCAPE = re.compile(rb"\\([0-7]{1,3}|\r?\n|.)", re.DOTALL)
+_PDF_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f"}
+# XMP metadata packets are stored uncompressed, so they can be scanned directly
+_XMP_FIELD = re.compile(
+    rb"<(dc:title|dc:creator|xmp:CreateDate)\b[^>]*>(.*?)</\1>",
+    re.DOTALL,
+)
+_XMP_ITEM = re.compile(rb"<rdf:li\b[^>]*>(.*?)</rdf:li>", re.DOTALL)
+
+
+def parse_html_head(head: str) -> dict[str, str]:
+    """Extract citation fields from the head of an HTML page.
+
+    Args:
+        head: Decoded page prefix, usually up to ``</head>``.
+
+    Returns:
+        The fields of ``FIELDS`` that were found, with entities unescaped.
+    """
+    title = ""
+    meta: dict[str, list[str]] = {}
+    linked_data: dict[str, str] = {}
+
+    for token in _HEAD_TOKEN.finditer(head):
+        if token.group("title") is not None:
+            title = title or token.group("title")
+        elif token.group("meta") is not None:
+            attributes = _attributes(token.group("meta"))
+            key = attributes.get("name") or attributes.get("property") or attributes.get("itemprop")
+            content = attributes.get("content")
+            if key and content:
+                meta.setdefault(key.lower(), []).append(content)
+        elif token.group("script") is not None and _JSON_LD.search(token.group("script_attrs")):
+            for field, value in _parse_json_ld(token.group("script")).items():
+                linked_data.setdefault(field, value)
+
+    fields: dict[str, str] = {}
+    for field, names in _META_NAMES.items():
+        for name in names:
+            values = [v for v in meta.get(name, []) if not _is_url(v)]
+            if values:
+                # Scholarly pages list one citation_author tag per author
+                fields[field] = ", ".join(dict.fromkeys(values)) if field == "author" else values[0]
+                break
+        else:
+            if field in linked_data:
+                fields[field] = linked_data[field]
+    if "title" not in fields and title:
+        fields["title"] = title
+
+    return {field: _clean(value) for field, value in fields.items() if _clean(value)}
+
+
+def parse_pdf_metadata(data: bytes) -> dict[str, str]:
+    """Extract citation fields from the leading bytes of a PDF.
+
+    Reads the document information dictionary and the XMP packet when they're
+    within ``data`` (linearized PDFs keep them near the start).
+
+    Args:
+        data: PDF bytes, possibly truncated.
+
+    Returns:
+        The fields of ``FIELDS`` that were found.
+    """
+    fields: dict[str, str] = {}
+    for match in _PDF_INFO.finditer(data):
+        key, value = match.group(1), _pdf_string(match.group(2))
+        if key == b"Title":
+            fields.setdefault("title", value)
+        elif key == b"Author":
+            fields.setdefault("author", value)
+        elif key == b"CreationDate":
+            fields.setdefault("date", _pdf_date(value))
+
+    for match in _XMP_FIELD.finditer(data):
+        items = _XMP_ITEM.findall(match.group(2)) or [match.group(2)]
+        values = [html.unescape(item.decode("utf-8", "replace")).strip() for item in items]
+        values = [value for value in values if value]
+        if not values:
+            continue
+        if match.group(1) == b"dc:title":
+            fields.setdefault("title", values[0])
+        elif match.group(1) == b"dc:creator":
+            fields.setdefault("author", ", ".join(values))
+        else:
+            fields.setdefault("date", values[0][:10])
+
+    return {field: _clean(value) for field, value in fields.items() if _clean(value)}
+
+
+def _attributes(text: str) -> dict[str, str]:
+    attributes = {}
+    for match in _ATTRIBUTE.finditer(text):
+        value = next((v for v in match.groups()[1:] if v is not None), "")
+        attributes.setdefault(match.group(1).lower(), value)
+    return attributes
+
+
+def _parse_json_ld(text: str) -> dict[str, str]:
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return {}
+
+    nodes: list[Any] = []
+    for node in data if isinstance(data, list) else [data]:
+        if isinstance(node, dict):
+            nodes.append(node)
+            nodes.extend(n for n in node.get("@graph", []) if isinstance(n, dict))
+
+    fields: dict[str, str] = {}
+    # An article's headline beats the name of the page, site or organization
+    titles = [node.get(key) for key in ("headline", "name") for node in nodes]
+    title = next((t for t in titles if isinstance(t, str) and t.strip()), None)
+    if title:
+        fields["title"] = title
+    for node in nodes:
+        authors = _names(node.get("author"))
+        if authors and "author" not in fields:
+            fields["author"] = ", ".join(authors)
+        published = node.get("datePublished")
+        if isinstance(published, str) and "date" not in fields:
+            fields["date"] = published
+        publishers = _names(node.get("publisher"))
+        if publishers and "publisher" not in fields:
+            fields["publisher"] = publishers[0]
+    return fields
+
+
+def _names(value: Any) -> list[str]:
+    """Names from a JSON-LD Person/Organization value (a string, object or list)."""
+    items = value if isinstance(value, list) else [value]
+    names = []
+    for item in items:
+        name = item.get("name") if isinstance(item, dict) else item
+        if isinstance(name, str) and name.strip():
+            names.append(name)
+    return names
+
+
+def _pdf_string(token: bytes) -> str:
+    if token.startswith(b"<"):
+        digits = re.sub(rb"\s", b"", token[1:-1]).decode("ascii")
+        raw = bytes.fromhex(digits + "0" * (len(digits) % 2))
+    else:
+        raw = _PDF_ESCAPE.sub(_pdf_unescape, token[1:-1])
+    if raw.startswith(b"\xfe\xff"):
+        return raw[2:].decode("utf-16-be", "replace")
+    return raw.decode("latin-1")
+
+
+def _pdf_unescape(match: re.Match[bytes]) -> bytes:
+    escape = match.group(1)
+    if escape in _PDF_ESCAPES:
+        return _PDF_ESCAPES[escape]
+    if escape[:1].isdigit():
+        return bytes([int(escape, 8) & 0xFF])
+    if escape.strip(b"\r\n") == b"":
+        return b""  # Line continuation
+    return escape  # Unknown escapes stand for the character itself
+
+
+def _pdf_date(value: str) -> str:
+    match = _PDF_DATE.match(value)
+    if match is None:
+        return value
+    return "-".join(part for part in match.groups() if part)
+
+
+def _is_url(value: str) -> bool:
+    # article:author is often a profile URL rather than a name
+    return value.startswith(("http://", "https://"))
+
+
+def _clean(value: str) -> str:
+    return " ".join(html.unescape(value).split())
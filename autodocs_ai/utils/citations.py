@@ -1,10 +1,36 @@
-"""Auto-citation engine for generating bibliographies from URLs."""
+"""Auto-citation engine for generating bibliographies from URLs.
+
+Metadata for a bibliography is fetched with ``fetch_citations``, which shares one
+pooled HTTP client across all URLs, so repeated hosts reuse their connections
+instead of paying a TLS handshake per source. Pages are streamed and only read
+as far as their metadata goes (see ``citation_metadata``).
+"""
 
 from __future__ import annotations
 
+import asyncio
 import re
 from dataclasses import dataclass, field
 from datetime import datetime
+from typing import TYPE_CHECKING
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from autodocs_ai.utils.citation_metadata import HEAD_END, parse_html_head, parse_pdf_metadata
+
+if TYPE_CHECKING:
+    import httpx
+
+    from autodocs_ai.utils.citation_cache import CitationCache
+
+# Bytes of an HTML page read looking for </head>
+HEAD_BYTES = 64 * 1024
+# Bytes of a PDF scanned for its document information and XMP metadata
+PDF_SCAN_BYTES = 512 * 1024
+_HTML_TYPES = ("text/html", "application/xhtml+xml")
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+# Query parameters that only track the visitor and never change the page
+_TRACKING_PARAMS = re.compile(r"^(utm_\w+|fbclid|gclid|mc_cid|mc_eid)$", re.IGNORECASE)
 
 
 @dataclass
@@ -94,64 +120,237 @@ FORMATTERS = {
 }
 
 
-async def fetch_citation_metadata(url: str) -> Citation:
+def normalize_url(url: str) -> str:
+    """Normalize a URL so different spellings of the same page compare equal.
+
+    Lowercases the scheme and host, drops default ports, fragments and tracking
+    query parameters (utm_*, fbclid, ...), and gives bare hosts a "/" path.
+
+    Args:
+        url: The URL to normalize.
+
+    Returns:
+        The normalized URL.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port is not None and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    if parts.username:
+        credentials = parts.username + (f":{parts.password}" if parts.password else "")
+        host = f"{credentials}@{host}"
+    query = urlencode(
+        [
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not _TRACKING_PARAMS.match(key)
+        ]
+    )
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+
+def create_client(
+    http2: bool = False,
+    max_connections: int = 10,
+    timeout: float = 10,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> httpx.AsyncClient:
+    """Create the pooled HTTP client used to fetch citation metadata.
+
+    Args:
+        http2: Negotiate HTTP/2, multiplexing requests to a host over one connection.
+        max_connections: Size of the connection pool.
+        timeout: Timeout of each request, in seconds.
+        transport: Custom transport (e.g. ``httpx.MockTransport`` in tests).
+
+    Returns:
+        An ``httpx.AsyncClient``; the caller is responsible for closing it.
+
+    Raises:
+        ImportError: If HTTP/2 is requested but the h2 package is not installed.
+    """
+    import httpx
+
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            raise ImportError(
+                "h2 package is required for HTTP/2. Install with: pip install autodocs-ai[http2]"
+            )
+
+    return httpx.AsyncClient(
+        follow_redirects=True,
+        timeout=timeout,
+        http2=http2,
+        limits=httpx.Limits(max_connections=max_connections),
+        transport=transport,
+    )
+
+
+async def _read_prefix(
+    response: httpx.Response, max_bytes: int, stop: re.Pattern[bytes] | None = None
+) -> bytes:
+    """Read a response body up to ``max_bytes`` or the first match of ``stop``."""
+    buffer = bytearray()
+    async for chunk in response.aiter_bytes():
+        scan_from = max(0, len(buffer) - 16)  # A marker may straddle two chunks
+        buffer += chunk
+        if len(buffer) >= max_bytes or (stop is not None and stop.search(buffer, scan_from)):
+            break
+    return bytes(buffer[:max_bytes])
+
+
+async def _fetch_fields(
+    client: httpx.AsyncClient, url: str, headers: dict[str, str], max_bytes: int
+) -> tuple[httpx.Response, dict[str, str]]:
+    """Request a page and extract citation fields from as little of it as possible.
+
+    Returns:
+        The response (closed, with the rest of the body unread) and the fields found.
+    """
+    async with client.stream("GET", url, headers=headers) as response:
+        if not response.is_success:
+            return response, {}
+        content_type = response.headers.get("Content-Type", "text/html")
+        content_type = content_type.split(";")[0].strip().lower()
+        if content_type in _HTML_TYPES:
+            head = await _read_prefix(response, max_bytes, HEAD_END)
+            return response, parse_html_head(head.decode(response.encoding or "utf-8", "replace"))
+        if content_type == "application/pdf":
+            return response, parse_pdf_metadata(await _read_prefix(response, PDF_SCAN_BYTES))
+        # Images, archives, ...: nothing to cite beyond the URL
+        return response, {}
+
+
+async def fetch_citation_metadata(
+    url: str,
+    client: httpx.AsyncClient | None = None,
+    cache: CitationCache | None = None,
+    max_bytes: int = HEAD_BYTES,
+) -> Citation:
     """Fetch metadata from a URL to build a citation.
 
+    The response is streamed: HTML pages are read up to ``</head>``, PDFs only for
+    their metadata, and other content types not at all.
+
     Args:
         url: The URL to fetch metadata from.
+        client: Shared client to fetch with (see ``create_client``). Without one, a
+            client is created for this request alone.
+        cache: Citation cache. Fresh entries are returned without a request; stale
+            ones are revalidated with a conditional request, and served as-is if
+            the page can't be fetched.
+        max_bytes: Maximum number of bytes of an HTML page to read.
 
     Returns:
         Citation object with available metadata.
     """
-    import httpx
+    cached = cache.get(url) if cache is not None else None
+    if cached is not None and cached.is_fresh(cache.ttl):
+        return cached.citation
 
     citation = Citation(url=url)
+    headers = cached.conditional_headers() if cached is not None else {}
 
     try:
-        async with httpx.AsyncClient(follow_redirects=True, timeout=10) as client:
-            response = await client.get(url)
-            html = response.text
-
-            # Extract title
-            title_match = re.search(r"<title[^>]*>(.*?)</title>", html, re.IGNORECASE | re.DOTALL)
-            if title_match:
-                citation.title = title_match.group(1).strip()
-
-            # Extract meta author
-            author_match = re.search(
-                r'<meta[^>]+name=["\']author["\'][^>]+content=["\'](.*?)["\']',
-                html,
-                re.IGNORECASE,
-            )
-            if author_match:
-                citation.author = author_match.group(1).strip()
-
-            # Extract meta date
-            date_match = re.search(
-                r'<meta[^>]+(?:name|property)=["\'](?:date|article:published_time)["\']'
-                r'[^>]+content=["\'](.*?)["\']',
-                html,
-                re.IGNORECASE,
-            )
-            if date_match:
-                citation.date = date_match.group(1).strip()
-
-            # Extract publisher / site name
-            site_match = re.search(
-                r'<meta[^>]+property=["\']og:site_name["\'][^>]+content=["\'](.*?)["\']',
-                html,
-                re.IGNORECASE,
-            )
-            if site_match:
-                citation.publisher = site_match.group(1).strip()
+        if client is None:
+            async with create_client() as own_client:
+                response, fields = await _fetch_fields(own_client, url, headers, max_bytes)
+        else:
+            response, fields = await _fetch_fields(client, url, headers, max_bytes)
+
+        if response.status_code == 304 and cached is not None:
+            cache.refresh(url, citation.accessed)
+            cached.citation.accessed = citation.accessed
+            return cached.citation
+        if not response.is_success and cached is not None:
+            return cached.citation  # Error page (404, 429, 5xx): keep what we had
 
+        for name, value in fields.items():
+            setattr(citation, name, value)
+        if cache is not None and response.is_success:
+            cache.put(citation, response.headers.get("ETag"), response.headers.get("Last-Modified"))
     except Exception:
-        # If we can't fetch, return what we have (just the URL)
-        pass
+        # If we can't fetch, fall back to stale metadata or just the URL
+        if cached is not None:
+            return cached.citation
 
     return citation
 
 
+async def fetch_citations(
+    urls: list[str],
+    client: httpx.AsyncClient | None = None,
+    max_concurrency: int = 10,
+    per_host: int = 4,
+    deadline: float | None = 30,
+    http2: bool = False,
+    cache: CitationCache | None = None,
+    max_bytes: int = HEAD_BYTES,
+) -> list[Citation]:
+    """Fetch metadata for many URLs concurrently over one pooled client.
+
+    URLs are deduplicated after normalization (see ``normalize_url``). At most
+    ``max_concurrency`` requests are in flight at once, and at most ``per_host`` to
+    any one host, so a bibliography dominated by one site doesn't hammer it.
+
+    Args:
+        urls: URLs to cite.
+        client: Shared client to fetch with. Without one, a pooled client is created
+            (see ``create_client``) and closed afterwards.
+        max_concurrency: Maximum number of requests in flight.
+        per_host: Maximum number of requests in flight to a single host.
+        deadline: Seconds the whole batch may take, or None to wait for every URL.
+            Pages not fetched by then are cited by URL only.
+        http2: Use HTTP/2 for the client created here (requires h2).
+        cache: Citation cache (see ``fetch_citation_metadata``). If every URL has a
+            fresh entry, no client is created at all.
+        max_bytes: Maximum number of bytes of an HTML page to read.
+
+    Returns:
+        One citation per unique URL, in the order the URLs were first given.
+    """
+    unique = list(dict.fromkeys(normalize_url(url) for url in urls))
+    if not unique:
+        return []
+
+    results: dict[str, Citation] = {}
+    if cache is not None:
+        for url in unique:
+            cached = cache.get(url)
+            if cached is not None and cached.is_fresh(cache.ttl):
+                results[url] = cached.citation
+    missing = [url for url in unique if url not in results]
+    if not missing:
+        return [results[url] for url in unique]
+
+    overall = asyncio.Semaphore(max_concurrency)
+    hosts: dict[str, asyncio.Semaphore] = {}
+
+    async def fetch(url: str, session: httpx.AsyncClient) -> Citation:
+        host = hosts.setdefault(urlsplit(url).netloc, asyncio.Semaphore(per_host))
+        async with host, overall:
+            return await fetch_citation_metadata(url, session, cache, max_bytes)
+
+    async def fetch_all(session: httpx.AsyncClient) -> list[Citation]:
+        tasks = {url: asyncio.ensure_future(fetch(url, session)) for url in missing}
+        _, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.wait(pending)
+        for url, task in tasks.items():
+            results[url] = task.result() if task not in pending else Citation(url=url)
+        return [results[url] for url in unique]
+
+    if client is not None:
+        return await fetch_all(client)
+    async with create_client(http2=http2, max_connections=max_concurrency) as own_client:
+        return await fetch_all(own_client)
+
+
 def generate_bibliography(
     citations: list[Citation],
     style: str = "apa",
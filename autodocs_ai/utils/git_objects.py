@@ -0,0 +1,603 @@
+"""Minimal in-process git object store.
+
+Reads and writes the parts of a git repository that document versioning needs —
+loose objects, trees, commits, branch refs, the index and config — directly on
+disk, so a version commit costs a few file writes instead of several git process
+launches. The repositories it writes are ordinary git repositories. Objects that
+git itself has since packed (``git gc``) are read through ``git cat-file``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import stat
+import struct
+import subprocess
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+
+EMPTY_TREE = "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
+DEFAULT_BRANCH = "main"
+DEFAULT_IDENTITY = "autodocs-ai <autodocs-ai@localhost>"
+
+_INDEX_HEADER = struct.Struct(">4sII")
+_INDEX_ENTRY = struct.Struct(">10I20sH")
+_FILE_MODE = 0o100644
+_EXECUTABLE_MODE = 0o100755
+_TREE_MODE = 0o40000
+_LOCK_POLL_SECONDS = 0.02
+# How long a ref update waits for another process's lock, like core.filesRefLockTimeout
+_REF_LOCK_TIMEOUT = 1.0
+_CONFIG_SECTION = re.compile(r'\[\s*([\w.-]+)(?:\s+"((?:[^"\\]|\\.)*)")?\s*\]')
+
+
+class GitError(Exception):
+    """Raised when the repository is missing, corrupt or lacks an object."""
+
+
+class LockFile:
+    """Exclusive update of a file through ``<file>.lock``, git's locking protocol.
+
+    The lock is created exclusively, so it fails while another process (autodocs-ai
+    or git itself) holds it, and committing renames it over the file. Used as a
+    context manager, a lock that wasn't committed is removed on exit.
+
+    Args:
+        path: The file to update.
+        timeout: Seconds to wait for another process's lock to go away.
+    """
+
+    def __init__(self, path: Path, timeout: float = 0.0) -> None:
+        self.path = path
+        self.lock_path = path.with_name(f"{path.name}.lock")
+        self.timeout = timeout
+        self._fd: int | None = None
+        self._held = False
+
+    def __enter__(self) -> LockFile:
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.release()
+
+    def acquire(self) -> None:
+        """Take the lock.
+
+        Raises:
+            GitError: If another process still holds it after ``timeout``.
+        """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                self._fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666)
+            except FileExistsError:
+                if time.monotonic() >= deadline:
+                    raise GitError(
+                        f"Unable to create {self.lock_path}: another process is updating "
+                        f"{self.path.name}"
+                    ) from None
+                time.sleep(_LOCK_POLL_SECONDS)
+                continue
+            self._held = True
+            return
+
+    def commit(self, data: bytes) -> None:
+        """Replace the file with new content and release the lock."""
+        if not self._held or self._fd is None:
+            raise GitError(f"{self.lock_path} is not held")
+        fd, self._fd = self._fd, None
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(self.lock_path, self.path)
+        self._held = False
+
+    def release(self) -> None:
+        """Give up the lock without changing the file (if it wasn't committed)."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        if self._held:
+            self.lock_path.unlink(missing_ok=True)
+            self._held = False
+
+
+@dataclass
+class IndexEntry:
+    """A staged file: its blob and the stat data used to detect changes."""
+
+    path: str
+    sha: str
+    mode: int
+    size: int
+    mtime_ns: int
+    ctime_ns: int = 0
+    dev: int = 0
+    ino: int = 0
+    uid: int = 0
+    gid: int = 0
+
+    def matches(self, st: os.stat_result) -> bool:
+        """Whether a file with this stat result is unchanged since it was staged."""
+        return (
+            self.size == st.st_size
+            and self.mtime_ns == st.st_mtime_ns
+            and self.ino & 0xFFFFFFFF == st.st_ino & 0xFFFFFFFF
+        )
+
+
+@dataclass
+class Commit:
+    """A parsed commit object."""
+
+    sha: str
+    tree: str
+    parents: list[str]
+    author: str
+    timestamp: int
+    timezone: str  # e.g. "+0200"
+    message: str
+
+
+class GitRepository:
+    """A repository with a working tree, read and written without the git CLI.
+
+    Args:
+        worktree: Directory containing the ``.git`` directory.
+    """
+
+    def __init__(self, worktree: Path) -> None:
+        self.worktree = worktree
+        self.git_dir = worktree / ".git"
+
+    @classmethod
+    def init(cls, worktree: Path, branch: str = DEFAULT_BRANCH) -> GitRepository:
+        """Create an empty repository (like ``git init``)."""
+        repo = cls(worktree)
+        for directory in ("objects/info", "objects/pack", "refs/heads", "refs/tags"):
+            (repo.git_dir / directory).mkdir(parents=True, exist_ok=True)
+        (repo.git_dir / "HEAD").write_text(f"ref: refs/heads/{branch}\n")
+        (repo.git_dir / "config").write_text(
+            "[core]\n\trepositoryformatversion = 0\n\tfilemode = true\n"
+            "\tbare = false\n\tlogallrefupdates = true\n"
+        )
+        return repo
+
+    def exists(self) -> bool:
+        return (self.git_dir / "HEAD").exists()
+
+    # Config
+
+    def config(self, key: str) -> str | None:
+        """A setting (e.g. ``user.name``) from the repository's config, else the user's.
+
+        System-wide config isn't read.
+        """
+        key = key.lower()
+        for path in [self.git_dir / "config", *global_config_paths()]:
+            value = read_config(path).get(key)
+            if value is not None:
+                return value
+        return None
+
+    # Objects
+
+    def _object_path(self, sha: str) -> Path:
+        return self.git_dir / "objects" / sha[:2] / sha[2:]
+
+    def hash_object(self, kind: str, data: bytes) -> tuple[str, bytes]:
+        """Compute the id of an object and its serialized (uncompressed) form."""
+        raw = f"{kind} {len(data)}".encode() + b"\0" + data
+        return hashlib.sha1(raw).hexdigest(), raw
+
+    def write_object(self, kind: str, data: bytes) -> str:
+        """Store an object (blob, tree or commit) unless it already exists.
+
+        Returns:
+            The object id.
+        """
+        sha, raw = self.hash_object(kind, data)
+        path = self._object_path(sha)
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            tmp = path.with_name(f"tmp_{os.getpid()}_{path.name}")
+            tmp.write_bytes(zlib.compress(raw, 1))
+            tmp.replace(path)
+        return sha
+
+    def read_object(self, sha: str) -> tuple[str, bytes]:
+        """Read an object.
+
+        Returns:
+            The object type and its content.
+
+        Raises:
+            GitError: If the object doesn't exist.
+        """
+        try:
+            raw = zlib.decompress(self._object_path(sha).read_bytes())
+        except FileNotFoundError:
+            return self._read_packed_object(sha)
+        header, _, data = raw.partition(b"\0")
+        kind, _, _ = header.decode().partition(" ")
+        return kind, data
+
+    def _read_packed_object(self, sha: str) -> tuple[str, bytes]:
+        kind = self._git(["cat-file", "-t", sha])
+        data = self._git(["cat-file", kind.decode().strip(), sha])
+        return kind.decode().strip(), data
+
+    def _git(self, args: list[str]) -> bytes:
+        try:
+            result = subprocess.run(
+                ["git", *args], cwd=self.worktree, capture_output=True, timeout=30
+            )
+        except OSError as e:
+            raise GitError(f"Object not found and git is unavailable: {e}") from e
+        if result.returncode != 0:
+            raise GitError(result.stderr.decode(errors="replace").strip())
+        return result.stdout
+
+    def resolve(self, revision: str) -> str:
+        """Resolve HEAD, HEAD~N, a branch name or a (possibly abbreviated) commit id.
+
+        Raises:
+            GitError: If the revision doesn't name a commit.
+        """
+        name, tilde, back = revision.partition("~")
+        if name in ("HEAD", "") or (self.git_dir / "refs" / "heads" / name).exists():
+            sha = self.head() if name in ("HEAD", "") else self._read_ref(f"refs/heads/{name}")
+            if sha is None:
+                raise GitError(f"Unknown revision: {revision}")
+        else:
+            sha = self._expand(name)
+        if back and not back.isdigit():
+            raise GitError(f"Unknown revision: {revision}")
+        for _ in range(int(back) if back else int(bool(tilde))):
+            parents = self.read_commit(sha).parents
+            if not parents:
+                raise GitError(f"Unknown revision: {revision}")
+            sha = parents[0]
+        return sha
+
+    def _expand(self, prefix: str) -> str:
+        prefix = prefix.lower()
+        if len(prefix) == 40:
+            return prefix
+        if len(prefix) < 4 or any(c not in "0123456789abcdef" for c in prefix):
+            raise GitError(f"Unknown revision: {prefix}")
+        directory = self.git_dir / "objects" / prefix[:2]
+        matches = [prefix[:2] + p.name for p in directory.glob(f"{prefix[2:]}*")]
+        if len(matches) == 1:
+            return matches[0]
+        if matches:
+            raise GitError(f"Ambiguous revision: {prefix}")
+        return self._git(["rev-parse", "--verify", f"{prefix}^{{commit}}"]).decode().strip()
+
+    # Trees and commits
+
+    def write_tree(self, entries: dict[str, tuple[int, str]]) -> str:
+        """Write the trees for a set of files.
+
+        Args:
+            entries: File mode and blob id by slash-separated path.
+
+        Returns:
+            The id of the root tree.
+        """
+        root: dict = {}
+        for path, entry in entries.items():
+            *dirs, name = path.split("/")
+            node = root
+            for directory in dirs:
+                node = node.setdefault(directory, {})
+            node[name] = entry
+        return self._write_tree_node(root)
+
+    def _write_tree_node(self, node: dict) -> str:
+        items = []
+        for name, value in node.items():
+            if isinstance(value, dict):
+                # Git orders directories as if their name ended with "/"
+                items.append((name + "/", name, _TREE_MODE, self._write_tree_node(value)))
+            else:
+                items.append((name, name, value[0], value[1]))
+        items.sort(key=lambda item: item[0].encode())
+        data = b"".join(
+            f"{mode:o} {name}".encode() + b"\0" + bytes.fromhex(sha) for _, name, mode, sha in items
+        )
+        return self.write_object("tree", data)
+
+    def read_tree(self, sha: str, prefix: str = "") -> dict[str, tuple[int, str]]:
+        """Read a tree recursively.
+
+        Returns:
+            File mode and blob id by slash-separated path.
+        """
+        kind, data = self.read_object(sha)
+        if kind != "tree":
+            raise GitError(f"{sha} is not a tree")
+        entries: dict[str, tuple[int, str]] = {}
+        pos = 0
+        while pos < len(data):
+            space = data.index(b" ", pos)
+            nul = data.index(b"\0", space)
+            mode = int(data[pos:space], 8)
+            name = data[space + 1 : nul].decode()
+            child = data[nul + 1 : nul + 21].hex()
+            pos = nul + 21
+            if mode == _TREE_MODE:
+                entries.update(self.read_tree(child, f"{prefix}{name}/"))
+            else:
+                entries[prefix + name] = (mode, child)
+        return entries
+
+    def write_commit(
+        self,
+        tree: str,
+        parents: list[str],
+        message: str,
+        identity: str = DEFAULT_IDENTITY,
+        timestamp: int | None = None,
+    ) -> str:
+        """Write a commit object (without moving any ref).
+
+        Returns:
+            The commit id.
+        """
+        when = int(time.time()) if timestamp is None else timestamp
+        signature = f"{identity} {when} {_timezone(when)}"
+        lines = [f"tree {tree}", *(f"parent {p}" for p in parents)]
+        lines += [f"author {signature}", f"committer {signature}", "", message.rstrip("\n")]
+        return self.write_object("commit", ("\n".join(lines) + "\n").encode())
+
+    def read_commit(self, sha: str) -> Commit:
+        """Read and parse a commit object."""
+        kind, data = self.read_object(sha)
+        if kind != "commit":
+            raise GitError(f"{sha} is not a commit")
+        header, _, message = data.decode("utf-8", "replace").partition("\n\n")
+        tree, parents, author, timestamp, timezone = "", [], "", 0, "+0000"
+        for line in header.splitlines():
+            key, _, value = line.partition(" ")
+            if key == "tree":
+                tree = value
+            elif key == "parent":
+                parents.append(value)
+            elif key == "author":
+                author, timestamp_text, timezone = value.rsplit(" ", 2)
+                timestamp = int(timestamp_text)
+        return Commit(sha, tree, parents, author, timestamp, timezone, message.rstrip("\n"))
+
+    # Refs
+
+    def head_ref(self) -> str | None:
+        """The ref HEAD points to, or None for a detached HEAD."""
+        content = (self.git_dir / "HEAD").read_text().strip()
+        return content[5:] if content.startswith("ref: ") else None
+
+    def head(self) -> str | None:
+        """The commit HEAD points to, or None in an empty repository."""
+        ref = self.head_ref()
+        if ref is None:
+            return (self.git_dir / "HEAD").read_text().strip()
+        return self._read_ref(ref)
+
+    def _read_ref(self, ref: str) -> str | None:
+        try:
+            return (self.git_dir / ref).read_text().strip()
+        except FileNotFoundError:
+            pass
+        try:
+            packed = (self.git_dir / "packed-refs").read_text()
+        except FileNotFoundError:
+            return None
+        for line in packed.splitlines():
+            sha, _, name = line.partition(" ")
+            if name == ref:
+                return sha
+        return None
+
+    def update_head(self, sha: str, old: str | None) -> None:
+        """Point HEAD's branch (or a detached HEAD) at a commit.
+
+        Args:
+            sha: The new commit.
+            old: The commit HEAD must still point to (None in an empty repository),
+                so a commit made meanwhile by another process isn't overwritten.
+
+        Raises:
+            GitError: If HEAD has moved, or another process is updating it.
+        """
+        path = self.git_dir / (self.head_ref() or "HEAD")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with LockFile(path, _REF_LOCK_TIMEOUT) as lock:
+            current = self.head()
+            if current != old:
+                raise GitError(f"HEAD moved to {current} by another process; commit again")
+            lock.commit(f"{sha}\n".encode())
+
+    # Index
+
+    def read_index(self) -> dict[str, IndexEntry]:
+        """Read the staged files (``.git/index``, version 2 or 3)."""
+        try:
+            data = (self.git_dir / "index").read_bytes()
+        except FileNotFoundError:
+            return {}
+        signature, version, count = _INDEX_HEADER.unpack_from(data)
+        if signature != b"DIRC" or version not in (2, 3):
+            raise GitError(f"Unsupported index format (version {version})")
+
+        entries: dict[str, IndexEntry] = {}
+        pos = _INDEX_HEADER.size
+        for _ in range(count):
+            fields = _INDEX_ENTRY.unpack_from(data, pos)
+            ctime_s, ctime_ns, mtime_s, mtime_ns, dev, ino, mode, uid, gid, size = fields[:10]
+            sha, flags = fields[10].hex(), fields[11]
+            start = pos + _INDEX_ENTRY.size + (2 if flags & 0x4000 else 0)
+            end = data.index(b"\0", start)
+            path = data[start:end].decode()
+            entries[path] = IndexEntry(
+                path=path,
+                sha=sha,
+                mode=mode,
+                size=size,
+                mtime_ns=mtime_s * 1_000_000_000 + mtime_ns,
+                ctime_ns=ctime_s * 1_000_000_000 + ctime_ns,
+                dev=dev,
+                ino=ino,
+                uid=uid,
+                gid=gid,
+            )
+            length = end - pos
+            pos += length + (8 - length % 8)
+        return entries
+
+    def lock_index(self, timeout: float = 0.0) -> LockFile:
+        """The index's lock, to hold while reading, updating and writing the index."""
+        return LockFile(self.git_dir / "index", timeout)
+
+    def write_index(self, entries: dict[str, IndexEntry], lock: LockFile | None = None) -> None:
+        """Write the staged files as a version 2 index.
+
+        Args:
+            entries: The staged files.
+            lock: The held index lock (see ``lock_index``); if None, the index is
+                locked just for the write.
+        """
+        parts = [_INDEX_HEADER.pack(b"DIRC", 2, len(entries))]
+        for path in sorted(entries, key=lambda p: p.encode()):
+            entry = entries[path]
+            name = path.encode()
+            fields = (
+                entry.ctime_ns // 1_000_000_000,
+                entry.ctime_ns % 1_000_000_000,
+                entry.mtime_ns // 1_000_000_000,
+                entry.mtime_ns % 1_000_000_000,
+                entry.dev,
+                entry.ino,
+                entry.mode,
+                entry.uid,
+                entry.gid,
+                entry.size,
+            )
+            packed = _INDEX_ENTRY.pack(
+                *(value & 0xFFFFFFFF for value in fields),
+                bytes.fromhex(entry.sha),
+                min(len(name), 0xFFF),
+            )
+            length = len(packed) + len(name)
+            parts.append(packed + name + b"\0" * (8 - length % 8))
+        content = b"".join(parts)
+        content += hashlib.sha1(content).digest()
+        if lock is not None:
+            lock.commit(content)
+        else:
+            with self.lock_index() as own_lock:
+                own_lock.commit(content)
+
+    def stage(self, path: str, previous: IndexEntry | None = None) -> IndexEntry:
+        """Hash a working tree file into the object store.
+
+        Args:
+            path: Slash-separated path relative to the working tree.
+            previous: The file's current index entry; if the file's stat data still
+                matches it, the file isn't read again.
+
+        Returns:
+            The index entry for the file.
+        """
+        file_path = self.worktree / path
+        st = file_path.stat()
+        mode = _EXECUTABLE_MODE if st.st_mode & stat.S_IXUSR else _FILE_MODE
+        if previous is not None and previous.mode == mode and previous.matches(st):
+            return previous
+        sha = self.write_object("blob", file_path.read_bytes())
+        return index_entry(path, sha, mode, st)
+
+
+def index_entry(path: str, sha: str, mode: int, st: os.stat_result) -> IndexEntry:
+    """Build an index entry from a file's stat data."""
+    return IndexEntry(
+        path=path,
+        sha=sha,
+        mode=mode,
+        size=st.st_size,
+        mtime_ns=st.st_mtime_ns,
+        ctime_ns=st.st_ctime_ns,
+        dev=st.st_dev,
+        ino=st.st_ino,
+        uid=st.st_uid,
+        gid=st.st_gid,
+    )
+
+
+def config_home() -> Path:
+    """The XDG config directory, where git also looks for ``git/config`` and ``git/ignore``."""
+    return Path(os.environ.get("XDG_CONFIG_HOME") or Path.home() / ".config")
+
+
+def global_config_paths() -> list[Path]:
+    """The user's git config files, by precedence."""
+    if os.environ.get("GIT_CONFIG_GLOBAL"):
+        return [Path(os.environ["GIT_CONFIG_GLOBAL"]).expanduser()]
+    return [Path.home() / ".gitconfig", config_home() / "git" / "config"]
+
+
+def read_config(path: Path) -> dict[str, str]:
+    """The settings of a git config file, by ``section.key`` (the last one set wins).
+
+    Section and key names are lowercased; settings of a subsection are keyed
+    ``section.subsection.key``. Includes aren't followed. A missing or unreadable
+    file has no settings.
+    """
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines()
+    except (OSError, UnicodeDecodeError):
+        return {}
+    settings: dict[str, str] = {}
+    section = ""
+    for line in lines:
+        line = line.strip()
+        if not line or line[0] in "#;":
+            continue
+        match = _CONFIG_SECTION.match(line)
+        if match:
+            name, subsection = match.groups()
+            section = name.lower() + (f".{subsection}" if subsection is not None else "")
+            line = line[match.end() :].strip()  # A setting may follow on the same line
+            if not line:
+                continue
+        name, equals, value = line.partition("=")
+        # A key without a value is a boolean set to true
+        settings[f"{section}.{name.strip().lower()}"] = _config_value(value) if equals else "true"
+    return settings
+
+
+def _config_value(raw: str) -> str:
+    """Unquote a config value and strip its comment."""
+    chars = []
+    quoted = False
+    escapes = iter(raw)
+    for char in escapes:
+        if char == "\\":
+            escaped = next(escapes, "")
+            chars.append({"n": "\n", "t": "\t", "b": "\b"}.get(escaped, escaped))
+        elif char == '"':
+            quoted = not quoted
+        elif char in "#;" and not quoted:
+            break
+        else:
+            chars.append(char)
+    return "".join(chars).strip()
+
+
+def _timezone(timestamp: int) -> str:
+    offset = time.localtime(timestamp).tm_gmtoff // 60
+    sign = "+" if offset >= 0 else "-"
+    return f"{sign}{abs(offset) // 60:02d}{abs(offset) % 60:02d}"
@@ -0,0 +1,127 @@
+"""Git's ignore rules, so versioning skips the files ``git add -A`` would.
+
+Patterns are read, by increasing precedence, from ``core.excludesFile`` (by
+default ``~/.config/git/ignore``), ``.git/info/exclude`` and the ``.gitignore``
+files of the working tree, each of which applies to its own directory and below.
+The last pattern matching a path decides whether it is ignored, and nothing
+inside an ignored directory can be re-included, as in git.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+from autodocs_ai.utils.git_objects import GitRepository, config_home
+
+
+@dataclass(frozen=True)
+class _Pattern:
+    regex: re.Pattern[str]
+    base: str  # Directory of the file it's from: "" or ending in "/"
+    negated: bool
+    directory_only: bool
+
+
+class IgnoreRules:
+    """The ignore patterns that apply in one directory of a working tree.
+
+    Args:
+        patterns: Patterns by increasing precedence.
+    """
+
+    def __init__(self, patterns: tuple[_Pattern, ...] = ()) -> None:
+        self.patterns = patterns
+
+    @classmethod
+    def for_worktree(cls, worktree: Path) -> IgnoreRules:
+        """The rules of a working tree's root, before its ``.gitignore`` files."""
+        excludes = GitRepository(worktree).config("core.excludesfile")
+        excludes_file = Path(excludes).expanduser() if excludes else config_home() / "git/ignore"
+        return cls().with_file(excludes_file).with_file(worktree / ".git" / "info" / "exclude")
+
+    def with_file(self, path: Path, base: str = "") -> IgnoreRules:
+        """These rules followed by the patterns of an ignore file, if it exists.
+
+        Args:
+            path: The ignore file.
+            base: Slash-terminated path of the directory its patterns apply to,
+                relative to the working tree ("" for the root).
+        """
+        try:
+            lines = path.read_text(encoding="utf-8", errors="replace").splitlines()
+        except OSError:
+            return self
+        patterns = tuple(p for p in (_parse(line, base) for line in lines) if p is not None)
+        return IgnoreRules(self.patterns + patterns) if patterns else self
+
+    def ignored(self, path: str, is_dir: bool = False) -> bool:
+        """Whether a path (slash-separated, relative to the working tree) is ignored."""
+        for pattern in reversed(self.patterns):
+            if pattern.directory_only and not is_dir:
+                continue
+            if path.startswith(pattern.base) and pattern.regex.fullmatch(path[len(pattern.base) :]):
+                return not pattern.negated
+        return False
+
+
+def _parse(line: str, base: str) -> _Pattern | None:
+    """Compile one line of an ignore file; None for blank lines and comments."""
+    line = re.sub(r"(?<!\\) +$", "", line)  # Trailing spaces, unless escaped
+    if not line or line.startswith("#"):
+        return None
+    negated = line.startswith("!")
+    if negated:
+        line = line[1:]
+    directory_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+    # Patterns with a slash are relative to their directory, others match at any depth
+    anchored = "/" in line
+    regex = _translate(line.lstrip("/"))
+    if not anchored:
+        regex = f"(?:.*/)?{regex}"
+    return _Pattern(re.compile(regex, re.DOTALL), base, negated, directory_only)
+
+
+def _translate(pattern: str) -> str:
+    """Translate a wildcard pattern to a regular expression."""
+    parts = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith("**", i) and (i == 0 or pattern[i - 1] == "/"):
+            if i + 2 == len(pattern):
+                parts.append(".*")  # "dir/**": everything inside
+                i += 2
+                continue
+            if pattern[i + 2] == "/":
+                parts.append("(?:.*/)?")  # "**/": any number of directories
+                i += 3
+                continue
+        if char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "\\" and i + 1 < len(pattern):
+            i += 1
+            parts.append(re.escape(pattern[i]))
+        elif char == "[" and (end := _class_end(pattern, i)) != -1:
+            body = pattern[i + 1 : end].replace("[", r"\[")
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            parts.append(f"[{body}]")
+            i = end
+        else:
+            parts.append(re.escape(char))
+        i += 1
+    return "".join(parts)
+
+
+def _class_end(pattern: str, start: int) -> int:
+    """Index of the "]" closing the character class opened at ``start``, or -1."""
+    first = start + 2 if pattern.startswith("[!", start) else start + 1
+    # A "]" first in the class is part of it
+    return pattern.find("]", first + 1)
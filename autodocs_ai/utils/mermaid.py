@@ -1,13 +1,28 @@
-"""Mermaid diagram rendering utility."""
+"""Mermaid diagram rendering utility.
+
+Every mmdc launch boots a headless browser, which costs seconds, so diagrams are
+rendered in batches: all diagrams of a document go through one mmdc run (split over
+a few concurrent runs for large documents), and rendered images are cached on disk
+by diagram source and theme.
+"""
 
 from __future__ import annotations
 
+import base64
 import re
 import shutil
 import subprocess
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from autodocs_ai.utils.cache import digest, evict_lru, touch
+
+MERMAID_BLOCK = re.compile(r"```mermaid\s*\n(.*?)```", re.DOTALL)
+_BEGIN_DOCUMENT = re.compile(r"\\begin\s*\{document\}")
+# Diagrams per browser session before a batch is split across concurrent runs
+_MIN_BATCH = 4
+
 
 class MermaidError(Exception):
     """Raised when Mermaid rendering fails."""
@@ -22,11 +37,160 @@ def extract_mermaid_blocks(content: str) -> list[str]:
     Returns:
         List of Mermaid diagram source strings.
     """
-    pattern = r"```mermaid\s*\n(.*?)```"
-    return re.findall(pattern, content, re.DOTALL)
+    return MERMAID_BLOCK.findall(content)
+
+
+def _find_mmdc() -> str:
+    mmdc = shutil.which("mmdc")
+    if not mmdc:
+        raise MermaidError(
+            "Mermaid CLI (mmdc) is not installed. "
+            "Install with: npm install -g @mermaid-js/mermaid-cli"
+        )
+    return mmdc
+
+
+def _cache_path(cache_dir: Path, source: str, theme: str, fmt: str) -> Path:
+    return cache_dir / f"{digest(source, theme, fmt)}.{fmt}"
+
+
+def _run_mmdc(args: list[str], timeout: float) -> subprocess.CompletedProcess:
+    try:
+        return subprocess.run(args, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired as e:
+        raise MermaidError(f"Mermaid rendering timed out after {timeout:g}s") from e
+
+
+def _render_one(mmdc: str, source: str, theme: str, fmt: str) -> bytes:
+    """Render a single diagram in its own mmdc run."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        workdir = Path(tmpdir)
+        mmd_path = workdir / "diagram.mmd"
+        out_path = workdir / f"diagram.{fmt}"
+        mmd_path.write_text(source)
+
+        result = _run_mmdc(
+            [mmdc, "-i", str(mmd_path), "-o", str(out_path), "-t", theme, "-b", "transparent"],
+            timeout=30,
+        )
+        if result.returncode != 0 or not out_path.exists():
+            raise MermaidError(f"Mermaid rendering failed:\n{result.stderr}")
+        return out_path.read_bytes()
+
+
+def _render_batch(mmdc: str, sources: list[str], theme: str, fmt: str) -> dict[str, bytes]:
+    """Render several diagrams in one mmdc run (one browser session).
+
+    mmdc renders every Mermaid block of a Markdown input to ``<output>-<n>.<fmt>``.
+    If the batch fails as a whole, the diagrams are retried one by one so a single
+    broken diagram doesn't take the others down with it.
+
+    Returns:
+        Rendered images by diagram source; diagrams that failed are left out.
+    """
+    rendered: dict[str, bytes] = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        workdir = Path(tmpdir)
+        md_path = workdir / "diagrams.md"
+        md_path.write_text("".join(f"```mermaid\n{source}\n```\n\n" for source in sources))
+
+        result = _run_mmdc(
+            [
+                mmdc,
+                "-i",
+                str(md_path),
+                "-o",
+                str(workdir / "out.md"),
+                "-e",
+                fmt,
+                "-t",
+                theme,
+                "-b",
+                "transparent",
+            ],
+            timeout=30 + 5 * len(sources),
+        )
+        if result.returncode == 0:
+            for index, source in enumerate(sources, start=1):
+                image = workdir / f"out-{index}.{fmt}"
+                if image.exists():
+                    rendered[source] = image.read_bytes()
+
+    for source in sources:
+        if source not in rendered:
+            try:
+                rendered[source] = _render_one(mmdc, source, theme, fmt)
+            except MermaidError:
+                continue
+    return rendered
+
+
+def render_mermaid_batch(
+    sources: list[str],
+    fmt: str = "svg",
+    theme: str = "default",
+    cache_dir: Path | None = None,
+    cache_size: int = 256,
+    workers: int = 2,
+) -> dict[str, bytes]:
+    """Render many Mermaid diagrams with as few browser launches as possible.
+
+    Cached diagrams are served from ``cache_dir``. The rest render in one mmdc run,
+    or for many diagrams in up to ``workers`` concurrent runs.
+
+    Args:
+        sources: Mermaid diagram sources (duplicates are rendered once).
+        fmt: Image format (svg or png).
+        theme: Mermaid theme.
+        cache_dir: Directory caching rendered images, or None to disable caching.
+        cache_size: Maximum number of cached images.
+        workers: Maximum number of concurrent mmdc runs.
+
+    Returns:
+        Rendered images by diagram source; diagrams that failed to render are left out.
+
+    Raises:
+        MermaidError: If mmdc is not installed and some diagram isn't cached.
+    """
+    rendered: dict[str, bytes] = {}
+    missing: list[str] = []
+    for source in dict.fromkeys(sources):
+        cached = _cache_path(cache_dir, source, theme, fmt) if cache_dir else None
+        if cached is not None and cached.exists():
+            rendered[source] = cached.read_bytes()
+            touch(cached)
+        else:
+            missing.append(source)
+
+    if not missing:
+        return rendered
 
+    mmdc = _find_mmdc()
+    runs = max(1, min(workers, -(-len(missing) // _MIN_BATCH)))
+    batches = [missing[i::runs] for i in range(runs)]
+    with ThreadPoolExecutor(max_workers=len(batches)) as executor:
+        results = executor.map(lambda batch: _render_batch(mmdc, batch, theme, fmt), batches)
+        fresh = {source: image for result in results for source, image in result.items()}
+    rendered.update(fresh)
 
-def render_mermaid_to_svg(mermaid_source: str, output_path: Path | None = None) -> str:
+    if cache_dir is not None and fresh:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        for source, image in fresh.items():
+            path = _cache_path(cache_dir, source, theme, fmt)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(image)
+            tmp.replace(path)
+        evict_lru(cache_dir, f"*.{fmt}", max_entries=cache_size)
+
+    return rendered
+
+
+def render_mermaid_to_svg(
+    mermaid_source: str,
+    output_path: Path | None = None,
+    theme: str = "default",
+    cache_dir: Path | None = None,
+) -> str:
     """Render a Mermaid diagram to SVG.
 
     Requires mmdc (Mermaid CLI) to be installed:
@@ -35,6 +199,8 @@ def render_mermaid_to_svg(mermaid_source: str, output_path: Path | None = None)
     Args:
         mermaid_source: Mermaid diagram source code.
         output_path: Optional path to save the SVG file.
+        theme: Mermaid theme.
+        cache_dir: Optional directory caching rendered diagrams.
 
     Returns:
         SVG content as a string.
@@ -42,49 +208,116 @@ def render_mermaid_to_svg(mermaid_source: str, output_path: Path | None = None)
     Raises:
         MermaidError: If rendering fails.
     """
-    mmdc = shutil.which("mmdc")
-    if not mmdc:
-        raise MermaidError(
-            "Mermaid CLI (mmdc) is not installed. "
-            "Install with: npm install -g @mermaid-js/mermaid-cli"
-        )
+    cached = _cache_path(cache_dir, mermaid_source, theme, "svg") if cache_dir else None
+    if cached is not None and cached.exists():
+        svg = cached.read_bytes()
+        touch(cached)
+    else:
+        svg = _render_one(_find_mmdc(), mermaid_source, theme, "svg")
+        if cached is not None:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            cached.write_bytes(svg)
 
-    with tempfile.NamedTemporaryFile(suffix=".mmd", mode="w", delete=False) as f:
-        f.write(mermaid_source)
-        f.flush()
-        mmd_path = Path(f.name)
+    if output_path is not None:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_bytes(svg)
+    return svg.decode("utf-8")
 
-    svg_path = output_path or mmd_path.with_suffix(".svg")
 
-    try:
-        result = subprocess.run(
-            [mmdc, "-i", str(mmd_path), "-o", str(svg_path), "-b", "transparent"],
-            capture_output=True,
-            text=True,
-            timeout=30,
-        )
-        if result.returncode != 0:
-            raise MermaidError(f"Mermaid rendering failed:\n{result.stderr}")
+def image_format_for(target: str) -> str:
+    """Image format used to embed diagrams in a target language.
+
+    pdflatex can't include SVG, so LaTeX gets PNG; everything else gets SVG.
+    """
+    return "png" if target == "latex" else "svg"
+
+
+def _typst_string(text: str) -> str:
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _reference(image: bytes, fmt: str, target: str, index: int, image_dir: Path | None) -> str:
+    """Build the markup that embeds a rendered diagram in the target language."""
+    if target == "typst":
+        # Embedded inline: no file to keep around, and no Typst root restrictions
+        return f'#image(bytes({_typst_string(image.decode("utf-8"))}), format: "svg")'
+    if target == "html":
+        return f'<figure class="diagram">{image.decode("utf-8")}</figure>'
+
+    if image_dir is None:
+        encoded = base64.b64encode(image).decode("ascii")
+        mime = "image/svg+xml" if fmt == "svg" else "image/png"
+        return f"![Diagram {index + 1}](data:{mime};base64,{encoded})"
 
-        svg_content = svg_path.read_text()
-        return svg_content
-    finally:
-        mmd_path.unlink(missing_ok=True)
-        if output_path is None:
-            svg_path.unlink(missing_ok=True)
+    image_dir.mkdir(parents=True, exist_ok=True)
+    img_path = image_dir / f"{digest(image)[:16]}.{fmt}"
+    if not img_path.exists():
+        img_path.write_bytes(image)
+    if target == "latex":
+        return f"\\includegraphics[width=\\linewidth]{{{img_path}}}"
+    return f"![Diagram {index + 1}]({img_path})"
+
+
+def substitute_mermaid(
+    content: str,
+    images: dict[str, bytes],
+    target: str,
+    image_dir: Path | None = None,
+) -> str:
+    """Replace rendered Mermaid blocks with image references in a single pass.
+
+    Args:
+        content: Document source with ```mermaid blocks.
+        images: Rendered images by diagram source (see ``render_mermaid_batch``);
+            blocks without an image are left as-is.
+        target: Language of the document: typst, latex, markdown or html.
+        image_dir: Directory for image files. Typst and HTML embed diagrams inline;
+            Markdown falls back to data URIs without one; LaTeX needs it and is
+            returned unchanged without one.
+
+    Returns:
+        The document with diagrams embedded.
+    """
+    if target == "latex" and image_dir is None:
+        return content
+
+    fmt = image_format_for(target)
+    parts: list[str] = []
+    pos = 0
+    for index, match in enumerate(MERMAID_BLOCK.finditer(content)):
+        image = images.get(match.group(1))
+        if image is None:
+            continue
+        parts.append(content[pos : match.start()])
+        parts.append(_reference(image, fmt, target, index, image_dir))
+        pos = match.end()
+    if not parts:
+        return content
+    parts.append(content[pos:])
+    result = "".join(parts)
+
+    if target == "latex" and "graphicx" not in result:
+        result = _BEGIN_DOCUMENT.sub(
+            lambda m: "\\usepackage{graphicx}\n" + m.group(0), result, count=1
+        )
+    return result
 
 
 def replace_mermaid_with_images(
     content: str,
-    output_dir: Path,
-    format: str = "svg",
+    output_dir: Path | None,
+    target: str,
+    theme: str = "default",
+    cache_dir: Path | None = None,
 ) -> str:
-    """Replace Mermaid code blocks with rendered image references.
+    """Render Mermaid code blocks and replace them with image references.
 
     Args:
         content: Document source with ```mermaid blocks.
-        output_dir: Directory to save rendered images.
-        format: Output format (svg or png).
+        output_dir: Directory to save rendered images (see ``substitute_mermaid``).
+        target: Language of the document: typst, latex, markdown or html.
+        theme: Mermaid theme.
+        cache_dir: Optional directory caching rendered diagrams.
 
     Returns:
         Content with Mermaid blocks replaced by image references.
@@ -93,28 +326,12 @@ def replace_mermaid_with_images(
     if not blocks:
         return content
 
-    output_dir.mkdir(parents=True, exist_ok=True)
-
-    for i, block in enumerate(blocks):
-        try:
-            img_path = output_dir / f"diagram_{i}.{format}"
-            render_mermaid_to_svg(block, img_path)
-
-            # Replace the mermaid block with an image reference
-            old = f"```mermaid\n{block}```"
-            if content.endswith(".typ") or "#" in content[:100]:
-                # Typst image reference
-                new = f'#image("{img_path}")'
-            elif "\\begin" in content[:200]:
-                # LaTeX image reference
-                new = f"\\includegraphics[width=\\linewidth]{{{img_path}}}"
-            else:
-                # Markdown/HTML image reference
-                new = f"![Diagram {i}]({img_path})"
-
-            content = content.replace(old, new)
-        except MermaidError:
-            # Leave the mermaid block as-is if rendering fails
-            continue
+    try:
+        images = render_mermaid_batch(
+            blocks, fmt=image_format_for(target), theme=theme, cache_dir=cache_dir
+        )
+    except MermaidError:
+        # Leave the mermaid blocks as-is if mmdc is unavailable
+        return content
 
-    return content
+    return substitute_mermaid(content, images, target, output_dir)
@@ -0,0 +1,254 @@
+"""SQLite index of document versions.
+
+Versioning backends record every version here as they commit it, together with
+the files it touched and how its documents were generated (template, provider,
+model, token usage). Listing versions is then a single indexed query instead of a
+walk through the history, filters on document path or generation metadata don't
+scan anything, and pages are fetched with a keyset cursor, so each page costs the
+same however deep into the history it is.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    hash TEXT NOT NULL UNIQUE,
+    timestamp REAL NOT NULL,
+    timezone TEXT,
+    message TEXT NOT NULL,
+    template TEXT,
+    provider TEXT,
+    model TEXT,
+    usage TEXT
+);
+CREATE TABLE IF NOT EXISTS version_files (
+    path TEXT NOT NULL,
+    seq INTEGER NOT NULL REFERENCES versions (seq) ON DELETE CASCADE,
+    PRIMARY KEY (path, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS versions_template ON versions (template, seq);
+CREATE INDEX IF NOT EXISTS versions_provider ON versions (provider, seq);
+CREATE INDEX IF NOT EXISTS versions_model ON versions (model, seq);
+CREATE INDEX IF NOT EXISTS version_files_seq ON version_files (seq);
+"""
+
+# Generation metadata that versions can be filtered on
+METADATA_FIELDS = ("template", "provider", "model")
+
+
+@dataclass
+class Version:
+    """One indexed version."""
+
+    hash: str
+    timestamp: float
+    message: str
+    timezone: str | None = None  # UTC offset such as "+0200"; None for local time
+    files: list[str] = field(default_factory=list)  # Paths added, changed or removed
+    template: str | None = None
+    provider: str | None = None
+    model: str | None = None
+    usage: dict | None = None
+
+
+def merge_metadata(items: list[dict]) -> dict:
+    """Generation metadata of documents committed together in one version.
+
+    Template, provider and model are kept where all documents agree; token usage
+    is summed.
+    """
+    merged: dict = {}
+    for name in METADATA_FIELDS:
+        values = {item.get(name) for item in items}
+        if len(values) == 1 and None not in values:
+            merged[name] = values.pop()
+    usages = [item["usage"] for item in items if item.get("usage")]
+    if usages:
+        usage: dict = {}
+        for item in usages:
+            for key, value in item.items():
+                if isinstance(value, int | float):
+                    usage[key] = usage.get(key, 0) + value
+        merged["usage"] = usage
+    return merged
+
+
+class VersionIndex:
+    """SQLite-backed index of the versions of one output directory.
+
+    Args:
+        path: Database file, created on first use.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA foreign_keys = ON")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def add(self, versions: list[Version]) -> None:
+        """Record versions, oldest first; already indexed ones are ignored."""
+        with self._lock, self._connection() as conn:
+            for version in versions:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO versions (hash, timestamp, timezone, message, "
+                    "template, provider, model, usage) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        version.hash,
+                        version.timestamp,
+                        version.timezone,
+                        version.message,
+                        version.template,
+                        version.provider,
+                        version.model,
+                        json.dumps(version.usage) if version.usage is not None else None,
+                    ),
+                )
+                if cursor.rowcount:
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO version_files VALUES (?, ?)",
+                        [(path, cursor.lastrowid) for path in version.files],
+                    )
+
+    def remove(self, hashes: list[str]) -> None:
+        """Forget versions (e.g. after garbage collection)."""
+        with self._lock, self._connection() as conn:
+            conn.executemany("DELETE FROM versions WHERE hash = ?", [(h,) for h in hashes])
+
+    def clear(self) -> None:
+        """Forget every version."""
+        with self._lock, self._connection() as conn:
+            conn.execute("DELETE FROM versions")
+
+    def latest(self) -> str | None:
+        """Hash of the most recently indexed version."""
+        with self._lock:
+            row = (
+                self._connection()
+                .execute("SELECT hash FROM versions ORDER BY seq DESC LIMIT 1")
+                .fetchone()
+            )
+        return row[0] if row else None
+
+    def contains(self, version: str) -> bool:
+        """Whether a version is indexed."""
+        with self._lock:
+            row = (
+                self._connection()
+                .execute("SELECT 1 FROM versions WHERE hash = ?", (version,))
+                .fetchone()
+            )
+        return row is not None
+
+    def query(
+        self,
+        limit: int = 20,
+        before: str | None = None,
+        path: str | None = None,
+        **metadata: str,
+    ) -> list[Version]:
+        """List versions, newest first.
+
+        Args:
+            limit: Maximum number of versions to return.
+            before: Only versions older than this one (the last hash of the previous
+                page).
+            path: Only versions that touched this file.
+            **metadata: Only versions generated with these values of
+                ``METADATA_FIELDS`` (e.g. ``provider="openai"``).
+
+        Returns:
+            The matching versions.
+
+        Raises:
+            ValueError: If a filter isn't a metadata field.
+        """
+        unknown = metadata.keys() - set(METADATA_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown version filter: {', '.join(sorted(unknown))}")
+
+        # Keyset paging: walk an index backwards from the cursor, never skipping rows
+        where, params = [], []
+        if path is not None:
+            # Drive the query from the (path, seq) key of the files touched
+            source = "version_files f JOIN versions v ON v.seq = f.seq"
+            order = "f.seq"
+            where.append("f.path = ?")
+            params.append(path)
+        else:
+            source = "versions v"
+            order = "v.seq"
+        if before is not None:
+            where.append(f"{order} < (SELECT seq FROM versions WHERE hash = ?)")
+            params.append(before)
+        for name, value in sorted(metadata.items()):
+            where.append(f"v.{name} = ?")
+            params.append(value)
+        sql = (
+            "SELECT v.seq, v.hash, v.timestamp, v.timezone, v.message, v.template, "
+            f"v.provider, v.model, v.usage FROM {source}"
+            + (" WHERE " + " AND ".join(where) if where else "")
+            + f" ORDER BY {order} DESC LIMIT ?"
+        )
+
+        with self._lock:
+            conn = self._connection()
+            rows = conn.execute(sql, (*params, limit)).fetchall()
+            files: dict[int, list[str]] = {row[0]: [] for row in rows}
+            if files:
+                marks = ", ".join("?" * len(files))
+                for file_path, seq in conn.execute(
+                    f"SELECT path, seq FROM version_files WHERE seq IN ({marks}) ORDER BY path",
+                    list(files),
+                ):
+                    files[seq].append(file_path)
+
+        return [
+            Version(
+                hash=hash_,
+                timestamp=timestamp,
+                timezone=timezone,
+                message=message,
+                files=files[seq],
+                template=template,
+                provider=provider,
+                model=model,
+                usage=json.loads(usage) if usage is not None else None,
+            )
+            for seq, hash_, timestamp, timezone, message, template, provider, model, usage in rows
+        ]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_version_indexes: dict[Path, VersionIndex] = {}
+_version_indexes_lock = threading.Lock()
+
+
+def get_version_index(path: Path) -> VersionIndex:
+    """Get the shared version index stored at a path."""
+    with _version_indexes_lock:
+        index = _version_indexes.get(path)
+        if index is None:
+            index = VersionIndex(path)
+            _version_indexes[path] = index
+        return index
@@ -0,0 +1,236 @@
+"""Background, debounced version commits.
+
+Generated documents are handed to a ``VersionQueue`` instead of being committed
+inline. A worker thread waits until no new document has arrived for the debounce
+window (or until the oldest pending one has waited ``max_delay``) and then
+commits everything pending as a single version, so a burst of requests costs one
+commit and no request waits on versioning. With a retention policy, old versions
+are garbage collected after each commit. Queues are flushed when the process
+exits; the API server also flushes them on shutdown.
+"""
+
+from __future__ import annotations
+
+import atexit
+import threading
+import time
+from pathlib import Path
+
+from autodocs_ai.utils.version_index import merge_metadata
+from autodocs_ai.utils.versioning import VersioningError, collect_garbage, commit_version
+
+
+class VersionQueue:
+    """Coalesces documents written to an output directory into background commits.
+
+    Args:
+        output_dir: The versioned output directory.
+        backend: Versioning backend (see ``get_versioning_backend``).
+        debounce: Seconds without new documents before pending ones are committed.
+        max_delay: Longest a pending document waits under a steady stream of new
+            ones. Defaults to ten debounce windows.
+        max_age: After each commit, drop versions older than this many seconds
+            (see ``collect_garbage``).
+        max_bytes: After each commit, drop the oldest versions until the stored
+            files of the others fit in this many bytes.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        backend: str | None = None,
+        debounce: float = 2.0,
+        max_delay: float | None = None,
+        max_age: float | None = None,
+        max_bytes: int | None = None,
+    ) -> None:
+        self.output_dir = output_dir
+        self.backend = backend
+        self.debounce = debounce
+        self.max_delay = max_delay if max_delay is not None else 10 * debounce
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.commits = 0
+        self.errors = 0
+        self.last_version: str | None = None
+        self.last_error: str | None = None
+
+        self._cond = threading.Condition()
+        self._pending: dict[str, None] = {}  # Ordered set of relative paths
+        self._messages: list[str] = []
+        self._metadata: list[dict] = []
+        self._first_at = 0.0
+        self._last_at = 0.0
+        self._in_flight = 0
+        self._flushing = 0
+        self._closed = False
+        self._thread: threading.Thread | None = None
+
+    @property
+    def depth(self) -> int:
+        """Number of documents waiting for (or being written into) a commit."""
+        with self._cond:
+            return len(self._pending) + self._in_flight
+
+    def submit(
+        self,
+        paths: list[Path | str],
+        message: str | None = None,
+        metadata: dict | None = None,
+    ) -> None:
+        """Queue documents for the next commit; returns immediately.
+
+        Args:
+            paths: Files inside the output directory, absolute or relative to it.
+            message: Describes the documents; messages of coalesced submissions are
+                combined.
+            metadata: How the documents were generated (see ``commit_version``);
+                coalesced submissions are merged (see ``merge_metadata``).
+
+        Raises:
+            ValueError: If a path is outside the output directory.
+            VersioningError: If the queue has been closed.
+        """
+        root = self.output_dir.resolve()
+        relative = []
+        for path in paths:
+            path = Path(path)
+            if path.is_absolute():
+                path = path.resolve().relative_to(root)
+            relative.append(path.as_posix())
+
+        with self._cond:
+            if self._closed:
+                raise VersioningError("Version queue is closed")
+            now = time.monotonic()
+            if not self._pending:
+                self._first_at = now
+            self._last_at = now
+            self._pending.update(dict.fromkeys(relative))
+            if message and message not in self._messages:
+                self._messages.append(message)
+            self._metadata.append(metadata or {})
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="autodocs-version-queue", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify_all()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Commit pending documents now and wait for the commit.
+
+        Args:
+            timeout: Maximum seconds to wait.
+
+        Returns:
+            True if nothing is left pending.
+        """
+        with self._cond:
+            self._flushing += 1
+            self._cond.notify_all()
+            try:
+                return self._cond.wait_for(
+                    lambda: not self._pending and not self._in_flight, timeout
+                )
+            finally:
+                self._flushing -= 1
+
+    def close(self, timeout: float | None = None) -> bool:
+        """Flush pending documents and stop the worker.
+
+        Returns:
+            True if everything pending was committed in time.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        flushed = self.flush(timeout)
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return flushed
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                while not (self._flushing or self._closed):
+                    deadline = min(self._last_at + self.debounce, self._first_at + self.max_delay)
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                paths = list(self._pending)
+                messages = self._messages
+                metadata = merge_metadata(self._metadata)
+                self._pending = {}
+                self._messages = []
+                self._metadata = []
+                self._in_flight = len(paths)
+
+            try:
+                version = commit_version(
+                    self.output_dir, _combine(messages, len(paths)), paths, self.backend, metadata
+                )
+                if version is not None and (self.max_age is not None or self.max_bytes is not None):
+                    collect_garbage(self.output_dir, self.max_age, self.max_bytes, self.backend)
+            except Exception as e:  # Keep the worker alive for later batches
+                error: str | None = str(e)
+                version = None
+            else:
+                error = None
+
+            with self._cond:
+                self._in_flight = 0
+                if error is not None:
+                    self.errors += 1
+                    self.last_error = error
+                elif version is not None:
+                    self.commits += 1
+                    self.last_version = version
+                self._cond.notify_all()
+
+
+def _combine(messages: list[str], count: int) -> str | None:
+    """Commit message for a batch of coalesced submissions."""
+    if len(messages) <= 1:
+        return messages[0] if messages else None
+    summary = f"Update {count} generated documents"
+    return summary + "\n\n" + "\n".join(f"- {message}" for message in messages)
+
+
+_queues: dict[Path, VersionQueue] = {}
+_queues_lock = threading.Lock()
+
+
+def get_version_queue(
+    output_dir: Path,
+    backend: str | None = None,
+    debounce: float = 2.0,
+    max_age: float | None = None,
+    max_bytes: int | None = None,
+) -> VersionQueue:
+    """Get the shared version queue for an output directory."""
+    key = output_dir.resolve()
+    with _queues_lock:
+        queue = _queues.get(key)
+        if queue is None or queue._closed:
+            queue = VersionQueue(
+                output_dir, backend, debounce, max_age=max_age, max_bytes=max_bytes
+            )
+            _queues[key] = queue
+        return queue
+
+
+def close_version_queues(timeout: float | None = None) -> None:
+    """Flush and stop every shared version queue."""
+    with _queues_lock:
+        queues = list(_queues.values())
+        _queues.clear()
+    for queue in queues:
+        queue.close(timeout)
+
+
+atexit.register(close_version_queues)
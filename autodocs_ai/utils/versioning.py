@@ -1,49 +1,493 @@
-"""Git-based document versioning utility."""
+"""Document versioning utility.
+
+Versions of an output directory are kept by a pluggable backend:
+
+- ``git`` (default): commits in a git repository inside the output directory,
+  written in-process (see ``git_objects``) so committing a version costs a few file
+  writes rather than a handful of git process launches, and the repository stays
+  usable with the regular git CLI.
+- ``store``: a content-addressed artifact store (see ``artifact_store``) that
+  deduplicates identical outputs and restores them as hard links, for output
+  directories dominated by binary documents.
+
+Both record each version in a SQLite index (see ``version_index``) as they commit
+it, which ``list_versions`` queries instead of walking the history.
+"""
 
 from __future__ import annotations
 
-import subprocess
+import difflib
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from dataclasses import dataclass
 from pathlib import Path
 
+from autodocs_ai.utils.git_objects import (
+    DEFAULT_IDENTITY,
+    EMPTY_TREE,
+    GitError,
+    GitRepository,
+    IndexEntry,
+    index_entry,
+)
+from autodocs_ai.utils.gitignore import IgnoreRules
+from autodocs_ai.utils.version_index import Version, VersionIndex, get_version_index
+
 
 class VersioningError(Exception):
     """Raised when versioning operations fail."""
 
 
-def _run_git(args: list[str], cwd: Path) -> subprocess.CompletedProcess:
-    """Run a git command in the given directory."""
-    return subprocess.run(
-        ["git"] + args,
-        cwd=str(cwd),
-        capture_output=True,
-        text=True,
-        timeout=30,
+# Metadata directories of the backends, never versioned themselves
+METADATA_DIRS = frozenset({".git", ".versions"})
+
+# Seconds a commit or restore waits for one in progress in another process
+LOCK_TIMEOUT = 10.0
+
+
+@dataclass
+class GarbageCollection:
+    """What a garbage collection removed."""
+
+    versions: int = 0
+    objects: int = 0
+    bytes_freed: int = 0
+
+
+class VersioningBackend(ABC):
+    """Keeps versions of the files in an output directory.
+
+    Every version is also recorded in a ``VersionIndex`` (stored with the backend's
+    metadata at ``index_path``), which serves listing and filtering.
+
+    Args:
+        output_dir: The versioned output directory.
+    """
+
+    name: str
+    index_path: Path
+
+    def __init__(self, output_dir: Path) -> None:
+        self.output_dir = output_dir
+
+    @abstractmethod
+    def exists(self) -> bool:
+        """Whether the output directory is versioned by this backend."""
+
+    @abstractmethod
+    def init(self) -> None:
+        """Start versioning the output directory."""
+
+    @abstractmethod
+    def commit(
+        self,
+        message: str | None = None,
+        files: list[str] | None = None,
+        metadata: dict | None = None,
+    ) -> str | None:
+        """Record a version; see ``commit_version``."""
+
+    @abstractmethod
+    def head(self) -> str | None:
+        """The latest version, or None before the first one."""
+
+    @abstractmethod
+    def log(self, start: str) -> Iterator[Version]:
+        """Walk the history from a version back to the oldest one still kept."""
+
+    @abstractmethod
+    def diff(self, version_a: str, version_b: str | None = None) -> str:
+        """Diff two versions; see ``diff_versions``."""
+
+    @abstractmethod
+    def restore(self, version: str) -> None:
+        """Restore a version; see ``restore_version``."""
+
+    def collect_garbage(
+        self, max_age: float | None = None, max_bytes: int | None = None
+    ) -> GarbageCollection:
+        """Drop old versions; see ``collect_garbage``.
+
+        Backends keep every version unless they override this (git repositories
+        are compacted with ``git gc``).
+        """
+        return GarbageCollection()
+
+    @property
+    def index(self) -> VersionIndex:
+        return get_version_index(self.index_path)
+
+    def list(
+        self,
+        limit: int = 20,
+        before: str | None = None,
+        path: str | None = None,
+        **metadata: str,
+    ) -> list[dict]:
+        """List versions from the index; see ``list_versions``."""
+        if not self.exists():
+            return []
+        self._sync_index()
+        return [
+            {
+                "hash": version.hash,
+                "date": format_date(version.timestamp, version.timezone),
+                "message": version.message.split("\n", 1)[0],
+                "files": version.files,
+                "template": version.template,
+                "provider": version.provider,
+                "model": version.model,
+                "usage": version.usage,
+            }
+            for version in self.index.query(limit, before, path, **metadata)
+        ]
+
+    def _sync_index(self) -> None:
+        """Index versions committed without it (by older releases or other tools)."""
+        head = self.head()
+        index = self.index
+        if head is None or head == index.latest():
+            return
+        missing = []
+        for version in self.log(head):
+            if index.contains(version.hash):
+                break
+            missing.append(version)
+        else:
+            index.clear()  # History was rewritten; reindex all of it
+        index.add(missing[::-1])
+
+    def _record(
+        self,
+        version: str,
+        timestamp: float,
+        message: str,
+        files: list[str],
+        metadata: dict | None,
+        timezone: str | None = None,
+    ) -> None:
+        """Add a version just committed on top of the (synced) index."""
+        metadata = metadata or {}
+        self.index.add(
+            [
+                Version(
+                    hash=version,
+                    timestamp=timestamp,
+                    message=message,
+                    timezone=timezone,
+                    files=files,
+                    template=metadata.get("template"),
+                    provider=metadata.get("provider"),
+                    model=metadata.get("model"),
+                    usage=metadata.get("usage"),
+                )
+            ]
+        )
+
+    def _selected_paths(self, files: list[str]) -> list[str]:
+        """Relative paths of the given files, with directories expanded."""
+        paths = []
+        for f in files:
+            path = Path(f)
+            path = path if path.is_absolute() else self.output_dir / path
+            if path.is_dir():
+                paths.extend(
+                    p.relative_to(self.output_dir).as_posix()
+                    for p in path.rglob("*")
+                    if p.is_file() and not METADATA_DIRS & set(p.relative_to(self.output_dir).parts)
+                )
+            else:
+                paths.append(path.relative_to(self.output_dir).as_posix())
+        return paths
+
+
+def _identity(repo: GitRepository) -> str:
+    """Commit author, as git picks it.
+
+    ``GIT_AUTHOR_NAME`` and ``GIT_AUTHOR_EMAIL`` if set, else ``user.name`` and
+    ``user.email`` from the repository's or the user's git config.
+    """
+    name = os.environ.get("GIT_AUTHOR_NAME") or repo.config("user.name")
+    email = os.environ.get("GIT_AUTHOR_EMAIL") or repo.config("user.email")
+    if name and email:
+        return f"{name} <{email}>"
+    return DEFAULT_IDENTITY
+
+
+def worktree_files(output_dir: Path) -> list[str]:
+    """All versionable files of the output directory, as slash-separated paths.
+
+    Files ignored by git (``.gitignore``, ``.git/info/exclude`` and
+    ``core.excludesFile``) are left out, as by ``git add -A``.
+    """
+    paths = []
+    rules = {os.fspath(output_dir): IgnoreRules.for_worktree(output_dir)}
+    for directory, subdirs, filenames in os.walk(output_dir):
+        relative = Path(directory).relative_to(output_dir).as_posix()
+        prefix = "" if relative == "." else f"{relative}/"
+        ignore = rules.pop(directory).with_file(Path(directory) / ".gitignore", prefix)
+        subdirs[:] = [
+            d for d in subdirs if d not in METADATA_DIRS and not ignore.ignored(prefix + d, True)
+        ]
+        rules.update((os.path.join(directory, d), ignore) for d in subdirs)
+        paths.extend(prefix + name for name in filenames if not ignore.ignored(prefix + name))
+    return paths
+
+
+def file_diff(path: str, before: bytes, after: bytes, existed: bool, exists: bool) -> str:
+    """Diff one file in git's unified format (binary files are only reported)."""
+    old_name = f"a/{path}" if existed else "/dev/null"
+    new_name = f"b/{path}" if exists else "/dev/null"
+    header = f"diff --git a/{path} b/{path}\n"
+    if b"\0" in before[:8000] or b"\0" in after[:8000]:
+        return f"{header}Binary files {old_name} and {new_name} differ\n"
+    lines = difflib.unified_diff(
+        before.decode("utf-8", "replace").splitlines(keepends=True),
+        after.decode("utf-8", "replace").splitlines(keepends=True),
+        old_name,
+        new_name,
     )
+    return header + "".join(line if line.endswith("\n") else line + "\n" for line in lines)
 
 
-def init_versioning(output_dir: Path) -> None:
-    """Initialize git repository in the output directory for document versioning.
+def format_date(timestamp: float, timezone: str | None = None) -> str:
+    """Format a version date like ``git log --format=%ai``.
 
     Args:
-        output_dir: Directory to initialize git in.
+        timestamp: Seconds since the epoch.
+        timezone: UTC offset such as "+0200"; defaults to the local time zone.
     """
-    output_dir.mkdir(parents=True, exist_ok=True)
-    git_dir = output_dir / ".git"
-    if git_dir.exists():
-        return  # Already initialized
+    if timezone is None:
+        return time.strftime("%Y-%m-%d %H:%M:%S %z", time.localtime(timestamp))
+    sign = -1 if timezone.startswith("-") else 1
+    offset = sign * (int(timezone[1:3]) * 3600 + int(timezone[3:5]) * 60)
+    when = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(timestamp + offset))
+    return f"{when} {timezone}"
+
+
+class GitBackend(VersioningBackend):
+    """Versions as commits in a git repository inside the output directory."""
+
+    name = "git"
+
+    def __init__(self, output_dir: Path) -> None:
+        super().__init__(output_dir)
+        self.repo = GitRepository(output_dir)
+        self.index_path = output_dir / ".git" / "autodocs-versions.sqlite3"
+
+    def exists(self) -> bool:
+        return (self.output_dir / ".git").exists()
+
+    def init(self) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        if self.exists():
+            return  # Already initialized
+
+        try:
+            GitRepository.init(self.output_dir)
+            # Create initial commit
+            empty = self.repo.write_object("tree", b"")
+            self.repo.update_head(
+                self.repo.write_commit(
+                    empty, [], "Initialize document versioning", _identity(self.repo)
+                ),
+                None,
+            )
+        except (GitError, OSError) as e:
+            raise VersioningError(f"Failed to initialize git: {e}") from e
+
+    def _stage(self, index: dict[str, IndexEntry], paths: list[str]) -> None:
+        """Update the index for the given paths, like ``git add`` (deletions included)."""
+        for path in paths:
+            if (self.output_dir / path).is_file():
+                index[path] = self.repo.stage(path, index.get(path))
+            else:
+                index.pop(path, None)
+
+    def commit(
+        self,
+        message: str | None = None,
+        files: list[str] | None = None,
+        metadata: dict | None = None,
+    ) -> str | None:
+        if not self.exists():
+            self.init()
+
+        repo = self.repo
+        try:
+            self._sync_index()
+            # Held throughout, like git commit: other committers (another autodocs-ai
+            # process or git itself) wait or fail rather than interleave
+            with repo.lock_index(LOCK_TIMEOUT) as index_lock:
+                index = repo.read_index()
+                staged = {path: (e.mode, e.sha) for path, e in index.items()}
+
+                # Stage files
+                if files:
+                    self._stage(index, self._selected_paths(files))
+                else:
+                    self._stage(index, sorted(set(worktree_files(self.output_dir)) | set(index)))
+
+                # Check if there's anything to commit
+                head = repo.head()
+                tree = repo.write_tree({path: (e.mode, e.sha) for path, e in index.items()})
+                head_tree = repo.read_commit(head).tree if head else EMPTY_TREE
+                if tree == head_tree:
+                    repo.write_index(index, index_lock)
+                    return None
+
+                if not message:
+                    message = "Update generated documents"
+
+                commit = repo.write_commit(tree, [head] if head else [], message, _identity(repo))
+                repo.update_head(commit, head)
+                repo.write_index(index, index_lock)
+            written = repo.read_commit(commit)
+            changed = changed_paths(staged, {p: (e.mode, e.sha) for p, e in index.items()})
+            self._record(commit, written.timestamp, message, changed, metadata, written.timezone)
+        except (GitError, OSError, ValueError, sqlite3.Error) as e:
+            raise VersioningError(f"Failed to commit: {e}") from e
+        return commit
+
+    def head(self) -> str | None:
+        try:
+            return self.repo.head()
+        except (GitError, OSError):
+            return None
+
+    def log(self, start: str) -> Iterator[Version]:
+        try:
+            commit = self.repo.read_commit(start)
+            files = self.repo.read_tree(commit.tree)
+            while True:
+                parent = self.repo.read_commit(commit.parents[0]) if commit.parents else None
+                parent_files = self.repo.read_tree(parent.tree) if parent else {}
+                yield Version(
+                    hash=commit.sha,
+                    timestamp=commit.timestamp,
+                    message=commit.message,
+                    timezone=commit.timezone,
+                    files=changed_paths(parent_files, files),
+                )
+                if parent is None:
+                    return
+                commit, files = parent, parent_files
+        except (GitError, OSError):
+            return  # Older history is unreadable
+
+    def diff(self, version_a: str, version_b: str | None = None) -> str:
+        repo = self.repo
+        try:
+            old = repo.read_tree(repo.read_commit(repo.resolve(version_a)).tree)
+            if version_b:
+                new = repo.read_tree(repo.read_commit(repo.resolve(version_b)).tree)
+                read_new = lambda path: repo.read_object(new[path][1])[1]  # noqa: E731
+            else:
+                new = self._worktree_state()
+                read_new = lambda path: (self.output_dir / path).read_bytes()  # noqa: E731
+        except (GitError, OSError):
+            return ""
+
+        chunks = []
+        for path in sorted(old.keys() | new.keys()):
+            if path in old and path in new and old[path][1] == new[path][1]:
+                continue
+            before = repo.read_object(old[path][1])[1] if path in old else b""
+            after = read_new(path) if path in new else b""
+            chunks.append(file_diff(path, before, after, path in old, path in new))
+        return "".join(chunks)
+
+    def _worktree_state(self) -> dict[str, tuple[int, str]]:
+        """Blob ids of the tracked working tree files (like ``git diff <commit>``).
+
+        The index's stat data avoids rehashing files that haven't changed.
+        """
+        state = {}
+        for path, entry in self.repo.read_index().items():
+            try:
+                st = (self.output_dir / path).stat()
+            except FileNotFoundError:
+                continue
+            if entry.matches(st):
+                state[path] = (entry.mode, entry.sha)
+            else:
+                data = (self.output_dir / path).read_bytes()
+                state[path] = (entry.mode, self.repo.hash_object("blob", data)[0])
+        return state
+
+    def restore(self, version: str) -> None:
+        repo = self.repo
+        try:
+            files = repo.read_tree(repo.read_commit(repo.resolve(version)).tree)
+            with repo.lock_index(LOCK_TIMEOUT) as index_lock:
+                index = repo.read_index()
+                for path, (mode, sha) in files.items():
+                    target = self.output_dir / path
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    tmp = target.with_name(f".{target.name}.restore")
+                    tmp.write_bytes(repo.read_object(sha)[1])
+                    tmp.chmod(0o755 if mode & 0o111 else 0o644)
+                    tmp.replace(target)
+                    index[path] = index_entry(path, sha, mode, target.stat())
+                repo.write_index(index, index_lock)
+        except (GitError, OSError) as e:
+            raise VersioningError(f"Failed to restore version: {e}") from e
+
+
+def changed_paths(before: dict[str, object], after: dict[str, object]) -> list[str]:
+    """Paths added, changed or removed between two path -> content mappings."""
+    return sorted(
+        path for path in before.keys() | after.keys() if before.get(path) != after.get(path)
+    )
 
-    result = _run_git(["init"], cwd=output_dir)
-    if result.returncode != 0:
-        raise VersioningError(f"Failed to initialize git: {result.stderr}")
 
-    # Create initial commit
-    _run_git(["commit", "--allow-empty", "-m", "Initialize document versioning"], cwd=output_dir)
+def get_versioning_backend(output_dir: Path, backend: str | None = None) -> VersioningBackend:
+    """Get the versioning backend for an output directory.
+
+    Args:
+        output_dir: The versioned output directory.
+        backend: "git" or "store". If None, the backend already versioning the
+            directory is used, or git for a new directory.
+
+    Returns:
+        The backend instance.
+
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+    from autodocs_ai.utils.artifact_store import ArtifactStoreBackend
+
+    backends: dict[str, type[VersioningBackend]] = {
+        GitBackend.name: GitBackend,
+        ArtifactStoreBackend.name: ArtifactStoreBackend,
+    }
+    if backend is None:
+        store = ArtifactStoreBackend(output_dir)
+        return store if store.exists() else GitBackend(output_dir)
+    if backend not in backends:
+        raise ValueError(f"Unknown versioning backend: {backend}")
+    return backends[backend](output_dir)
+
+
+def init_versioning(output_dir: Path, backend: str | None = None) -> None:
+    """Initialize versioning in the output directory.
+
+    Args:
+        output_dir: Directory to version.
+        backend: Versioning backend (see ``get_versioning_backend``).
+    """
+    get_versioning_backend(output_dir, backend).init()
 
 
 def commit_version(
     output_dir: Path,
     message: str | None = None,
     files: list[str] | None = None,
+    backend: str | None = None,
+    metadata: dict | None = None,
 ) -> str | None:
     """Commit the current state of documents.
 
@@ -51,77 +495,57 @@ def commit_version(
         output_dir: The versioned output directory.
         message: Commit message. Auto-generated if not provided.
         files: Specific files to commit. If None, commits all changes.
+        backend: Versioning backend (see ``get_versioning_backend``).
+        metadata: How the documents were generated, recorded in the version index:
+            template, provider, model and usage (token counts).
 
     Returns:
         The commit hash, or None if nothing to commit.
     """
-    git_dir = output_dir / ".git"
-    if not git_dir.exists():
-        init_versioning(output_dir)
-
-    # Stage files
-    if files:
-        for f in files:
-            _run_git(["add", f], cwd=output_dir)
-    else:
-        _run_git(["add", "-A"], cwd=output_dir)
-
-    # Check if there's anything to commit
-    status = _run_git(["status", "--porcelain"], cwd=output_dir)
-    if not status.stdout.strip():
-        return None
-
-    if not message:
-        message = "Update generated documents"
-
-    result = _run_git(["commit", "-m", message], cwd=output_dir)
-    if result.returncode != 0:
-        raise VersioningError(f"Failed to commit: {result.stderr}")
-
-    # Get the commit hash
-    hash_result = _run_git(["rev-parse", "HEAD"], cwd=output_dir)
-    return hash_result.stdout.strip() if hash_result.returncode == 0 else None
+    return get_versioning_backend(output_dir, backend).commit(message, files, metadata)
 
 
-def list_versions(output_dir: Path, limit: int = 20) -> list[dict[str, str]]:
-    """List document versions (git commits).
+def list_versions(
+    output_dir: Path,
+    limit: int = 20,
+    backend: str | None = None,
+    before: str | None = None,
+    path: str | None = None,
+    template: str | None = None,
+    provider: str | None = None,
+    model: str | None = None,
+) -> list[dict]:
+    """List document versions, newest first.
+
+    Versions come from the version index, so listing and filtering don't walk the
+    history, and each page costs the same however old it is.
 
     Args:
         output_dir: The versioned output directory.
         limit: Maximum number of versions to return.
+        backend: Versioning backend (see ``get_versioning_backend``).
+        before: Only versions older than this one; pass the last hash of a page to
+            get the next page.
+        path: Only versions that added, changed or removed this file.
+        template: Only versions generated from this template.
+        provider: Only versions generated by this provider.
+        model: Only versions generated by this model.
 
     Returns:
-        List of version dicts with hash, date, and message.
+        List of version dicts with hash, date, message, files (paths touched), and
+        template, provider, model and usage (None when not recorded).
     """
-    git_dir = output_dir / ".git"
-    if not git_dir.exists():
-        return []
-
-    result = _run_git(
-        ["log", f"-{limit}", "--format=%H|%ai|%s"],
-        cwd=output_dir,
+    filters = {"template": template, "provider": provider, "model": model}
+    return get_versioning_backend(output_dir, backend).list(
+        limit, before, path, **{k: v for k, v in filters.items() if v is not None}
     )
-    if result.returncode != 0:
-        return []
-
-    versions = []
-    for line in result.stdout.strip().split("\n"):
-        if not line:
-            continue
-        parts = line.split("|", 2)
-        if len(parts) == 3:
-            versions.append({
-                "hash": parts[0],
-                "date": parts[1],
-                "message": parts[2],
-            })
-    return versions
 
 
 def diff_versions(
     output_dir: Path,
     hash_a: str,
     hash_b: str | None = None,
+    backend: str | None = None,
 ) -> str:
     """Show diff between two versions, or between a version and current state.
 
@@ -129,25 +553,44 @@ def diff_versions(
         output_dir: The versioned output directory.
         hash_a: First commit hash.
         hash_b: Second commit hash (if None, diffs against working directory).
+        backend: Versioning backend (see ``get_versioning_backend``).
 
     Returns:
         Diff output as string.
     """
-    args = ["diff", hash_a]
-    if hash_b:
-        args.append(hash_b)
+    return get_versioning_backend(output_dir, backend).diff(hash_a, hash_b)
 
-    result = _run_git(args, cwd=output_dir)
-    return result.stdout
 
-
-def restore_version(output_dir: Path, commit_hash: str) -> None:
+def restore_version(output_dir: Path, commit_hash: str, backend: str | None = None) -> None:
     """Restore documents to a specific version.
 
     Args:
         output_dir: The versioned output directory.
         commit_hash: The commit hash to restore.
+        backend: Versioning backend (see ``get_versioning_backend``).
+    """
+    get_versioning_backend(output_dir, backend).restore(commit_hash)
+
+
+def collect_garbage(
+    output_dir: Path,
+    max_age: float | None = None,
+    max_bytes: int | None = None,
+    backend: str | None = None,
+) -> GarbageCollection:
+    """Drop old versions and the stored files only they referenced.
+
+    Only the artifact store backend removes anything; the latest version is always
+    kept.
+
+    Args:
+        output_dir: The versioned output directory.
+        max_age: Drop versions older than this many seconds.
+        max_bytes: Drop the oldest versions until the stored files of the others fit
+            in this many bytes.
+        backend: Versioning backend (see ``get_versioning_backend``).
+
+    Returns:
+        Counts of what was removed.
     """
-    result = _run_git(["checkout", commit_hash, "--", "."], cwd=output_dir)
-    if result.returncode != 0:
-        raise VersioningError(f"Failed to restore version: {result.stderr}")
+    return get_versioning_backend(output_dir, backend).collect_garbage(max_age, max_bytes)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Benchmark PDF text extraction backends on synthetic multi-hundred-page files.
+
+Compares every installed backend (PyMuPDF, PyPDF2) extracting each file serially
+in one process, and the preferred backend splitting it into page ranges across
+the extraction process pool.
+
+Usage: python scripts/bench-pdf-extraction.py [--pages 200 500] [--workers 4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from autodocs_ai.extractors import extract_files
+from autodocs_ai.extractors.pdf import PDFExtractor, available_backends
+
+LINES_PER_PAGE = 40
+
+
+def make_pdf(path: Path, pages: int) -> Path:
+    """Write a PDF of pages filled with lines of text."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", b""]
+    font = 3 + 2 * pages
+    kids = []
+    for i in range(pages):
+        page, content = 3 + 2 * i, 4 + 2 * i
+        kids.append(f"{page} 0 R")
+        lines = " ".join(
+            f"({i + 1}.{n} The quick brown fox jumps over the lazy dog, {n * 37} times.) '"
+            for n in range(LINES_PER_PAGE)
+        )
+        stream = f"BT /F1 10 Tf 14 TL 50 750 Td {lines} ET".encode()
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {content} 0 R "
+            f"/Resources << /Font << /F1 {font} 0 R >> >> >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>".encode()
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    data = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(data))
+        data += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(data)
+    data += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    data += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    data += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    path.write_bytes(bytes(data))
+    return path
+
+
+def timed(fn) -> tuple[float, str]:
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[200, 500])
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    backends = available_backends()
+    if not backends:
+        print("No PDF backend installed. Install with: pip install autodocs-ai[extractors]")
+        return 1
+    print(f"Backends: {', '.join(backends)}; workers: {args.workers}; CPUs: {os.cpu_count()}\n")
+    print(f"{'pages':>6}  {'backend':<8}  {'serial':>8}  {'split':>8}  {'speedup':>7}  chars")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in args.pages:
+            pdf = make_pdf(Path(tmp) / f"synthetic-{pages}.pdf", pages)
+            for backend in backends:
+                serial, text = timed(lambda b=backend: PDFExtractor(b).extract(pdf))
+
+                # Worker processes always use the preferred backend
+                split = None
+                if backend == backends[0]:
+                    asyncio.run(extract_files([pdf], max_workers=args.workers))  # Warm pool
+                    split, [item] = timed(
+                        lambda: asyncio.run(extract_files([pdf], max_workers=args.workers))
+                    )
+                    if item.content != text:
+                        print(f"  ✗ {backend}: split extraction differs from serial")
+                        return 1
+
+                split_col = f"{split:7.2f}s" if split is not None else f"{'-':>8}"
+                speedup = f"{serial / split:6.1f}x" if split else f"{'-':>7}"
+                print(
+                    f"{pages:>6}  {backend:<8}  {serial:7.2f}s  {split_col}  {speedup}  {len(text)}"
+                )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -48,7 +48,12 @@ def main() -> int:
 
     # Extractors
     print("\nExtractors:")
-    for pkg, name in [("PyPDF2", "PDF"), ("docx", "Word"), ("pandas", "Excel/CSV")]:
+    for pkg, name in [
+        ("PyPDF2", "PDF"),
+        ("pymupdf", "PDF (fast)"),
+        ("docx", "Word"),
+        ("pandas", "Excel/CSV"),
+    ]:
         check(name, lambda p=pkg: __import__(p) and "installed")
 
     # API
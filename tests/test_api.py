@@ -44,6 +44,18 @@ class TestHealthEndpoints:
         assert "anthropic" in names
         assert "ollama" in names
 
+    def test_cache_stats(self, client):
+        response = client.get("/cache/stats")
+        assert response.status_code == 200
+        data = response.json()
+        assert {"hits", "misses", "hit_rate", "saved_seconds"} <= data.keys()
+
+    def test_versioning_stats(self, client):
+        response = client.get("/versioning/stats")
+        assert response.status_code == 200
+        data = response.json()
+        assert {"enabled", "backend", "queue_depth", "commits", "errors"} <= data.keys()
+
 
 class TestGenerateEndpoint:
     def test_generate_requires_body(self, client):
@@ -63,6 +75,32 @@ class TestGenerateEndpoint:
         assert response.status_code in (400, 500)
 
 
+class TestDownloadEndpoint:
+    def test_streams_rendered_bytes_without_writing(self, client, monkeypatch, tmp_path):
+        from autodocs_ai.core import generator
+        from autodocs_ai.providers.base import AIProvider, GenerationResult
+
+        class FakeProvider(AIProvider):
+            async def generate(self, system_prompt, user_prompt):
+                return GenerationResult(content="# Hello", model="fake", provider="fake")
+
+            def validate_config(self):
+                pass
+
+        monkeypatch.setattr(generator, "get_provider", lambda settings: FakeProvider())
+        monkeypatch.setenv("AUTODOCS_OUTPUT_DIR", str(tmp_path))
+
+        response = client.post(
+            "/generate/download",
+            json={"prompt": "test", "output_format": "markdown"},
+        )
+        assert response.status_code == 200
+        assert response.content == b"# Hello"
+        assert response.headers["content-type"].startswith("text/markdown")
+        assert "document.md" in response.headers["content-disposition"]
+        assert not any(tmp_path.iterdir())
+
+
 class TestAPIKeyAuth:
     def test_no_auth_when_key_not_configured(self, client):
         """Without AUTODOCS_API_KEY set, endpoints should be accessible."""
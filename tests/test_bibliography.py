@@ -0,0 +1,121 @@
+"""Tests for bibliographies of generated documents."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from autodocs_ai.config import Settings
+from autodocs_ai.core import generator
+from autodocs_ai.core.bibliography import find_urls, format_bibliography, splice_bibliography
+from autodocs_ai.core.generator import GenerateRequest, generate_document
+from autodocs_ai.providers.base import AIProvider, GenerationResult
+from autodocs_ai.utils.citations import Citation
+
+CITATIONS = [
+    Citation(
+        url="https://example.com/a_b?x=1#top",
+        title="Rust & C: 100% safe?",
+        author="Doe, J.",
+        date="2024",
+        publisher="Example",
+        accessed="2025-01-01",
+    ),
+    Citation(url="https://example.org/", accessed="2025-01-01"),
+]
+
+
+class TestFindUrls:
+    def test_trims_punctuation_and_dedupes(self):
+        text = (
+            "See https://example.com/a, and (https://example.org/b). "
+            "Also https://EXAMPLE.com/a#intro and https://en.wikipedia.org/wiki/Rust_(language)."
+        )
+        assert find_urls(text, None) == [
+            "https://example.com/a",
+            "https://example.org/b",
+            "https://en.wikipedia.org/wiki/Rust_(language)",
+        ]
+
+
+class TestFormatBibliography:
+    @pytest.mark.parametrize("style", ["apa", "mla", "chicago", "ieee"])
+    def test_typst_compiles(self, style):
+        typst = pytest.importorskip("typst")
+        section = format_bibliography(CITATIONS, style, "typst")
+
+        assert section.startswith("= References\n")
+        typst.compile(f"= Report\n\nBody.\n\n{section}".encode())
+
+    def test_latex_escapes_special_characters(self):
+        section = format_bibliography(CITATIONS, "apa", "latex")
+
+        assert "\\textit{Rust \\& C: 100\\% safe?}" in section
+        assert "a\\_b?x=1" in section
+
+    def test_html_and_markdown(self):
+        assert "<em>Rust &amp; C: 100% safe?</em>" in format_bibliography(CITATIONS, "apa", "html")
+        assert format_bibliography(CITATIONS, "apa", "markdown").startswith("## References\n\n")
+
+
+class TestSpliceBibliography:
+    def test_latex_before_end_document(self):
+        source = "\\documentclass{article}\n\\begin{document}\nHi\n\\end{document}\n"
+        spliced = splice_bibliography(source, "REFS\n", "latex")
+
+        assert spliced.endswith("Hi\n\nREFS\n\n\\end{document}\n")
+
+    def test_html_before_body_end(self):
+        spliced = splice_bibliography("<html><body><p>Hi</p></body></html>", "REFS\n", "html")
+        assert spliced == "<html><body><p>Hi</p>\n\nREFS\n\n</body></html>"
+
+    def test_appended_otherwise(self):
+        assert splice_bibliography("# Doc\n\nText\n\n", "REFS\n", "markdown") == (
+            "# Doc\n\nText\n\nREFS\n"
+        )
+
+
+class TestGenerateWithCitations:
+    async def test_sources_fetched_during_generation(self, tmp_path, monkeypatch):
+        events: list[str] = []
+        prompts: list[str] = []
+
+        class SlowProvider(AIProvider):
+            async def generate(self, system_prompt, user_prompt):
+                prompts.append(user_prompt)
+                events.append("generate start")
+                await asyncio.sleep(0.2)
+                events.append("generate end")
+                return GenerationResult(content="# Doc\n\nText\n", model="fake", provider="f")
+
+            def validate_config(self):
+                pass
+
+        async def fake_fetch(urls, settings):
+            events.append("fetch start")
+            await asyncio.sleep(0.1)
+            events.append("fetch end")
+            return [Citation(url=url, title=url[-1].upper(), accessed="2025-01-01") for url in urls]
+
+        monkeypatch.setattr(generator, "get_provider", lambda settings: SlowProvider())
+        monkeypatch.setattr(generator, "fetch_bibliography", fake_fetch)
+        settings = Settings(
+            _env_file=None, cache_dir=tmp_path, mermaid_diagrams=False, stream_validation=False
+        )
+        request = GenerateRequest(
+            prompt="Summarize https://example.com/a.",
+            output_format="markdown",
+            citations=["https://example.com/b"],
+            detect_citations=True,
+            citation_style="mla",
+            write_to_disk=False,
+        )
+
+        [response] = await generate_document(request, settings)
+
+        assert events.index("fetch end") < events.index("generate end")
+        assert "- https://example.com/b\n- https://example.com/a" in prompts[0]
+        document = response.content.decode()
+        assert document.startswith("# Doc\n\nText\n\n## References\n\n")
+        assert '"B."' in document and '"A."' in document
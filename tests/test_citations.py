@@ -0,0 +1,353 @@
+"""Tests for citation metadata fetching."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from autodocs_ai.utils.citation_cache import CitationCache
+from autodocs_ai.utils.citation_metadata import parse_html_head, parse_pdf_metadata
+from autodocs_ai.utils.citations import (
+    create_client,
+    fetch_citation_metadata,
+    fetch_citations,
+    normalize_url,
+)
+
+PAGE = """<html><head>
+<title>Example Page</title>
+<meta name="author" content="Jane Doe">
+<meta property="article:published_time" content="2024-05-01">
+<meta property="og:site_name" content="Example Site">
+</head><body>Hello</body></html>"""
+
+
+class FakeWeb:
+    """Local HTTP stand-in recording requests and concurrency."""
+
+    def __init__(self, delay: float = 0.05, slow_hosts: tuple[str, ...] = ()) -> None:
+        self.delay = delay
+        self.slow_hosts = slow_hosts
+        self.requests: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.host_in_flight: dict[str, int] = {}
+        self.max_host_in_flight: dict[str, int] = {}
+        self.not_modified = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        self.requests.append(str(request.url))
+        self.in_flight += 1
+        self.host_in_flight[host] = self.host_in_flight.get(host, 0) + 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.max_host_in_flight[host] = max(
+            self.max_host_in_flight.get(host, 0), self.host_in_flight[host]
+        )
+        try:
+            await asyncio.sleep(10 if host in self.slow_hosts else self.delay)
+        finally:
+            self.in_flight -= 1
+            self.host_in_flight[host] -= 1
+        if request.headers.get("If-None-Match") == '"v1"':
+            self.not_modified += 1
+            return httpx.Response(304)
+        return httpx.Response(200, html=PAGE, headers={"ETag": '"v1"'})
+
+    def client(self) -> httpx.AsyncClient:
+        return create_client(transport=httpx.MockTransport(self))
+
+
+class ChunkedBody:
+    """Response body streamed in chunks, recording how much of it was read."""
+
+    def __init__(self, chunks: list[bytes]) -> None:
+        self.chunks = chunks
+        self.sent = 0
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            self.sent += 1
+            yield chunk
+
+
+class TestNormalizeUrl:
+    @pytest.mark.parametrize(
+        "url",
+        [
+            "https://Example.com",
+            "HTTPS://example.com:443/",
+            "https://example.com/#section",
+            "https://example.com/?utm_source=mail&fbclid=x",
+        ],
+    )
+    def test_equivalent_spellings(self, url):
+        assert normalize_url(url) == "https://example.com/"
+
+    def test_keeps_meaningful_parts(self):
+        url = "http://example.com:8080/a/B?id=3"
+        assert normalize_url(url) == url
+
+
+class TestFetchCitationMetadata:
+    async def test_parses_metadata(self):
+        async with FakeWeb().client() as client:
+            citation = await fetch_citation_metadata("https://example.com/", client)
+
+        assert citation.title == "Example Page"
+        assert citation.author == "Jane Doe"
+        assert citation.date == "2024-05-01"
+        assert citation.publisher == "Example Site"
+
+    async def test_failure_returns_url_only(self):
+        def fail(request):
+            raise httpx.ConnectError("refused")
+
+        async with create_client(transport=httpx.MockTransport(fail)) as client:
+            citation = await fetch_citation_metadata("https://example.com/", client)
+
+        assert citation.url == "https://example.com/"
+        assert citation.title == ""
+
+    async def test_stops_reading_at_end_of_head(self):
+        body = ChunkedBody([PAGE[:60].encode(), PAGE[60:].encode()] + [b"x" * 65536] * 50)
+        transport = httpx.MockTransport(
+            lambda request: httpx.Response(200, headers={"Content-Type": "text/html"}, content=body)
+        )
+        async with create_client(transport=transport) as client:
+            citation = await fetch_citation_metadata("https://example.com/", client)
+
+        assert citation.title == "Example Page"
+        assert body.sent == 2
+
+    async def test_stops_reading_at_byte_cap(self):
+        body = ChunkedBody([b"<html><head><title>Long</title>"] + [b"<!-- -->" * 1024] * 50)
+        transport = httpx.MockTransport(
+            lambda request: httpx.Response(200, headers={"Content-Type": "text/html"}, content=body)
+        )
+        async with create_client(transport=transport) as client:
+            citation = await fetch_citation_metadata(
+                "https://example.com/", client, max_bytes=16 * 1024
+            )
+
+        assert citation.title == "Long"
+        assert body.sent < 5
+
+    async def test_skips_other_content_types(self):
+        body = ChunkedBody([b"\x89PNG"] * 10)
+        transport = httpx.MockTransport(
+            lambda request: httpx.Response(200, headers={"Content-Type": "image/png"}, content=body)
+        )
+        async with create_client(transport=transport) as client:
+            citation = await fetch_citation_metadata("https://example.com/a.png", client)
+
+        assert citation.title == ""
+        assert body.sent <= 1
+
+    async def test_reads_pdf_metadata(self):
+        pdf = b"%PDF-1.7\n1 0 obj\n<< /Title (Deep Learning) /Author (A. Smith)"
+        pdf += b" /CreationDate (D:20230115120000Z) >>\nendobj\n"
+        transport = httpx.MockTransport(
+            lambda request: httpx.Response(
+                200, headers={"Content-Type": "application/pdf"}, content=pdf
+            )
+        )
+        async with create_client(transport=transport) as client:
+            citation = await fetch_citation_metadata("https://example.com/paper.pdf", client)
+
+        assert (citation.title, citation.author, citation.date) == (
+            "Deep Learning",
+            "A. Smith",
+            "2023-01-15",
+        )
+
+
+class TestParseHtmlHead:
+    def test_attribute_order_and_entities(self):
+        head = """<head><title>Tom &amp; Jerry | Site</title>
+        <meta content="Ann Lee" name="author">
+        <meta content='2020-02-02' property='article:published_time'>
+        </head>"""
+        assert parse_html_head(head) == {
+            "title": "Tom & Jerry | Site",
+            "author": "Ann Lee",
+            "date": "2020-02-02",
+        }
+
+    def test_prefers_specific_metadata(self):
+        head = """<title>Paper - Journal</title>
+        <meta property="og:title" content="OG Title">
+        <meta name="citation_title" content="The Paper">
+        <meta name="citation_author" content="Smith, A.">
+        <meta name="citation_author" content="Doe, J.">
+        <meta name="citation_journal_title" content="Nature">"""
+        fields = parse_html_head(head)
+
+        assert fields["title"] == "The Paper"
+        assert fields["author"] == "Smith, A., Doe, J."
+        assert fields["publisher"] == "Nature"
+
+    def test_json_ld(self):
+        head = """<title>Fallback</title>
+        <script type="application/ld+json">{"@context": "https://schema.org", "@graph": [
+          {"@type": "WebSite", "name": "Example News"},
+          {"@type": "NewsArticle", "headline": "Big Story",
+           "author": [{"@type": "Person", "name": "Kim Park"}],
+           "datePublished": "2024-03-04T10:00:00Z",
+           "publisher": {"@type": "Organization", "name": "Example News"}}]}
+        </script>"""
+        assert parse_html_head(head) == {
+            "title": "Big Story",
+            "author": "Kim Park",
+            "date": "2024-03-04T10:00:00Z",
+            "publisher": "Example News",
+        }
+
+    def test_ignores_profile_urls_and_broken_json(self):
+        head = """<meta property="article:author" content="https://example.com/kim">
+        <script type="application/ld+json">{not json</script>"""
+        assert parse_html_head(head) == {}
+
+
+class TestParsePdfMetadata:
+    def test_hex_and_escaped_strings(self):
+        title = "Ünïcode".encode("utf-16-be")
+        data = b"<< /Title <FEFF" + title.hex().encode() + b"> /Author (O\\'Brien \\(ed.\\)) >>"
+        assert parse_pdf_metadata(data) == {"title": "Ünïcode", "author": "O'Brien (ed.)"}
+
+    def test_xmp_packet(self):
+        data = b"""<x:xmpmeta><dc:title><rdf:Alt><rdf:li xml:lang="x-default">XMP Title</rdf:li>
+        </rdf:Alt></dc:title><dc:creator><rdf:Seq><rdf:li>A</rdf:li><rdf:li>B</rdf:li>
+        </rdf:Seq></dc:creator><xmp:CreateDate>2019-07-08T00:00:00</xmp:CreateDate></x:xmpmeta>"""
+        assert parse_pdf_metadata(data) == {
+            "title": "XMP Title",
+            "author": "A, B",
+            "date": "2019-07-08",
+        }
+
+
+class TestFetchCitations:
+    async def test_dedupes_normalized_urls(self):
+        web = FakeWeb()
+        urls = ["https://example.com/a", "https://EXAMPLE.com/a#top", "https://example.com/b"]
+        async with web.client() as client:
+            citations = await fetch_citations(urls, client=client)
+
+        assert [c.url for c in citations] == ["https://example.com/a", "https://example.com/b"]
+        assert len(web.requests) == 2
+        assert all(c.title == "Example Page" for c in citations)
+
+    async def test_caps_concurrency(self):
+        web = FakeWeb()
+        urls = [f"https://site{i % 3}.test/{i}" for i in range(30)]
+        async with web.client() as client:
+            citations = await fetch_citations(urls, client=client, max_concurrency=5, per_host=2)
+
+        assert len(citations) == 30
+        assert web.max_in_flight == 5
+        assert max(web.max_host_in_flight.values()) == 2
+
+    async def test_deadline_returns_partial_results(self):
+        web = FakeWeb(slow_hosts=("slow.test",))
+        urls = ["https://fast.test/1", "https://slow.test/1", "https://fast.test/2"]
+        start = time.monotonic()
+        async with web.client() as client:
+            citations = await fetch_citations(urls, client=client, deadline=0.5)
+
+        assert time.monotonic() - start < 2
+        assert [c.url for c in citations] == [
+            "https://fast.test/1",
+            "https://slow.test/1",
+            "https://fast.test/2",
+        ]
+        assert [c.title for c in citations] == ["Example Page", "", "Example Page"]
+
+    async def test_empty(self):
+        assert await fetch_citations([]) == []
+
+    def test_http2_requires_h2(self):
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            with pytest.raises(ImportError, match="autodocs-ai\\[http2\\]"):
+                create_client(http2=True)
+        else:
+            pytest.skip("h2 is installed")
+
+
+class TestCitationCache:
+    async def test_warm_cache_needs_no_network(self, tmp_path):
+        cache = CitationCache(tmp_path / "citations.sqlite3")
+        web = FakeWeb()
+        urls = ["https://example.com/a", "https://example.com/b"]
+        async with web.client() as client:
+            await fetch_citations(urls, client=client, cache=cache)
+
+        def offline(request):
+            raise AssertionError(f"unexpected request to {request.url}")
+
+        async with create_client(transport=httpx.MockTransport(offline)) as client:
+            citations = await fetch_citations(
+                ["https://EXAMPLE.com/a#intro", *urls], client=client, cache=cache
+            )
+
+        assert len(web.requests) == 2
+        assert [c.title for c in citations] == ["Example Page", "Example Page"]
+        assert citations[0].publisher == "Example Site"
+
+    async def test_persists_across_instances(self, tmp_path):
+        path = tmp_path / "citations.sqlite3"
+        async with FakeWeb().client() as client:
+            await fetch_citation_metadata("https://example.com/", client, CitationCache(path))
+
+        cached = CitationCache(path).get("https://example.com")
+        assert cached is not None
+        assert cached.citation.author == "Jane Doe"
+        assert cached.etag == '"v1"'
+
+    async def test_stale_entry_is_revalidated(self, tmp_path):
+        cache = CitationCache(tmp_path / "citations.sqlite3", ttl=0)
+        web = FakeWeb()
+        async with web.client() as client:
+            await fetch_citation_metadata("https://example.com/", client, cache)
+            citation = await fetch_citation_metadata("https://example.com/", client, cache)
+
+        assert web.not_modified == 1
+        assert citation.title == "Example Page"
+
+    async def test_stale_entry_served_when_offline(self, tmp_path):
+        cache = CitationCache(tmp_path / "citations.sqlite3", ttl=0)
+        async with FakeWeb().client() as client:
+            await fetch_citation_metadata("https://example.com/", client, cache)
+
+        def fail(request):
+            raise httpx.ConnectError("offline")
+
+        async with create_client(transport=httpx.MockTransport(fail)) as client:
+            citation = await fetch_citation_metadata("https://example.com/", client, cache)
+
+        assert citation.title == "Example Page"
+
+    @pytest.mark.parametrize("status", [404, 429, 500])
+    async def test_stale_entry_served_on_error_response(self, tmp_path, status):
+        cache = CitationCache(tmp_path / "citations.sqlite3", ttl=0)
+        async with FakeWeb().client() as client:
+            await fetch_citation_metadata("https://example.com/", client, cache)
+
+        transport = httpx.MockTransport(lambda request: httpx.Response(status, text="error"))
+        async with create_client(transport=transport) as client:
+            citation = await fetch_citation_metadata("https://example.com/", client, cache)
+
+        assert citation.title == "Example Page"
+        assert cache.get("https://example.com/").citation.author == "Jane Doe"
+
+    async def test_errors_are_not_cached(self, tmp_path):
+        cache = CitationCache(tmp_path / "citations.sqlite3")
+        transport = httpx.MockTransport(lambda request: httpx.Response(503, text="busy"))
+        async with create_client(transport=transport) as client:
+            await fetch_citation_metadata("https://example.com/", client, cache)
+
+        assert cache.get("https://example.com/") is None
@@ -2,10 +2,13 @@
 
 from __future__ import annotations
 
+from pathlib import Path
+
 from typer.testing import CliRunner
 
 from autodocs_ai import __version__
 from autodocs_ai.cli import app
+from autodocs_ai.utils.versioning import commit_version, init_versioning, list_versions
 
 runner = CliRunner()
 
@@ -57,3 +60,22 @@ class TestCLIGenerate:
         result = runner.invoke(app, ["generate", "test prompt", "--json"])
         # Either succeeds (if provider configured) or fails gracefully
         assert result.exit_code in (0, 1)
+
+
+class TestGarbageCollection:
+    def test_gc_drops_oldest_store_versions(self, tmp_path: Path):
+        init_versioning(tmp_path, backend="store")
+        for size in (100, 200, 300):
+            (tmp_path / "report.pdf").write_bytes(b"x" * size)
+            commit_version(tmp_path)
+
+        result = runner.invoke(app, ["gc", "--max-bytes", "550", "--output-dir", str(tmp_path)])
+        assert result.exit_code == 0
+        assert "Removed 1 versions and 1 stored files (100 bytes)" in result.stdout
+        assert len(list_versions(tmp_path)) == 2
+
+    def test_gc_requires_a_limit(self, tmp_path: Path, monkeypatch):
+        monkeypatch.delenv("AUTODOCS_VERSIONING_MAX_AGE_DAYS", raising=False)
+        monkeypatch.delenv("AUTODOCS_VERSIONING_MAX_BYTES", raising=False)
+        result = runner.invoke(app, ["gc", "--output-dir", str(tmp_path)])
+        assert result.exit_code == 1
@@ -2,11 +2,26 @@
 
 from __future__ import annotations
 
-import pytest
+import os
+import threading
+import time
 from pathlib import Path
 
-from autodocs_ai.extractors import extract_file, get_supported_extensions
-from autodocs_ai.extractors.base import ExtractionError
+import pytest
+
+from autodocs_ai.extractors import (
+    ExtractOptions,
+    extract_file,
+    extract_files,
+    get_extractor,
+    get_supported_extensions,
+    parallel,
+    parse_input,
+)
+from autodocs_ai.extractors import cache as extraction_cache
+from autodocs_ai.extractors.base import ExtractionError, parse_pages
+from autodocs_ai.extractors.cache import ExtractionCache
+from autodocs_ai.extractors.pdf import PDFExtractor
 from autodocs_ai.extractors.text import TextExtractor
 
 
@@ -80,3 +95,438 @@ class TestSupportedExtensions:
         assert ".csv" in exts
         assert ".pdf" in exts
         assert ".docx" in exts
+
+
+class TestExtractFiles:
+    async def test_preserves_order_and_isolates_failures(self, tmp_path: Path):
+        pytest.importorskip("PyPDF2")
+        pytest.importorskip("pandas")
+        (tmp_path / "a.txt").write_text("alpha")
+        (tmp_path / "broken.pdf").write_bytes(b"not a pdf")
+        (tmp_path / "data.csv").write_text("name,age\nAlice,30")
+        paths = [tmp_path / name for name in ("a.txt", "broken.pdf", "missing.md", "data.csv")]
+
+        results = await extract_files(paths, max_workers=2)
+
+        assert [r.path for r in results] == paths
+        assert results[0].content == "alpha"
+        assert results[1].content is None and "Failed to extract PDF" in results[1].error
+        assert results[2].error == "File not found"
+        assert "Alice" in results[3].content
+
+    async def test_bounds_concurrency(self, tmp_path: Path, monkeypatch):
+        running = peak = 0
+        lock = threading.Lock()
+
+        def slow_extract(file_path: Path, options) -> str:
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.05)
+            with lock:
+                running -= 1
+            return file_path.name
+
+        monkeypatch.setattr(parallel, "_extract", slow_extract)
+        paths = []
+        for i in range(8):
+            paths.append(tmp_path / f"{i}.txt")
+            paths[-1].write_text("x")
+
+        results = await extract_files(paths, max_workers=3)
+
+        assert [r.content for r in results] == [f"{i}.txt" for i in range(8)]
+        assert peak == 3
+
+
+class TestExtractionCache:
+    async def test_repeat_extraction_does_no_parsing(self, tmp_path: Path, monkeypatch):
+        calls: list[str] = []
+
+        def counting_extract(file_path: Path, options) -> str:
+            calls.append(file_path.name)
+            return extract_file(file_path, options)
+
+        monkeypatch.setattr(parallel, "_extract", counting_extract)
+        cache = ExtractionCache(tmp_path / "cache")
+        file = tmp_path / "notes.txt"
+        file.write_text("first")
+
+        [first] = await extract_files([file], cache=cache)
+        [second] = await extract_files([file], cache=cache)
+        assert first.content == second.content == "first"
+        assert calls == ["notes.txt"]
+
+        file.write_text("second")
+        [changed] = await extract_files([file], cache=cache)
+        assert changed.content == "second"
+        assert calls == ["notes.txt", "notes.txt"]
+
+    def test_unchanged_files_are_not_rehashed(self, tmp_path: Path, monkeypatch):
+        cache = ExtractionCache(tmp_path / "cache")
+        file = tmp_path / "notes.txt"
+        file.write_text("content")
+        key = cache.key(file, TextExtractor())
+
+        def no_hashing(path):
+            raise AssertionError("file was rehashed")
+
+        monkeypatch.setattr(extraction_cache, "_hash_file", no_hashing)
+        assert cache.key(file, TextExtractor()) == key
+
+    def test_extractor_version_changes_key(self, tmp_path: Path):
+        class NewTextExtractor(TextExtractor):
+            version = "2"
+
+        cache = ExtractionCache(tmp_path / "cache")
+        file = tmp_path / "notes.txt"
+        file.write_text("content")
+        assert cache.key(file, TextExtractor()) != cache.key(file, NewTextExtractor())
+
+    def test_compressed_and_size_capped(self, tmp_path: Path):
+        cache = ExtractionCache(tmp_path / "cache", max_bytes=2000)
+        cache.put("a", "x" * 10_000)
+        assert cache.size_bytes() < 100
+        assert cache.get("a") == "x" * 10_000
+
+        cache.put("b", os.urandom(1000).hex())
+        os.utime(tmp_path / "cache" / "b.z", (0, 0))  # Least recently used
+        cache.put("c", os.urandom(1000).hex())
+        assert cache.get("b") is None
+        assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def make_pdf(path: Path, page_texts: list[str]) -> Path:
+    """Write a minimal PDF with one line of text per page."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", b""]
+    font = 3 + 2 * len(page_texts)
+    kids = []
+    for i, text in enumerate(page_texts):
+        page, content = 3 + 2 * i, 4 + 2 * i
+        kids.append(f"{page} 0 R")
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {content} 0 R "
+            f"/Resources << /Font << /F1 {font} 0 R >> >> >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    data = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(data))
+        data += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(data)
+    data += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    data += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    data += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    path.write_bytes(bytes(data))
+    return path
+
+
+class TestPDFExtractor:
+    @pytest.fixture
+    def pdf(self, tmp_path: Path) -> Path:
+        pytest.importorskip("PyPDF2")
+        return make_pdf(tmp_path / "report.pdf", [f"Page {i} text" for i in range(1, 11)])
+
+    def test_page_ranges(self, pdf: Path):
+        options = ExtractOptions(pages=parse_pages("2-3,9-"))
+        text = extract_file(pdf, options)
+        assert [line for line in text.split("\n\n")] == [
+            "Page 2 text",
+            "Page 3 text",
+            "Page 9 text",
+            "Page 10 text",
+        ]
+
+    def test_budget_stops_parsing_early(self, pdf: Path, monkeypatch):
+        from PyPDF2 import PageObject
+
+        monkeypatch.setattr(get_extractor(pdf), "_backend", "pypdf2")
+
+        parsed = []
+        extract_text = PageObject.extract_text
+
+        def counting(self, *args, **kwargs):
+            parsed.append(1)
+            return extract_text(self, *args, **kwargs)
+
+        monkeypatch.setattr(PageObject, "extract_text", counting)
+        text = extract_file(pdf, ExtractOptions(max_chars=20))
+
+        assert len(parsed) == 2
+        assert text == "Page 1 text\n\nPage 2 \n[... truncated]"
+
+    async def test_spec_in_input_path(self, pdf: Path):
+        [item] = await extract_files([f"{pdf}#pages=4&tokens=100"])
+        assert item.path == pdf
+        assert item.content == "Page 4 text"
+
+        [bad] = await extract_files([f"{pdf}#pages=0"])
+        assert "Invalid page range" in bad.error
+
+    async def test_large_documents_are_split_across_workers(self, tmp_path: Path):
+        pytest.importorskip("PyPDF2")
+        pdf = make_pdf(tmp_path / "long.pdf", [f"Page {i} text" for i in range(1, 81)])
+
+        pieces = get_extractor(pdf).split(pdf, ExtractOptions(), 4)
+        assert [piece.pages for piece in pieces] == [((0, 32),), ((32, 64),), ((64, 80),)]
+
+        [item] = await extract_files([pdf], max_workers=4)
+        assert item.content == extract_file(pdf)
+        assert item.content.split("\n\n") == [f"Page {i} text" for i in range(1, 81)]
+
+    def test_split_keeps_selection_and_budgets(self, tmp_path: Path):
+        pytest.importorskip("PyPDF2")
+        pdf = make_pdf(tmp_path / "long.pdf", [f"Page {i}" for i in range(1, 101)])
+        extractor = get_extractor(pdf)
+
+        pieces = extractor.split(pdf, ExtractOptions(pages=parse_pages("1-40,71-")), 2)
+        assert [piece.pages for piece in pieces] == [((0, 35),), ((35, 40), (70, 100))]
+
+        budget = ExtractOptions(max_chars=1000)
+        assert extractor.split(pdf, budget, 4) == [budget]
+        small = make_pdf(tmp_path / "small.pdf", ["Only page"])
+        assert extractor.split(small, ExtractOptions(), 4) == [ExtractOptions()]
+
+    def test_pymupdf_backend(self, pdf: Path):
+        pytest.importorskip("pymupdf")
+        fast, fallback = PDFExtractor(), PDFExtractor(backend="pypdf2")
+
+        assert fast.backend == "pymupdf"
+        assert fast.version != fallback.version  # Cached separately
+        options = ExtractOptions(pages=parse_pages("2-3,9-"))
+        assert fast.extract(pdf, options) == fallback.extract(pdf, options)
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError, match="Unknown PDF backend"):
+            PDFExtractor(backend="pdfminer")
+
+
+class TestExcelExtractor:
+    @pytest.fixture
+    def workbook(self, tmp_path: Path) -> Path:
+        openpyxl = pytest.importorskip("openpyxl")
+        from datetime import datetime
+
+        wb = openpyxl.Workbook(write_only=True)
+        sales = wb.create_sheet("Sales")
+        sales.append(["Region", "Date", "Amount", "Note"])
+        for i in range(1, 21):
+            sales.append([f"R{i}", datetime(2024, 1, i), i * 1.5, "a|b" if i == 1 else None])
+        wb.create_sheet("Empty")
+        wide = wb.create_sheet("Wide")
+        wide.append([f"c{i}" for i in range(10)])
+        wide.append(list(range(10)))
+        path = tmp_path / "book.xlsx"
+        wb.save(path)
+        return path
+
+    def test_every_sheet_is_labelled(self, workbook: Path):
+        text = extract_file(workbook)
+
+        assert [line for line in text.splitlines() if line.startswith("## ")] == [
+            "## Sheet: Sales",
+            "## Sheet: Empty",
+            "## Sheet: Wide",
+        ]
+        assert "| Region | Date | Amount | Note |\n|---|---|---|---|" in text
+        assert "| R1 | 2024-01-01 | 1.5 | a\\|b |" in text
+        assert "| R2 | 2024-01-02 | 3 |  |" in text
+        assert "| R20 |" in text
+        assert "| 0 | 1 | 2 | 3 | 4 | 5 | 6 | 7 | 8 | 9 |" in text
+
+    def test_row_and_column_caps(self, workbook: Path):
+        text = extract_file(workbook, ExtractOptions(max_rows=3, max_columns=4))
+
+        assert "| R2 |" in text and "| R3 |" not in text
+        assert "[... rows after the first 3 omitted]" in text
+        assert "| c0 | c1 | c2 | c3 |" in text and "c4" not in text
+        assert "[... columns after the first 4 omitted]" in text
+
+    def test_workbook_is_streamed(self, workbook: Path, monkeypatch):
+        import openpyxl
+
+        opened = []
+        load_workbook = openpyxl.load_workbook
+
+        def spy(*args, **kwargs):
+            opened.append(kwargs)
+            return load_workbook(*args, **kwargs)
+
+        monkeypatch.setattr(openpyxl, "load_workbook", spy)
+        text = extract_file(workbook, ExtractOptions(max_chars=50))
+
+        assert opened == [{"read_only": True, "data_only": True}]
+        assert "Sheet: Sales" in text and "Sheet: Wide" not in text
+
+
+class TestCSVSummary:
+    @pytest.fixture
+    def csv(self, tmp_path: Path) -> Path:
+        pytest.importorskip("pandas")
+        lines = ["id,region,amount,note"]
+        for i in range(300):
+            region = "North" if i % 3 else "South"
+            amount = "" if i % 50 == 0 else (str(i) if i < 150 else f"{i}.5")
+            lines.append(f"{i},{region},{amount},note {i % 7}")
+        path = tmp_path / "sales.csv"
+        path.write_text("\n".join(lines))
+        return path
+
+    def test_small_files_are_extracted_whole(self, csv: Path):
+        text = extract_file(csv, ExtractOptions(max_rows=300))
+        assert "Table summary" not in text
+        assert "note 6" in text
+
+    def test_large_files_are_summarized(self, csv: Path, monkeypatch):
+        from autodocs_ai.extractors import summary
+
+        monkeypatch.setattr(summary, "_CHUNK_ROWS", 64)  # Several chunks
+        text = extract_file(csv, ExtractOptions(max_rows=100))
+
+        assert text.startswith("Table summary of sales.csv: 300 rows, 4 columns")
+        assert "| id | int64 | 0 | 0 | 299 | 149.5 |  |" in text
+        # Integer chunks then float chunks; 6 empty amounts
+        amounts = [i + (0.5 if i >= 150 else 0) for i in range(300) if i % 50]
+        mean = sum(amounts) / len(amounts)
+        assert f"| amount | float64 | 6 | 1 | 299.5 | {mean:.6g} |  |" in text
+        assert "North (200), South (100)" in text
+        assert "stratified by region" in text
+
+    def test_sample_is_stratified_and_ordered(self, csv: Path):
+        import pandas as pd
+
+        from autodocs_ai.extractors.summary import TableSummary
+
+        table = TableSummary(sample_rows=12)
+        for chunk in pd.read_csv(csv, chunksize=40):
+            table.add(chunk)
+        sample = table.sample()
+
+        assert len(sample) == 12
+        assert list(sample["region"].value_counts()) == [8, 4]
+        assert list(sample["id"]) == sorted(sample["id"])
+
+    def test_positional_strata_cover_the_file(self, tmp_path: Path):
+        pd = pytest.importorskip("pandas")
+        from autodocs_ai.extractors.summary import TableSummary
+
+        table = TableSummary(sample_rows=10)
+        for start in range(0, 10_000, 100):
+            rows = range(start, start + 100)
+            table.add(pd.DataFrame({"value": rows}, index=rows))
+        sample = table.sample()
+
+        assert table.stratify_by is None
+        assert len(sample) == 10
+        # Ten strata of 100 rows, merged into strata of 1600 as the file grew; each
+        # is represented
+        assert {value // 1600 for value in sample["value"]} == set(range(7))
+        assert list(sample["value"]) == sorted(sample["value"])
+
+    def test_column_cap(self, csv: Path):
+        text = extract_file(csv, ExtractOptions(max_rows=10, max_columns=2))
+        assert "2 columns" in text and "| amount |" not in text
+        assert "[... columns after the first 2 of 4 omitted]" in text
+
+
+class TestWordExtractor:
+    @pytest.fixture
+    def docx(self, tmp_path: Path) -> Path:
+        docx = pytest.importorskip("docx")
+
+        doc = docx.Document()
+        doc.sections[0].header.paragraphs[0].text = "ACME Confidential"
+        doc.sections[0].footer.paragraphs[0].text = "Closing remarks."
+        doc.add_heading("Quarterly report", level=1)
+        doc.add_paragraph("Revenue grew.\tStrongly.")
+        table = doc.add_table(rows=3, cols=2)
+        for row, values in zip(table.rows, [("Region", "Sales"), ("North", "10|5"), ("South", "")]):
+            for cell, value in zip(row.cells, values):
+                cell.text = value
+        table.rows[2].cells[1].add_table(rows=1, cols=1).rows[0].cells[0].text = "nested"
+        doc.add_paragraph("")
+        doc.add_paragraph("Closing remarks.")
+        path = tmp_path / "report.docx"
+        doc.save(path)
+        return path
+
+    def test_paragraphs_and_tables_in_order(self, docx: Path):
+        assert extract_file(docx) == (
+            "# Quarterly report\n\n"
+            "Revenue grew.\tStrongly.\n\n"
+            "| Region | Sales |\n|---|---|\n| North | 10\\|5 |\n| South | nested |\n\n"
+            "Closing remarks."
+        )
+
+    def test_headers_and_footers(self, docx: Path):
+        text = extract_file(docx, ExtractOptions(headers_footers=True))
+        assert text.startswith("ACME Confidential\n\n# Quarterly report")
+        # A footer equal to a body paragraph is still included
+        assert text.endswith("Closing remarks.\n\nClosing remarks.")
+
+    def test_repeated_headers_are_included_once(self, tmp_path: Path):
+        docx = pytest.importorskip("docx")
+        doc = docx.Document()
+        section = doc.sections[0]
+        section.different_first_page_header_footer = True
+        section.header.paragraphs[0].text = "ACME"
+        section.first_page_header.paragraphs[0].text = "ACME"
+        doc.add_paragraph("Body")
+        path = tmp_path / "repeated.docx"
+        doc.save(path)
+
+        assert extract_file(path, ExtractOptions(headers_footers=True)) == "ACME\n\nBody"
+
+    async def test_headers_and_footers_through_extract_files(self, docx: Path):
+        [plain] = await extract_files([docx])
+        [item] = await extract_files([docx], headers_footers=True)
+        assert not plain.content.startswith("ACME Confidential")
+        assert item.content == extract_file(docx, ExtractOptions(headers_footers=True))
+
+    def test_limits(self, docx: Path):
+        text = extract_file(docx, ExtractOptions(max_rows=2))
+        assert "| North |" in text and "| South |" not in text
+        assert "[... rows after the first 2 omitted]" in text
+
+        assert extract_file(docx, ExtractOptions(max_chars=25)) == (
+            "# Quarterly report\n\nReven\n[... truncated]"
+        )
+
+    def test_not_a_docx(self, tmp_path: Path):
+        path = tmp_path / "fake.docx"
+        path.write_text("plain text")
+        with pytest.raises(ExtractionError, match="Failed to extract Word document"):
+            extract_file(path)
+
+
+class TestParseInput:
+    def test_plain_path(self):
+        assert parse_input("notes.md", 100) == (Path("notes.md"), ExtractOptions(max_chars=100))
+
+    def test_options(self):
+        path, options = parse_input("a.pdf#pages=1-20,25,30-&tokens=10")
+        assert path == Path("a.pdf")
+        assert options == ExtractOptions(pages=((0, 20), (24, 25), (29, None)), max_chars=40)
+
+    def test_existing_path_with_hash_is_not_split(self, tmp_path: Path):
+        file = tmp_path / "notes#pages=1.md"
+        file.write_text("x")
+        assert parse_input(str(file))[0] == file
+
+    def test_unknown_option(self):
+        with pytest.raises(ValueError):
+            parse_input("a.pdf#rows=10")
+
+    @pytest.mark.parametrize("fragment", ["chars=0", "chars=-5", "tokens=0", "tokens=-1"])
+    def test_budget_must_be_positive(self, fragment: str):
+        with pytest.raises(ValueError, match="must be at least 1"):
+            parse_input(f"report.pdf#{fragment}")
@@ -0,0 +1,182 @@
+"""Tests for Mermaid diagram rendering."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from autodocs_ai.config import Settings
+from autodocs_ai.core.diagrams import DiagramStage
+from autodocs_ai.utils.mermaid import (
+    MermaidError,
+    render_mermaid_batch,
+    render_mermaid_to_svg,
+    replace_mermaid_with_images,
+    substitute_mermaid,
+)
+
+FAKE_MMDC = """\
+#!{python}
+import re, sys
+from pathlib import Path
+
+args = sys.argv[1:]
+opts = dict(zip(args[::2], args[1::2]))
+with open({log!r}, "a") as log:
+    log.write(" ".join(args) + "\\n")
+
+source = Path(opts["-i"]).read_text()
+out = Path(opts["-o"])
+if out.suffix == ".md":
+    diagrams = re.findall(r"```mermaid\\n(.*?)```", source, re.DOTALL)
+    if any("BROKEN" in d for d in diagrams):
+        sys.exit(1)
+    for i, d in enumerate(diagrams, start=1):
+        out.with_name(f"{{out.stem}}-{{i}}.{{opts['-e']}}").write_text(f"<svg>{{d.strip()}}</svg>")
+else:
+    if "BROKEN" in source:
+        sys.stderr.write("Parse error")
+        sys.exit(1)
+    out.write_text(f"<svg>{{source.strip()}}</svg>")
+"""
+
+
+@pytest.fixture
+def mmdc_log(tmp_path: Path, monkeypatch) -> Path:
+    """Install a fake mmdc on PATH that records its invocations."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    log = tmp_path / "mmdc.log"
+    log.touch()
+    mmdc = bin_dir / "mmdc"
+    mmdc.write_text(FAKE_MMDC.format(python=sys.executable, log=str(log)))
+    mmdc.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    return log
+
+
+def _runs(log: Path) -> list[str]:
+    return log.read_text().splitlines()
+
+
+class TestRenderMermaidBatch:
+    def test_renders_all_diagrams_in_one_run(self, mmdc_log: Path):
+        images = render_mermaid_batch(["graph A", "graph B", "graph C"])
+        assert images == {
+            "graph A": b"<svg>graph A</svg>",
+            "graph B": b"<svg>graph B</svg>",
+            "graph C": b"<svg>graph C</svg>",
+        }
+        assert len(_runs(mmdc_log)) == 1
+
+    def test_large_batches_are_split_across_workers(self, mmdc_log: Path):
+        sources = [f"graph {i}" for i in range(10)]
+        images = render_mermaid_batch(sources, workers=2)
+        assert set(images) == set(sources)
+        assert len(_runs(mmdc_log)) == 2
+
+    def test_cached_diagrams_are_not_rerendered(self, mmdc_log: Path, tmp_path: Path):
+        cache_dir = tmp_path / "cache"
+        render_mermaid_batch(["graph A"], cache_dir=cache_dir)
+        images = render_mermaid_batch(["graph A", "graph B"], cache_dir=cache_dir)
+        assert set(images) == {"graph A", "graph B"}
+        runs = _runs(mmdc_log)
+        assert len(runs) == 2
+
+    def test_theme_is_part_of_the_cache_key(self, mmdc_log: Path, tmp_path: Path):
+        cache_dir = tmp_path / "cache"
+        render_mermaid_batch(["graph A"], cache_dir=cache_dir)
+        render_mermaid_batch(["graph A"], theme="dark", cache_dir=cache_dir)
+        assert len(_runs(mmdc_log)) == 2
+        assert "-t dark" in _runs(mmdc_log)[1]
+
+    def test_cache_evicts_least_recently_used(self, mmdc_log: Path, tmp_path: Path):
+        cache_dir = tmp_path / "cache"
+        render_mermaid_batch([f"graph {i}" for i in range(5)], cache_dir=cache_dir, cache_size=3)
+        assert len(list(cache_dir.glob("*.svg"))) == 3
+
+    def test_broken_diagram_does_not_fail_the_batch(self, mmdc_log: Path):
+        images = render_mermaid_batch(["graph A", "BROKEN", "graph C"])
+        assert set(images) == {"graph A", "graph C"}
+
+
+class TestRenderMermaidToSvg:
+    def test_raises_on_failure(self, mmdc_log: Path):
+        with pytest.raises(MermaidError, match="Parse error"):
+            render_mermaid_to_svg("BROKEN")
+
+    def test_writes_output_file(self, mmdc_log: Path, tmp_path: Path):
+        svg = render_mermaid_to_svg("graph A", tmp_path / "a.svg")
+        assert svg == "<svg>graph A</svg>"
+        assert (tmp_path / "a.svg").read_text() == svg
+
+
+SVG = b'<svg xmlns="http://www.w3.org/2000/svg" width="10" height="10"><text>"a"</text></svg>'
+
+
+class TestSubstituteMermaid:
+    def test_typst_embeds_svg_inline(self):
+        pytest.importorskip("typst")
+        from autodocs_ai.core.renderer import render_to_bytes
+
+        content = "= Doc\n\n```mermaid\ngraph A\n```\n\nText\n"
+        result = substitute_mermaid(content, {"graph A\n": SVG}, "typst")
+        assert result.startswith("= Doc\n\n#image(bytes(")
+        assert result.endswith("\n\nText\n")
+        assert render_to_bytes(result).startswith(b"%PDF")
+
+    def test_latex_references_files_and_loads_graphicx(self, tmp_path: Path):
+        content = (
+            "\\documentclass{article}\n\\begin{document}\n"
+            "```mermaid\ngraph A\n```\n\\end{document}\n"
+        )
+        result = substitute_mermaid(content, {"graph A\n": b"png"}, "latex", tmp_path)
+        assert "\\usepackage{graphicx}\n\\begin{document}" in result
+        assert f"\\includegraphics[width=\\linewidth]{{{tmp_path}" in result
+        assert len(list(tmp_path.glob("*.png"))) == 1
+
+    def test_markdown_without_image_dir_uses_data_uri(self):
+        result = substitute_mermaid("```mermaid\ngraph A\n```", {"graph A\n": SVG}, "markdown")
+        assert result.startswith("![Diagram 1](data:image/svg+xml;base64,")
+
+    def test_unrendered_blocks_are_kept(self):
+        content = "```mermaid\ngraph A\n```\n```mermaid\ngraph B\n```"
+        result = substitute_mermaid(content, {"graph B\n": SVG}, "html")
+        assert result.startswith("```mermaid\ngraph A\n```\n<figure")
+
+
+class TestDiagramStage:
+    def _settings(self, tmp_path: Path) -> Settings:
+        return Settings(_env_file=None, cache_dir=tmp_path / "cache")
+
+    async def test_renders_diagrams_while_streaming(self, mmdc_log: Path, tmp_path: Path):
+        stage = DiagramStage("markdown", self._settings(tmp_path))
+        for chunk in ["# Doc\n\n``", "`mermaid\ngraph A\n", "```\n\nMore text\n"]:
+            stage.feed(chunk)
+        await asyncio.sleep(0.5)
+        assert "graph A\n" in stage.images
+
+        result = await stage.apply("# Doc\n\n```mermaid\ngraph A\n```\n\nMore text\n")
+        assert "![Diagram 1](data:image/svg+xml;base64," in result
+        assert len(_runs(mmdc_log)) == 1
+
+    async def test_without_mmdc_blocks_are_kept(self, tmp_path: Path, monkeypatch):
+        monkeypatch.setenv("PATH", str(tmp_path))
+        stage = DiagramStage("typst", self._settings(tmp_path))
+        content = "```mermaid\ngraph A\n```"
+        stage.feed(content)
+        assert await stage.apply(content) == content
+
+
+class TestReplaceMermaidWithImages:
+    def test_replaces_blocks_with_one_run(self, mmdc_log: Path, tmp_path: Path):
+        content = "# Doc\n\n```mermaid\ngraph A\n```\n\nText\n\n```mermaid\ngraph B\n```\n"
+        result = replace_mermaid_with_images(content, tmp_path / "img", target="markdown")
+        assert "```mermaid" not in result
+        assert result.count("![Diagram") == 2
+        assert len(list((tmp_path / "img").glob("*.svg"))) == 2
+        assert len(_runs(mmdc_log)) == 1
@@ -2,16 +2,36 @@
 
 from __future__ import annotations
 
+import asyncio
+import os
+import shutil
+import sys
+
 import pytest
 from pathlib import Path
 
-from autodocs_ai.config import RendererName
+from autodocs_ai.config import RendererName, Settings
+from autodocs_ai.core import artifact_cache
+from autodocs_ai.core.artifact_cache import ArtifactCache, get_artifact_cache
+from autodocs_ai.core.docx_builder import parse_inline, tokenize_markdown
+from autodocs_ai.core import renderer as renderer_module
+from autodocs_ai.core.latex_formats import LatexFormatCache, split_preamble
 from autodocs_ai.core.renderer import (
     RenderError,
     render,
+    render_docx,
     render_html,
     render_markdown,
+    render_to_bytes,
+    render_to_bytes_async,
+    typst_to_pdf_async,
 )
+from autodocs_ai.core import sandbox
+from autodocs_ai.core.sandbox import ResourceLimits, describe_failure, run_process
+from autodocs_ai.core.prompts import get_system_prompt
+from autodocs_ai.core.typst_source import top_level_boundaries, top_level_prefix
+from autodocs_ai.core.typst_styles import TEMPLATE_STYLES, style_preamble
+from autodocs_ai.utils.cache import digest, evict_lru
 
 
 class TestRenderHTML:
@@ -65,3 +85,388 @@ class TestRenderDocx:
         assert result == output
         assert output.exists()
         assert output.stat().st_size > 0
+
+
+class TestSplitPreamble:
+    def test_splits_at_begin_document(self):
+        source = (
+            "\\documentclass{article}\n\\usepackage{amsmath}\n"
+            "\\begin{document}\nHi\n\\end{document}"
+        )
+        preamble, body = split_preamble(source)
+        assert preamble.startswith("\\documentclass")
+        assert "amsmath" in preamble
+        assert body.startswith("\\begin{document}")
+
+    def test_requires_documentclass(self):
+        assert split_preamble("\\begin{document}Hi\\end{document}") is None
+
+    def test_requires_begin_document(self):
+        assert split_preamble("\\documentclass{article}") is None
+
+
+class TestLatexFormatCache:
+    async def test_reuses_existing_format(self, tmp_path: Path):
+        cache = LatexFormatCache(tmp_path)
+        preamble = "\\documentclass{article}\n"
+        key = digest("pdflatex", preamble)
+        (tmp_path / f"{key}.fmt").write_bytes(b"fmt")
+        assert await cache.format_for("/usr/bin/pdflatex", preamble) == tmp_path / f"{key}.fmt"
+
+    async def test_falls_back_when_format_cannot_be_built(self, tmp_path: Path):
+        cache = LatexFormatCache(tmp_path)
+        engine = str(tmp_path / "missing-engine")
+        assert await cache.format_for(engine, "\\documentclass{article}\n") is None
+        # Failures are remembered so the build isn't retried
+        assert len(cache._failed) == 1
+
+    def test_evicts_least_recently_used(self, tmp_path: Path):
+        for i in range(3):
+            entry = tmp_path / f"{i}.fmt"
+            entry.write_bytes(b"x")
+            os.utime(entry, (i, i))
+        evicted = evict_lru(tmp_path, "*.fmt", max_entries=2)
+        assert evicted == [tmp_path / "0.fmt"]
+        assert sorted(p.name for p in tmp_path.glob("*.fmt")) == ["1.fmt", "2.fmt"]
+
+
+class TestArtifactCache:
+    def _settings(self, tmp_path: Path) -> Settings:
+        return Settings(_env_file=None, cache_dir=tmp_path / "cache")
+
+    def test_second_render_is_served_from_cache(self, tmp_path: Path):
+        pytest.importorskip("docx")
+        settings = self._settings(tmp_path)
+        source = "# Cached\n\nSame source twice."
+        first = render(source, tmp_path / "a.docx", output_format="docx", settings=settings)
+        second = render(source, tmp_path / "b.docx", output_format="docx", settings=settings)
+
+        cache = get_artifact_cache(settings.cache_dir)
+        assert cache.stats.hits == 1
+        assert cache.stats.misses == 1
+        assert cache.stats.hit_rate == 0.5
+        assert first.read_bytes() == second.read_bytes()
+
+    def test_missing_docx_template_is_a_render_error(self, tmp_path: Path):
+        pytest.importorskip("docx")
+        settings = self._settings(tmp_path)
+        settings.docx_template = tmp_path / "missing.docx"
+        with pytest.raises(RenderError, match="Failed to load DOCX template"):
+            render("# Title", tmp_path / "a.docx", output_format="docx", settings=settings)
+
+    def test_editing_bundled_templates_changes_key(self, tmp_path: Path, monkeypatch):
+        templates = tmp_path / "templates"
+        shutil.copytree(artifact_cache.TEMPLATES_DIR, templates)
+        monkeypatch.setattr(artifact_cache, "TEMPLATES_DIR", templates)
+        cache = ArtifactCache(tmp_path / "cache")
+        before = cache.key("= Title", "typst", "pdf", "py-0.13.0")
+
+        lib = templates / "packages" / "local" / "autodocs" / "0.1.0" / "lib.typ"
+        lib.write_text(lib.read_text() + "\n// Edited\n")
+        edited = cache.key("= Title", "typst", "pdf", "py-0.13.0")
+        assert edited != before
+        (templates / "research_paper.tex").write_text("\\documentclass{article}\n")
+        assert cache.key("= Title", "typst", "pdf", "py-0.13.0") not in (before, edited)
+
+    def test_rerender_does_not_corrupt_cached_artifact(self, tmp_path: Path):
+        cache = ArtifactCache(tmp_path / "cache")
+        rendered = tmp_path / "out.pdf"
+        rendered.write_bytes(b"original")
+        cache.store("k", rendered, 1.5)
+
+        renderer_module._write(rendered, b"changed")
+
+        restored = tmp_path / "restored.pdf"
+        assert cache.fetch("k", restored)
+        assert restored.read_bytes() == b"original"
+        assert cache.stats.saved_seconds == pytest.approx(1.5)
+
+    def test_failed_rerender_keeps_previous_output(self, tmp_path: Path):
+        pytest.importorskip("typst")
+        settings = self._settings(tmp_path)
+        output = tmp_path / "out.pdf"
+        render("= Title", output, settings=settings)  # Hard-linked into the cache
+        previous = output.read_bytes()
+
+        with pytest.raises(RenderError, match="Typst compilation failed"):
+            render("#let x = ", output, settings=settings)
+        assert output.read_bytes() == previous
+
+    def test_evicts_to_size_limit(self, tmp_path: Path):
+        cache = ArtifactCache(tmp_path / "cache", max_bytes=10)
+        for i in range(3):
+            rendered = tmp_path / f"{i}.pdf"
+            rendered.write_bytes(b"123456")
+            cache.store(f"k{i}", rendered, 0.1)
+        assert cache.size_bytes() <= 10
+        assert not cache.fetch("k0", tmp_path / "miss.pdf")
+
+    def test_html_is_not_cached(self, tmp_path: Path):
+        settings = self._settings(tmp_path)
+        render("<html></html>", tmp_path / "a.html", output_format="html", settings=settings)
+        assert not (settings.cache_dir / "artifacts").exists()
+
+
+class TestMarkdownTokenizer:
+    def test_tokenizes_blocks(self):
+        source = (
+            "# Title\n\nFirst line\ncontinued.\n\n- a\n  - nested\n1. one\n\n"
+            "| h1 | h2 |\n|---|:-:|\n| x | y |\n\n```\ncode\n```"
+        )
+        kinds = [(b.kind, b.level) for b in tokenize_markdown(source)]
+        assert kinds == [
+            ("heading", 1),
+            ("paragraph", 0),
+            ("list_item", 0),
+            ("list_item", 1),
+            ("list_item", 0),
+            ("table", 0),
+            ("code", 0),
+        ]
+        blocks = list(tokenize_markdown(source))
+        assert blocks[1].text == "First line continued."
+        assert blocks[4].ordered
+        assert blocks[5].rows == [["h1", "h2"], ["x", "y"]]
+
+    def test_parses_inline_formatting(self):
+        runs = parse_inline("a **b *c* d** `d` [e](http://x) snake_case")
+        assert [(r.text, r.bold, r.italic, r.code) for r in runs] == [
+            ("a ", False, False, False),
+            ("b ", True, False, False),
+            ("c", True, True, False),
+            (" d", True, False, False),
+            (" ", False, False, False),
+            ("d", False, False, True),
+            (" ", False, False, False),
+            ("e", False, False, False),
+            (" snake_case", False, False, False),
+        ]
+
+
+class TestDocxBuilder:
+    def test_renders_tables_and_nested_lists(self, tmp_path: Path):
+        docx = pytest.importorskip("docx")
+        source = "# Title\n\n- a\n  - b\n\n| h1 | h2 |\n|---|---|\n| **x** | y |"
+        output = render_docx(source, tmp_path / "out.docx")
+
+        doc = docx.Document(str(output))
+        styles = [p.style.name for p in doc.paragraphs]
+        assert styles == ["Heading 1", "List Bullet", "List Bullet 2"]
+        assert len(doc.tables) == 1
+        assert doc.tables[0].cell(1, 0).text == "x"
+        assert doc.tables[0].cell(1, 0).paragraphs[0].runs[0].bold
+
+    def test_reuses_template_between_builds(self, tmp_path: Path):
+        docx = pytest.importorskip("docx")
+        render_docx("# First", tmp_path / "a.docx")
+        render_docx("# Second", tmp_path / "b.docx")
+        doc = docx.Document(str(tmp_path / "b.docx"))
+        assert [p.text for p in doc.paragraphs] == ["Second"]
+
+    def test_accepts_dotx_template(self, tmp_path: Path):
+        docx = pytest.importorskip("docx")
+        template = tmp_path / "custom.docx"
+        base = docx.Document()
+        base.styles["Normal"].font.size = docx.shared.Pt(13)
+        base.add_paragraph("template body is dropped")
+        base.save(str(template))
+        dotx = template.with_suffix(".dotx")
+        dotx.write_bytes(template.read_bytes())
+
+        output = render_docx("Hello", tmp_path / "out.docx", template=dotx)
+        doc = docx.Document(str(output))
+        assert [p.text for p in doc.paragraphs] == ["Hello"]
+        assert doc.styles["Normal"].font.size == docx.shared.Pt(13)
+
+
+    def test_edited_template_is_reloaded(self, tmp_path: Path):
+        docx = pytest.importorskip("docx")
+        template = tmp_path / "custom.docx"
+        base = docx.Document()
+        base.styles["Normal"].font.size = docx.shared.Pt(13)
+        base.save(str(template))
+        render_docx("Hello", tmp_path / "a.docx", template=template)
+
+        base.styles["Normal"].font.size = docx.shared.Pt(15)
+        base.add_paragraph("Changes the size as well as the time")
+        base.save(str(template))
+        output = render_docx("Hello", tmp_path / "b.docx", template=template)
+        assert docx.Document(str(output)).styles["Normal"].font.size == docx.shared.Pt(15)
+
+
+class TestRenderToBytes:
+    def test_text_formats_are_encoded(self):
+        assert render_to_bytes("<p>é</p>", output_format="html") == "<p>é</p>".encode()
+
+    def test_docx_in_memory(self):
+        pytest.importorskip("docx")
+        data = render_to_bytes("# Title", output_format="docx")
+        assert data[:2] == b"PK"
+
+    def test_typst_in_memory(self):
+        pytest.importorskip("typst")
+        data = render_to_bytes("= Hello\n\nWorld", renderer=RendererName.TYPST)
+        assert data.startswith(b"%PDF")
+
+    def test_typst_errors_raise_render_error(self):
+        pytest.importorskip("typst")
+        with pytest.raises(RenderError, match="Typst compilation failed"):
+            render_to_bytes("#let x = ", renderer=RendererName.TYPST)
+
+    def test_uses_artifact_cache(self, tmp_path: Path):
+        pytest.importorskip("docx")
+        settings = Settings(_env_file=None, cache_dir=tmp_path)
+        first = render_to_bytes("# Same", output_format="docx", settings=settings)
+        second = render_to_bytes("# Same", output_format="docx", settings=settings)
+        assert first == second
+        assert get_artifact_cache(tmp_path).stats.hits == 1
+
+
+class TestTypstSource:
+    def test_boundaries_skip_nested_blocks(self):
+        source = (
+            "= Title\n\n"
+            "#table(\n  columns: 2,\n\n  [a], [b],\n)\n\n"
+            "#block[\n  one\n\n  two\n]\n\n"
+            "```\ncode\n\nmore\n```\n\n"
+            "Tail"
+        )
+        cuts = [source[:offset] for offset in top_level_boundaries(source)]
+        assert cuts == [
+            "= Title\n\n",
+            "= Title\n\n#table(\n  columns: 2,\n\n  [a], [b],\n)\n\n",
+            source[: source.index("```")],
+            source[: source.index("Tail")],
+        ]
+
+    def test_prose_parentheses_are_not_nesting(self):
+        source = "Some text (see below\n\nNext paragraph"
+        assert top_level_boundaries(source) == [len("Some text (see below\n\n")]
+
+    def test_prefix_cuts_past_min_chars(self):
+        source = "\n\n".join(f"Paragraph {i}" for i in range(100))
+        prefix = top_level_prefix(source, 50)
+        assert len(prefix) >= 50
+        assert prefix.endswith("\n\n")
+        assert top_level_prefix("short", 50) == "short"
+
+
+def _png_width(data: bytes) -> int:
+    return int.from_bytes(data[16:20], "big")
+
+
+class TestPreview:
+    def test_renders_first_page_png(self):
+        pytest.importorskip("typst")
+        source = "#set page(width: 100pt, height: 100pt)\n" + "\n\n".join(
+            f"Paragraph {i}" for i in range(200)
+        )
+        data = render_to_bytes(source, output_format="preview")
+        assert data.startswith(b"\x89PNG")
+        assert _png_width(data) == 100
+
+    def test_dpi_is_configurable(self, tmp_path: Path):
+        pytest.importorskip("typst")
+        source = "#set page(width: 100pt, height: 100pt)\nHello"
+        settings = Settings(
+            _env_file=None, cache_dir=tmp_path, preview_dpi=144, render_isolation=False
+        )
+        data = render_to_bytes(source, output_format="preview", settings=settings)
+        assert _png_width(data) == 200
+
+    def test_errors_in_opening_content_raise(self):
+        pytest.importorskip("typst")
+        source = "#let x = \n\n" + "\n\n".join("text" for _ in range(3000))
+        with pytest.raises(RenderError, match="Typst compilation failed"):
+            render_to_bytes(source, output_format="preview")
+
+    def test_latex_preview_is_rejected(self):
+        with pytest.raises(RenderError, match="only supported by the Typst renderer"):
+            render_to_bytes("x", renderer=RendererName.LATEX, output_format="preview")
+
+    def test_preview_is_cached_separately_per_dpi(self, tmp_path: Path):
+        pytest.importorskip("typst")
+        low = Settings(_env_file=None, cache_dir=tmp_path, render_isolation=False)
+        high = Settings(_env_file=None, cache_dir=tmp_path, preview_dpi=144, render_isolation=False)
+        render_to_bytes("Hello", output_format="preview", settings=low)
+        render_to_bytes("Hello", output_format="preview", settings=high)
+        render_to_bytes("Hello", output_format="preview", settings=low)
+        stats = get_artifact_cache(tmp_path).stats
+        assert (stats.hits, stats.misses) == (1, 2)
+
+    async def test_isolated_preview(self):
+        pytest.importorskip("typst")
+        data = await renderer_module.typst_to_png_async("Hello", isolate=True)
+        assert data.startswith(b"\x89PNG")
+
+
+class TestTypstStyles:
+    @pytest.mark.parametrize("template", [None, *TEMPLATE_STYLES])
+    def test_style_preamble_compiles(self, template):
+        pytest.importorskip("typst")
+        source = style_preamble(template).replace('"..."', '"X"').replace("[...]", "[X]")
+        source += "\n\n= Section\n\nText\n\n#table(columns: 2, [a], [b], [1], [2])\n"
+        assert render_to_bytes(source).startswith(b"%PDF")
+
+    async def test_isolated_render_resolves_styles(self):
+        pytest.importorskip("typst")
+        source = style_preamble("report").replace('"..."', '"X"').replace("[...]", "[X]")
+        data = await typst_to_pdf_async(source + "\n\nBody", isolate=True)
+        assert data.startswith(b"%PDF")
+
+    def test_system_prompt_imports_template_style(self):
+        prompt = get_system_prompt(RendererName.TYPST, "pdf", "invoice")
+        assert '#import "@local/autodocs:0.1.0": invoice' in prompt
+        assert "#show: invoice.with(" in prompt
+        assert "autodocs-base" in get_system_prompt(RendererName.TYPST, "pdf", "meeting_notes")
+
+
+class TestSandbox:
+    async def test_cancellation_kills_process(self, tmp_path: Path):
+        marker = tmp_path / "finished"
+        script = f"import time, pathlib; time.sleep(5); pathlib.Path({str(marker)!r}).touch()"
+        task = asyncio.create_task(run_process([sys.executable, "-c", script]))
+        await asyncio.sleep(0.3)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0.2)
+        assert not marker.exists()
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="rlimits are POSIX-only")
+    async def test_cpu_limit_kills_runaway_process(self):
+        limits = ResourceLimits(cpu_seconds=1)
+        result = await run_process([sys.executable, "-c", "while True: pass"], limits=limits)
+        assert result.returncode != 0
+        assert "CPU time" in describe_failure(result, limits)
+
+    @pytest.mark.skipif(not sandbox._HAS_PRLIMIT, reason="prlimit is Linux-only")
+    async def test_limits_are_applied_without_preexec_fn(self, monkeypatch):
+        def spawn(*args, preexec_fn=None, **kwargs):
+            assert preexec_fn is None  # Unsafe in threaded servers
+            return create_subprocess_exec(*args, **kwargs)
+
+        create_subprocess_exec = asyncio.create_subprocess_exec
+        monkeypatch.setattr(asyncio, "create_subprocess_exec", spawn)
+        script = (
+            "import resource, time; time.sleep(0.3); print(resource.getrlimit(resource.RLIMIT_AS))"
+        )
+        result = await run_process(
+            [sys.executable, "-c", script], limits=ResourceLimits(memory_mb=1024)
+        )
+        size = 1024 * 1024 * 1024
+        assert result.stdout.decode().strip() == f"({size}, {size})"
+
+    async def test_render_budget_is_enforced(self, tmp_path: Path, monkeypatch):
+        async def slow_compile(source, limits=None, isolate=False):
+            await asyncio.sleep(5)
+
+        monkeypatch.setattr(renderer_module, "typst_to_pdf_async", slow_compile)
+        settings = Settings(_env_file=None, cache_dir=tmp_path, render_timeout=0.1)
+        with pytest.raises(RenderError, match="time budget"):
+            await render_to_bytes_async("= Slow", settings=settings)
+
+    async def test_isolated_typst_render(self):
+        pytest.importorskip("typst")
+        data = await typst_to_pdf_async("= Isolated", isolate=True)
+        assert data.startswith(b"%PDF")
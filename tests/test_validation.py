@@ -0,0 +1,140 @@
+"""Tests for streaming validation of generated source."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from autodocs_ai.config import Settings
+from autodocs_ai.core import validation
+from autodocs_ai.core.renderer import RenderError
+from autodocs_ai.core.validation import (
+    InvalidGenerationError,
+    StreamValidator,
+    generate_validated,
+)
+from autodocs_ai.providers.base import AIProvider, GenerationResult
+
+
+class ScriptedProvider(AIProvider):
+    """Streams canned responses chunk by chunk, one response per call."""
+
+    def __init__(self, *responses: list[str]) -> None:
+        self.responses = list(responses)
+        self.chunks_sent: list[int] = []
+
+    async def generate(self, system_prompt, user_prompt):
+        return GenerationResult(content="".join(self.responses.pop(0)), model="fake", provider="f")
+
+    async def stream(self, system_prompt, user_prompt, on_text):
+        chunks = self.responses.pop(0)
+        self.chunks_sent.append(0)
+        for chunk in chunks:
+            self.chunks_sent[-1] += 1
+            on_text(chunk)
+            await asyncio.sleep(0.05)
+        return GenerationResult(content="".join(chunks), model="fake", provider="f")
+
+    def validate_config(self):
+        pass
+
+
+def _feed_all(validator: StreamValidator, text: str) -> None:
+    for line in text.splitlines(keepends=True):
+        validator.feed(line)
+
+
+class TestStreamValidator:
+    def test_rejects_code_fence(self):
+        with pytest.raises(InvalidGenerationError, match="code fence"):
+            _feed_all(StreamValidator("typst"), "```typst\n= Title\n")
+
+    def test_allows_leading_mermaid_block(self):
+        _feed_all(StreamValidator("typst"), "```mermaid\ngraph TD\n```\n")
+
+    def test_rejects_prose_preamble(self):
+        with pytest.raises(InvalidGenerationError, match="conversational prose"):
+            _feed_all(StreamValidator("typst"), "Sure! Here is your report:\n\n= Report\n")
+
+    def test_rejects_latex_without_documentclass(self):
+        validator = StreamValidator("latex")
+        with pytest.raises(InvalidGenerationError, match="documentclass"):
+            _feed_all(validator, "\\section{Intro}\n" + "text\n" * 500)
+
+    def test_markdown_is_not_checked(self):
+        _feed_all(StreamValidator(None), "```python\nprint()\n```\n")
+
+    async def test_fails_on_typst_syntax_error(self):
+        pytest.importorskip("typst")
+        validator = StreamValidator("typst", check_interval=0)
+        with pytest.raises(InvalidGenerationError, match="does not compile"):
+            for chunk in ["= Title\n\n", "#let x = \n\n", "More text\n\n", "End\n\n"]:
+                validator.feed(chunk)
+                await asyncio.sleep(0.3)
+            await validator.finish()
+
+    @pytest.mark.parametrize(
+        "message",
+        [
+            "Typst compilation failed:\nunexpected end of block",
+            "Typst compilation failed:\nerror: unclosed delimiter\n  ┌─ main.typ:3:5",
+        ],
+    )
+    async def test_detects_fatal_errors_of_typst_py_and_cli(self, message, monkeypatch):
+        async def failing_compile(*args):
+            raise RenderError(message)
+
+        monkeypatch.setattr(validation, "typst_to_pdf_async", failing_compile)
+        validator = StreamValidator("typst", check_interval=0)
+        validator.feed("= Title\n\n")
+        with pytest.raises(InvalidGenerationError, match="does not compile"):
+            await validator.finish()
+
+    async def test_missing_labels_are_not_fatal(self):
+        pytest.importorskip("typst")
+        validator = StreamValidator("typst", check_interval=0)
+        for chunk in ["= Title\n\n", "See @later.\n\n"]:
+            validator.feed(chunk)
+            await asyncio.sleep(0.3)
+        await validator.finish()
+
+
+class TestGenerateValidated:
+    def _settings(self, **kwargs) -> Settings:
+        return Settings(_env_file=None, render_isolation=False, **kwargs)
+
+    async def test_aborts_and_retries_unusable_generation(self):
+        bad = ["Certainly! Below is the document.\n", "= Title\n", "Body\n", "More\n"]
+        good = ["= Title\n", "Body\n"]
+        provider = ScriptedProvider(bad, good)
+
+        result = await generate_validated(provider, "sys", "user", "typst", self._settings())
+
+        assert result.content == "= Title\nBody\n"
+        assert result.aborted_attempts == 1
+        assert provider.chunks_sent == [1, 2]
+
+    async def test_last_attempt_is_not_validated(self):
+        bad = ["```typst\n", "= Title\n", "```\n"]
+        provider = ScriptedProvider(bad, bad)
+
+        result = await generate_validated(
+            provider, "sys", "user", "typst", self._settings(generation_retries=1)
+        )
+
+        assert result.content.startswith("```typst")
+        assert result.aborted_attempts == 1
+
+    async def test_default_stream_delivers_one_chunk(self):
+        class BlockingProvider(AIProvider):
+            async def generate(self, system_prompt, user_prompt):
+                return GenerationResult(content="= Hi\n", model="fake", provider="f")
+
+            def validate_config(self):
+                pass
+
+        chunks: list[str] = []
+        result = await BlockingProvider().stream("sys", "user", chunks.append)
+        assert chunks == ["= Hi\n"]
+        assert result.content == "= Hi\n"
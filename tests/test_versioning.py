@@ -0,0 +1,540 @@
+"""Tests for document versioning."""
+
+from __future__ import annotations
+
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from autodocs_ai.config import Settings
+from autodocs_ai.core import generator
+from autodocs_ai.core.generator import GenerateRequest, generate_document
+from autodocs_ai.core.renderer import render_markdown
+from autodocs_ai.providers.base import AIProvider, GenerationResult
+from autodocs_ai.utils import artifact_store, version_index, version_queue, versioning
+from autodocs_ai.utils.artifact_store import ArtifactStoreBackend
+from autodocs_ai.utils.versioning import (
+    commit_version,
+    diff_versions,
+    init_versioning,
+    list_versions,
+    restore_version,
+)
+
+requires_git = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+
+def _git(output_dir: Path, *args: str) -> str:
+    result = subprocess.run(
+        ["git", *args], cwd=output_dir, capture_output=True, text=True, check=True
+    )
+    return result.stdout
+
+
+@pytest.fixture
+def home(tmp_path: Path, monkeypatch) -> Path:
+    """A home directory of one's own, so the user's git config doesn't apply."""
+    directory = tmp_path / "home"
+    directory.mkdir()
+    monkeypatch.setenv("HOME", str(directory))
+    for name in ("XDG_CONFIG_HOME", "GIT_CONFIG_GLOBAL", "GIT_AUTHOR_NAME", "GIT_AUTHOR_EMAIL"):
+        monkeypatch.delenv(name, raising=False)
+    return directory
+
+
+@pytest.fixture
+def output_dir(tmp_path: Path) -> Path:
+    directory = tmp_path / "output"
+    init_versioning(directory)
+    return directory
+
+
+class TestGitVersioning:
+    def test_commit_and_list(self, output_dir: Path):
+        (output_dir / "report.md").write_text("v1\n")
+        first = commit_version(output_dir, "First")
+        (output_dir / "report.md").write_text("v2\n")
+        second = commit_version(output_dir, "Second")
+
+        versions = list_versions(output_dir)
+        assert [v["hash"] for v in versions[:2]] == [second, first]
+        assert [v["message"] for v in versions] == [
+            "Second",
+            "First",
+            "Initialize document versioning",
+        ]
+        assert list_versions(output_dir, limit=1)[0]["hash"] == second
+
+    def test_nothing_to_commit(self, output_dir: Path):
+        (output_dir / "report.md").write_text("v1\n")
+        assert commit_version(output_dir) is not None
+        assert commit_version(output_dir) is None
+
+    def test_commit_specific_files(self, output_dir: Path):
+        (output_dir / "a.md").write_text("a\n")
+        (output_dir / "b.md").write_text("b\n")
+        commit = commit_version(output_dir, files=["a.md"])
+        assert commit is not None
+
+        (output_dir / "a.md").unlink()
+        diff = diff_versions(output_dir, commit)
+        assert "--- a/a.md\n+++ /dev/null\n" in diff
+        assert "b.md" not in diff  # Never committed, so untracked
+
+    def test_diff_and_restore(self, output_dir: Path):
+        (output_dir / "docs").mkdir()
+        (output_dir / "docs" / "report.md").write_text("alpha\n")
+        (output_dir / "report.pdf").write_bytes(b"%PDF\0one")
+        first = commit_version(output_dir, "First")
+        (output_dir / "docs" / "report.md").write_text("beta\n")
+        (output_dir / "report.pdf").write_bytes(b"%PDF\0two")
+        second = commit_version(output_dir, "Second")
+
+        diff = diff_versions(output_dir, first[:8], second)
+        assert "-alpha\n+beta\n" in diff
+        assert "Binary files a/report.pdf and b/report.pdf differ" in diff
+        assert diff_versions(output_dir, "HEAD") == ""
+
+        restore_version(output_dir, first)
+        assert (output_dir / "docs" / "report.md").read_text() == "alpha\n"
+        assert (output_dir / "report.pdf").read_bytes() == b"%PDF\0one"
+        assert diff_versions(output_dir, first) == ""
+
+    def test_restore_unknown_version_fails(self, output_dir: Path):
+        with pytest.raises(versioning.VersioningError):
+            restore_version(output_dir, "0123456789abcdef")
+
+    def test_does_not_spawn_processes(self, output_dir: Path, monkeypatch):
+        def no_subprocess(*args, **kwargs):
+            raise AssertionError("unexpected subprocess")
+
+        monkeypatch.setattr(subprocess, "run", no_subprocess)
+        (output_dir / "report.md").write_text("v1\n")
+        first = commit_version(output_dir, "First")
+        (output_dir / "report.md").write_text("v2\n")
+        commit_version(output_dir, "Second")
+
+        assert len(list_versions(output_dir)) == 3
+        assert "-v1\n+v2\n" in diff_versions(output_dir, first, "HEAD")
+        restore_version(output_dir, "HEAD~1")
+        assert (output_dir / "report.md").read_text() == "v1\n"
+
+    def test_ignored_files_are_not_committed(self, home: Path, output_dir: Path):
+        (home / ".gitconfig").write_text("[core]\n\texcludesFile = ~/ignore\n")
+        (home / "ignore").write_text("*.bak\n")
+        (output_dir / ".git" / "info").mkdir(exist_ok=True)
+        (output_dir / ".git" / "info" / "exclude").write_text("secret.txt\n")
+        (output_dir / ".gitignore").write_text("*.tmp\n!keep.tmp\nbuild/\n/top.md\n")
+        (output_dir / "sub" / "build").mkdir(parents=True)
+        (output_dir / "sub" / ".gitignore").write_text("draft.md\n")
+        for name in [
+            "report.md",
+            "junk.tmp",
+            "keep.tmp",
+            "old.bak",
+            "secret.txt",
+            "top.md",
+            "sub/top.md",
+            "sub/draft.md",
+            "sub/build/out.pdf",
+        ]:
+            (output_dir / name).write_text(name)
+        commit = commit_version(output_dir, "Add documents")
+
+        repo = versioning.GitRepository(output_dir)
+        assert sorted(repo.read_tree(repo.read_commit(commit).tree)) == [
+            ".gitignore",
+            "keep.tmp",
+            "report.md",
+            "sub/.gitignore",
+            "sub/top.md",
+        ]
+
+    def test_author_from_git_config(self, home: Path, output_dir: Path):
+        (home / ".gitconfig").write_text(
+            '[user]\n\tname = Global User\n\temail = "global@example.com"  # Work\n'
+        )
+        with (output_dir / ".git" / "config").open("a") as config:
+            config.write("[user]\n\tname = Local User\n")
+        (output_dir / "report.md").write_text("v1\n")
+        commit = commit_version(output_dir, "First")
+
+        repo = versioning.GitRepository(output_dir)
+        assert repo.read_commit(commit).author.startswith("Local User <global@example.com>")
+
+    def test_concurrent_commits_are_serialized(self, output_dir: Path):
+        def commit(i: int) -> None:
+            (output_dir / f"doc{i}.md").write_text(f"{i}\n")
+            commit_version(output_dir, f"Add doc{i}", files=[f"doc{i}.md"])
+
+        threads = [threading.Thread(target=commit, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        repo = versioning.GitRepository(output_dir)
+        assert len(list_versions(output_dir)) == 5
+        assert sorted(repo.read_tree(repo.read_commit(repo.head()).tree)) == [
+            f"doc{i}.md" for i in range(4)
+        ]
+        assert not (output_dir / ".git" / "index.lock").exists()
+
+    def test_commit_fails_while_index_is_locked(self, output_dir: Path, monkeypatch):
+        monkeypatch.setattr(versioning, "LOCK_TIMEOUT", 0.0)
+        lock = output_dir / ".git" / "index.lock"
+        lock.write_bytes(b"")  # e.g. git add running
+        (output_dir / "report.md").write_text("v1\n")
+        with pytest.raises(versioning.VersioningError, match="index.lock"):
+            commit_version(output_dir, "First")
+        assert lock.exists()  # Not ours to remove
+
+    def test_commit_does_not_overwrite_concurrent_commit(self, output_dir: Path, monkeypatch):
+        repo = versioning.GitRepository(output_dir)
+        empty = repo.write_object("tree", b"")
+        other = repo.write_commit(empty, [repo.head()], "Other process", "Other <o@example.com>")
+        write_commit = versioning.GitRepository.write_commit
+
+        def write_commit_then_race(self, *args):
+            commit = write_commit(self, *args)
+            (self.git_dir / "refs" / "heads" / "main").write_text(other + "\n")
+            return commit
+
+        monkeypatch.setattr(versioning.GitRepository, "write_commit", write_commit_then_race)
+        (output_dir / "report.md").write_text("v1\n")
+        with pytest.raises(versioning.VersioningError, match="HEAD moved"):
+            commit_version(output_dir, "First")
+        assert repo.head() == other
+        assert sorted(p.name for p in (output_dir / ".git").rglob("*.lock")) == []
+
+    @requires_git
+    def test_repository_is_readable_by_git(self, output_dir: Path):
+        (output_dir / "sub").mkdir()
+        (output_dir / "sub" / "a.md").write_text("a\n")
+        (output_dir / "b.md").write_text("b\n")
+        commit = commit_version(output_dir, "Add documents")
+
+        _git(output_dir, "fsck", "--strict")
+        assert _git(output_dir, "rev-parse", "HEAD").strip() == commit
+        assert _git(output_dir, "log", "-1", "--format=%s").strip() == "Add documents"
+        assert _git(output_dir, "status", "--porcelain") == ""
+        assert _git(output_dir, "show", "HEAD:sub/a.md") == "a\n"
+
+    @requires_git
+    def test_reads_objects_packed_by_git(self, output_dir: Path):
+        (output_dir / "a.md").write_text("a\n")
+        first = commit_version(output_dir, "First")
+        (output_dir / "a.md").write_text("b\n")
+        commit_version(output_dir, "Second")
+        _git(output_dir, "gc", "--quiet")
+
+        assert [v["message"] for v in list_versions(output_dir, limit=2)] == ["Second", "First"]
+        assert "-a\n+b\n" in diff_versions(output_dir, first, "HEAD")
+
+
+@pytest.fixture
+def store_dir(tmp_path: Path) -> Path:
+    directory = tmp_path / "store"
+    init_versioning(directory, backend="store")
+    return directory
+
+
+class TestArtifactStore:
+    def test_backend_detected(self, store_dir: Path, output_dir: Path):
+        assert isinstance(versioning.get_versioning_backend(store_dir), ArtifactStoreBackend)
+        assert isinstance(versioning.get_versioning_backend(output_dir), versioning.GitBackend)
+        with pytest.raises(ValueError):
+            versioning.get_versioning_backend(store_dir, "svn")
+
+    def test_identical_outputs_share_an_object(self, store_dir: Path):
+        store = ArtifactStoreBackend(store_dir)
+        (store_dir / "a.pdf").write_bytes(b"%PDF same")
+        (store_dir / "b.pdf").write_bytes(b"%PDF same")
+        first = commit_version(store_dir, "First")
+        (store_dir / "c.pdf").write_bytes(b"%PDF same")
+        second = commit_version(store_dir, "Second")
+
+        assert [v["hash"] for v in list_versions(store_dir)] == [second, first]
+        assert len(list((store.root / "objects").glob("*/*"))) == 1
+        assert commit_version(store_dir) is None
+
+    def test_diff_and_restore_as_hard_links(self, store_dir: Path):
+        store = ArtifactStoreBackend(store_dir)
+        (store_dir / "docs").mkdir()
+        (store_dir / "docs" / "report.md").write_text("alpha\n")
+        (store_dir / "report.pdf").write_bytes(b"%PDF\0one")
+        first = commit_version(store_dir, "First")
+        (store_dir / "docs" / "report.md").write_text("beta\n")
+        (store_dir / "report.pdf").write_bytes(b"%PDF\0two")
+        second = commit_version(store_dir, "Second")
+
+        diff = diff_versions(store_dir, first[:8], second)
+        assert "-alpha\n+beta\n" in diff
+        assert "Binary files a/report.pdf and b/report.pdf differ" in diff
+        assert diff_versions(store_dir, "HEAD") == ""
+
+        restore_version(store_dir, "HEAD~1")
+        assert (store_dir / "docs" / "report.md").read_text() == "alpha\n"
+        restored = store_dir / "report.pdf"
+        objects = {p.stat().st_ino for p in (store.root / "objects").glob("*/*")}
+        assert restored.stat().st_ino in objects
+        assert diff_versions(store_dir, first) == ""
+
+        # Rendering over a restored file replaces it rather than writing through the link
+        render_markdown("changed\n", store_dir / "docs" / "report.md")
+        assert diff_versions(store_dir, first, second).count("-alpha\n+beta\n") == 1
+
+    def test_commit_specific_files(self, store_dir: Path):
+        (store_dir / "a.md").write_text("a\n")
+        (store_dir / "b.md").write_text("b\n")
+        commit_version(store_dir, files=["a.md"])
+        (store_dir / "a.md").unlink()
+        commit = commit_version(store_dir, files=["a.md"])
+
+        assert commit is not None
+        assert ArtifactStoreBackend(store_dir)._read_manifest(commit).files == {}
+
+    def test_restore_unknown_version_fails(self, store_dir: Path):
+        with pytest.raises(versioning.VersioningError):
+            restore_version(store_dir, "0123456789abcdef")
+
+    def test_concurrent_commits_stay_on_the_head_chain(self, store_dir: Path):
+        store = ArtifactStoreBackend(store_dir)
+
+        def commit(i: int) -> None:
+            (store_dir / f"doc{i}.pdf").write_bytes(f"%PDF {i}".encode())
+            commit_version(store_dir, f"Add doc{i}", files=[f"doc{i}.pdf"])
+
+        threads = [threading.Thread(target=commit, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(list(store.log(store.head()))) == 4
+        assert len(list((store.root / "manifests").glob("*.json"))) == 4
+        assert sorted(store._read_manifest(store.head()).files) == [
+            f"doc{i}.pdf" for i in range(4)
+        ]
+        assert store.collect_garbage().versions == 0
+
+    def test_commit_fails_while_another_holds_the_lock(self, store_dir: Path, monkeypatch):
+        monkeypatch.setattr(artifact_store, "LOCK_TIMEOUT", 0.0)
+        lock = store_dir / ".versions" / "HEAD.lock"
+        lock.write_bytes(b"")
+        (store_dir / "report.pdf").write_bytes(b"%PDF")
+        with pytest.raises(versioning.VersioningError, match="HEAD.lock"):
+            commit_version(store_dir, "First")
+        assert ArtifactStoreBackend(store_dir).head() is None
+        assert lock.exists()
+
+    def test_collect_garbage_by_age(self, store_dir: Path, monkeypatch):
+        store = ArtifactStoreBackend(store_dir)
+        now = 1_700_000_000.0
+        for day, content in enumerate(["one", "two", "three"]):
+            monkeypatch.setattr(artifact_store.time, "time", lambda day=day: now + day * 86400)
+            (store_dir / "report.md").write_text(content)
+            commit_version(store_dir, content)
+
+        result = store.collect_garbage(max_age=1.5 * 86400)
+
+        assert (result.versions, result.objects, result.bytes_freed) == (1, 1, 3)
+        assert [v["message"] for v in list_versions(store_dir)] == ["three", "two"]
+        assert store.collect_garbage(max_age=0).versions == 1
+        assert [v["message"] for v in list_versions(store_dir)] == ["three"]
+
+    def test_collect_garbage_by_size(self, store_dir: Path):
+        store = ArtifactStoreBackend(store_dir)
+        for size in (100, 200, 300):
+            (store_dir / "report.pdf").write_bytes(b"x" * size)
+            commit_version(store_dir)
+
+        result = store.collect_garbage(max_bytes=550)
+
+        assert result.versions == 1
+        assert store.size_bytes() == 500
+        assert len(list_versions(store_dir)) == 2
+
+
+class TestVersionQueue:
+    def test_coalesces_documents_into_one_commit(self, output_dir: Path):
+        queue = version_queue.VersionQueue(output_dir, debounce=0.2)
+        for name in ("a.md", "b.md", "c.md"):
+            (output_dir / name).write_text(name)
+            queue.submit([output_dir / name], f"Generate {name}")
+        assert queue.depth == 3
+
+        deadline = time.monotonic() + 5
+        while queue.commits == 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        assert queue.depth == 0
+        assert queue.commits == 1
+        [latest, _] = list_versions(output_dir)
+        assert latest["hash"] == queue.last_version
+        assert latest["message"] == "Update 3 generated documents"
+        queue.close()
+
+    def test_submit_does_not_wait_for_commit(self, output_dir: Path, monkeypatch):
+        started = threading.Event()
+
+        def slow_commit(*args, **kwargs):
+            started.set()
+            time.sleep(0.3)
+            return "abc"
+
+        monkeypatch.setattr(version_queue, "commit_version", slow_commit)
+        queue = version_queue.VersionQueue(output_dir, debounce=0)
+        queue.submit(["a.md"])
+        assert started.wait(1)
+
+        start = time.perf_counter()
+        queue.submit(["b.md"])
+        assert time.perf_counter() - start < 0.1
+        assert queue.depth == 2  # One committing, one waiting
+
+        assert queue.flush(timeout=2)
+        assert queue.depth == 0
+        assert queue.commits == 2
+
+    def test_collects_garbage_after_commit(self, store_dir: Path):
+        store = ArtifactStoreBackend(store_dir)
+        queue = version_queue.VersionQueue(store_dir, "store", debounce=0, max_bytes=550)
+        for size in (100, 200, 300):
+            (store_dir / "report.pdf").write_bytes(b"x" * size)
+            queue.submit(["report.pdf"])
+            assert queue.flush(timeout=5)
+
+        assert queue.commits == 3
+        assert queue.errors == 0
+        assert len(list_versions(store_dir)) == 2
+        assert store.size_bytes() == 500
+        queue.close()
+
+    def test_close_flushes_pending(self, output_dir: Path):
+        queue = version_queue.VersionQueue(output_dir, debounce=60)
+        (output_dir / "a.md").write_text("a\n")
+        queue.submit(["a.md"], "Generate a.md")
+
+        assert queue.close(timeout=2)
+        assert list_versions(output_dir)[0]["message"] == "Generate a.md"
+        with pytest.raises(versioning.VersioningError):
+            queue.submit(["a.md"])
+
+    def test_failed_commit_is_recorded(self, output_dir: Path, monkeypatch):
+        def failing_commit(*args, **kwargs):
+            raise versioning.VersioningError("disk full")
+
+        monkeypatch.setattr(version_queue, "commit_version", failing_commit)
+        queue = version_queue.VersionQueue(output_dir, debounce=0)
+        queue.submit(["a.md"])
+
+        assert queue.flush(timeout=2)
+        assert (queue.errors, queue.last_error) == (1, "disk full")
+        queue.close()
+
+    async def test_generated_documents_are_queued(self, tmp_path: Path, monkeypatch):
+        class FakeProvider(AIProvider):
+            async def generate(self, system_prompt, user_prompt):
+                return GenerationResult(content="# Doc\n", model="fake", provider="f")
+
+            def validate_config(self):
+                pass
+
+        monkeypatch.setattr(generator, "get_provider", lambda settings: FakeProvider())
+        settings = Settings(
+            _env_file=None,
+            cache_dir=tmp_path / "cache",
+            output_dir=tmp_path / "out",
+            mermaid_diagrams=False,
+            stream_validation=False,
+            versioning=True,
+            versioning_backend="store",
+            versioning_debounce=60,
+        )
+        request = GenerateRequest(prompt="Doc", output_format="markdown,html")
+
+        await generate_document(request, settings)
+        queue = version_queue.get_version_queue(settings.output_dir)
+        assert queue.depth == 2
+        version_queue.close_version_queues()
+
+        [version] = list_versions(settings.output_dir)
+        assert version["message"] == "Generate document.md, document.html"
+        assert (version["provider"], version["model"]) == ("f", "fake")
+
+
+class TestVersionIndex:
+    @pytest.fixture(params=["git", "store"])
+    def versioned_dir(self, request, tmp_path: Path) -> Path:
+        directory = tmp_path / request.param
+        init_versioning(directory, backend=request.param)
+        return directory
+
+    def test_records_files_and_metadata(self, versioned_dir: Path):
+        (versioned_dir / "a.md").write_text("a\n")
+        (versioned_dir / "b.md").write_text("b\n")
+        commit_version(versioned_dir, "Both", metadata={"template": "report", "provider": "x"})
+        (versioned_dir / "b.md").write_text("b2\n")
+        usage = {"total_tokens": 12}
+        commit_version(versioned_dir, "B", metadata={"provider": "y", "model": "m", "usage": usage})
+
+        latest, first = list_versions(versioned_dir, limit=2)
+        assert latest["files"] == ["b.md"]
+        assert (latest["provider"], latest["model"], latest["usage"]) == ("y", "m", usage)
+        assert first["files"] == ["a.md", "b.md"]
+        assert first["template"] == "report"
+
+        assert [v["message"] for v in list_versions(versioned_dir, path="a.md")] == ["Both"]
+        assert [v["message"] for v in list_versions(versioned_dir, provider="y")] == ["B"]
+        assert list_versions(versioned_dir, template="report", provider="y") == []
+
+    def test_pages_with_cursor(self, versioned_dir: Path):
+        for i in range(7):
+            (versioned_dir / "a.md").write_text(f"{i}\n")
+            commit_version(versioned_dir, f"v{i}", files=["a.md"])
+
+        pages, before = [], None
+        while page := list_versions(versioned_dir, limit=3, before=before, path="a.md"):
+            pages.append([v["message"] for v in page])
+            before = page[-1]["hash"]
+        assert pages == [["v6", "v5", "v4"], ["v3", "v2", "v1"], ["v0"]]
+
+    def test_indexes_history_committed_without_it(self, versioned_dir: Path):
+        (versioned_dir / "a.md").write_text("a\n")
+        commit_version(versioned_dir, "First")
+        (versioned_dir / "a.md").write_text("b\n")
+        commit_version(versioned_dir, "Second")
+        backend = versioning.get_versioning_backend(versioned_dir)
+        backend.index.clear()
+
+        versions = list_versions(versioned_dir)
+
+        assert [v["message"] for v in versions][:2] == ["Second", "First"]
+        assert versions[0]["files"] == ["a.md"]
+        assert [v["message"] for v in list_versions(versioned_dir, path="a.md")] == [
+            "Second",
+            "First",
+        ]
+
+    def test_garbage_collected_versions_leave_the_index(self, store_dir: Path):
+        for content in ("one", "two"):
+            (store_dir / "a.md").write_text(content)
+            commit_version(store_dir, content)
+
+        ArtifactStoreBackend(store_dir).collect_garbage(max_age=0)
+
+        assert [v["message"] for v in list_versions(store_dir, limit=5)] == ["two"]
+
+    def test_merge_metadata(self):
+        merged = version_index.merge_metadata(
+            [
+                {"template": "report", "provider": "a", "usage": {"total_tokens": 3}},
+                {"template": "report", "provider": "b", "usage": {"total_tokens": 4}},
+            ]
+        )
+        assert merged == {"template": "report", "usage": {"total_tokens": 7}}